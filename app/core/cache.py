@@ -0,0 +1,93 @@
+from collections import OrderedDict
+import threading
+import time
+
+class TTLCache:
+    """
+    Thread-safe, size-bounded LRU cache whose entries also expire after a time-to-live.
+    """
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[1] < time.monotonic():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value, ttl: float = None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+class LocalStore:
+    """
+    In-process stand-in for a Redis client, implementing the subset of its API the shared
+    cache tiers use (``get``, ``set`` with ``ex``, ``delete``). Values are bytes or str, as with Redis.
+    """
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        with self._lock:
+            entry = self._data.get(name)
+            if entry is None:
+                return None
+            if entry[1] is not None and entry[1] < time.monotonic():
+                del self._data[name]
+                return None
+            return entry[0]
+
+    def set(self, name, value, ex: float = None):
+        with self._lock:
+            self._data[name] = (value if isinstance(value, bytes) else str(value).encode(), time.monotonic() + ex if ex else None)
+        return True
+
+    def delete(self, *names) -> int:
+        with self._lock:
+            return sum(self._data.pop(name, None) is not None for name in names)
+
+    def flushdb(self):
+        with self._lock:
+            self._data.clear()
+
+def create_shared_store(url: str | None):
+    """
+    Returns the client for a shared cache tier: None when ``url`` is empty, a ``LocalStore`` for
+    ``local://`` and a Redis client otherwise. The ``redis`` package is only needed in the last case.
+    """
+    if not url:
+        return None
+    if url.startswith("local://"):
+        return LocalStore()
+    try:
+        import redis
+    except ImportError:
+        raise RuntimeError(f"The 'redis' package is required for the shared cache at '{url}'.")
+    return redis.Redis.from_url(url)
@@ -1,6 +1,5 @@
-from fastapi import FastAPI
+from pydantic import Field
 from pydantic_settings import BaseSettings
-from zoneinfo import ZoneInfo
 
 class Settings(BaseSettings):
     app_name: str = 'Book Recommendation System'
@@ -9,18 +8,113 @@ class Settings(BaseSettings):
 
     # Database Configuration
     db_scheme: str
+    db_async_scheme: str = 'postgresql+asyncpg'
     db_name:str
     db_user: str
     db_password: str
     db_port: int
     db_host: str
+    db_pool_size: int = 5
+    db_max_overflow: int = 20
+    db_pool_pre_ping: bool = True
+    db_pool_recycle: int = 1800
+    db_pool_timeout: float = 30
+    # Logs every statement; prefer db_diagnostics, which only reports slow and repeated ones
+    db_echo: bool = False
+    # Comma separated 'host[:port]' list of read replicas, sharing the primary's database and credentials
+    db_replica_hosts: str | None = None
+    db_replica_retry_interval: float = 30
+    # Opt-in query diagnostics: slow statement log and per-request N+1 detection
+    db_diagnostics: bool = False
+    db_slow_query_ms: float = 200
+    db_n_plus_one_threshold: int = 10
     log_level:int = 20
 
     secret_key: str
     jwt_hashing_algorithm: str = 'HS256'
     access_token_expire_minutes: int = 30
+    identity_cache_size: int = 10000
+    identity_cache_ttl: float = 60
+    # User rows for authorisation: per-worker entries live identity_cache_local_ttl seconds;
+    # with cache_url set they are also shared for identity_cache_ttl and invalidated there on writes
+    identity_cache_local_ttl: float = 5
+    hashing_workers: int | None = None
+    hashing_max_pending: int = 64
+
+    # Admission control; rate_limit_url ('redis://...') shares the token buckets between processes
+    rate_limit_enabled: bool = True
+    rate_limit_url: str | None = None
+    rate_limit_max_keys: int = 100000
+    # Take the client IP from the first X-Forwarded-For entry; only behind a trusted proxy
+    rate_limit_trust_forwarded: bool = False
+    rate_limit_auth_per_minute: float = 10
+    rate_limit_auth_burst: int = 5
+    rate_limit_recommendation_per_minute: float = 300
+    rate_limit_recommendation_burst: int = 60
+    rate_limit_export_per_minute: float = 6
+    rate_limit_export_burst: int = 2
+    max_concurrency_auth: int = 64
+    max_concurrency_recommendation: int = 32
+    max_concurrency_export: int = 4
+    load_shed_retry_after: int = 1
+
+    # Shared cache tier, e.g. 'redis://localhost:6379/0', or 'local://' for an in-process stand-in
+    cache_url: str | None = None
 
     tz: str = 'Asia/Kolkata'
+
+    # Ratings Configuration
+    # Each row binds 3 parameters and asyncpg allows at most 32767 per statement
+    ratings_batch_size: int = Field(default=1000, ge=1, le=10000)
+
+    # Recommendation Configuration
+    recommendation_neighbours: int = 50
+    recommendation_block_size: int = 2048
+    recommendation_model_dir: str = 'artifacts/recommendation'
+    recommendation_keep_versions: int = 3
+    recommendation_reload_interval: float = 30
+    recommendation_watermark_overlap: float = 300
+    # Load the published models during application startup instead of on the first request
+    recommendation_preload: bool = True
+
+    als_factors: int = 64
+    als_epochs: int = 15
+    als_regularization: float = 0.1
+    als_implicit: bool = False
+    als_alpha: float = 40.0
+    als_block_size: int = 4096
+    als_workers: int | None = None
+    als_seed: int = 0
+    als_checkpoint_dir: str = 'artifacts/als-checkpoints'
+
+    content_model_dir: str = 'artifacts/content'
+    content_embedding_dim: int = 128
+    content_hash_features: int = 262144
+    content_lists: int | None = None
+    content_nprobe: int = 16
+
+    recommendation_cache_size: int = 50000
+    recommendation_cache_ttl: float = 900
+    recommendation_cache_local_ttl: float = 60
+    recommendation_cache_list_size: int = 100
+    recommendation_warm_users: int = 1000
+
+    # Trending weight of a rating halves every popularity_half_life_days
+    popularity_half_life_days: float = 7
+    popularity_list_size: int = 100
+    popularity_cache_ttl: float = 60
+
+    # Runs the scheduler inside the API process; otherwise run 'python -m app.worker'
+    worker_enabled: bool = False
+    worker_threads: int = 2
+    worker_tick_seconds: float = 1
+    worker_shutdown_timeout: float = 30
+    # Job schedules; an empty value disables the job
+    job_update_model_interval: float | None = 900
+    job_retrain_model_cron: str | None = '30 2 * * 0'
+    job_rebuild_content_cron: str | None = '0 3 * * *'
+    job_refresh_popularity_interval: float | None = 300
+    job_warm_cache_interval: float | None = None
     
     class Config:
         env_file = 'env/.env.dev'
@@ -1,35 +1,286 @@
 from sqlalchemy.orm import DeclarativeBase, mapped_column, Mapped, Session
 from sqlalchemy.engine import create_engine, Engine
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from sqlalchemy import exc, event, func
 from pydantic_core import MultiHostUrl
 from pydantic import PostgresDsn
 from app.core.logging import logger
+from app.core import metrics
 from datetime import datetime
+from functools import lru_cache
+import re
+import threading
+import time
 from app.core.metaclasses import SingletonMetaClass
-from app.core import constants
 from app.core.config import settings
 
 class Base(DeclarativeBase):
-    created_at: Mapped[datetime] = mapped_column(default=datetime.now(constants.tzinfo), nullable=False)
-    updated_at: Mapped[datetime] = mapped_column(default=datetime.now(constants.tzinfo), onupdate=datetime.now(constants.tzinfo), nullable=False)
+    # Evaluated by the database on every write, so bulk INSERTs and COPYs can leave them out.
+    created_at: Mapped[datetime] = mapped_column(server_default=func.now(), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(server_default=func.now(), onupdate=func.now(), nullable=False)
     deleted_at: Mapped[datetime] = mapped_column(nullable=True)
         
+class PoolStats:
+    """
+    Counters for the time callers spend waiting to check a connection out of a pool.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            self.checkouts += 1
+            self.timeouts += timed_out
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+class _CheckoutTimingMixin:
+    """
+    Times every ``connect()`` on a queue pool, including pre-ping and the wait for a free slot.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def connect(self):
+        started = time.perf_counter()
+        timed_out = False
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            self.stats.record(time.perf_counter() - started, timed_out)
+
+    def status_dict(self) -> dict:
+        stats = self.stats
+        return {
+            "size": self.size(),
+            "checked_in": self.checkedin(),
+            "checked_out": self.checkedout(),
+            "overflow": max(self.overflow(), 0),
+            "max_overflow": self._max_overflow,
+            "checkouts": stats.checkouts,
+            "timeouts": stats.timeouts,
+            "wait_seconds_total": stats.wait_seconds_total,
+            "wait_seconds_avg": stats.wait_seconds_total / stats.checkouts if stats.checkouts else 0.0,
+            "wait_seconds_max": stats.wait_seconds_max,
+        }
+
+class InstrumentedQueuePool(_CheckoutTimingMixin, QueuePool):
+    pass
+
+class InstrumentedAsyncQueuePool(_CheckoutTimingMixin, AsyncAdaptedQueuePool):
+    pass
+
+def engine_options() -> dict:
+    """
+    Pool and logging options shared by the sync and async engines, taken from settings.
+    """
+    return {
+        "echo": settings.db_echo,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_timeout": settings.db_pool_timeout,
+    }
+
+# Numbers after '$' are asyncpg placeholders, not literals.
+_LITERALS = re.compile(r"'(?:[^']|'')*'|(?<!\$)\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LISTS = re.compile(r"\(\s*(?:\?|%s|%\(\w+\)s|\$\d+|:\w+)(?:\s*,\s*(?:\?|%s|%\(\w+\)s|\$\d+|:\w+))*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+slow_queries = metrics.registry.register(metrics.Counter("db_slow_queries_total", "Statements slower than db_slow_query_ms, by route.", ("route",)))
+n_plus_one_queries = metrics.registry.register(metrics.Counter("db_n_plus_one_total", "Requests that repeated one statement more than db_n_plus_one_threshold times, by route.", ("route",)))
+
+@lru_cache(maxsize=2048)
+def normalize_statement(statement: str) -> str:
+    """
+    Reduces a statement to its shape: literals become '?' and parameter lists of any length
+    (expanded IN clauses, VALUES rows) become '(...)', so the same query with different
+    arguments normalizes to the same string.
+    """
+    statement = _LITERALS.sub("?", statement)
+    statement = _PLACEHOLDER_LISTS.sub("(...)", statement)
+    return _WHITESPACE.sub(" ", statement).strip()
+
+class QueryDiagnostics:
+    """
+    Opt-in replacement for ``echo``: instead of logging every statement, logs only statements
+    slower than ``slow_query_ms`` and, per HTTP request, statements whose normalized form runs
+    more than ``n_plus_one_threshold`` times (the signature of an N+1 loop). Both carry the
+    route of the request that issued them, taken from ``metrics.current_request``.
+    """
+    def __init__(self, slow_query_ms: float, n_plus_one_threshold: int):
+        self.slow_query_seconds = slow_query_ms / 1000
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.enabled = False
+
+    def enable(self):
+        if not self.enabled:
+            event.listen(Engine, "before_cursor_execute", self._before_cursor_execute)
+            event.listen(Engine, "after_cursor_execute", self._after_cursor_execute)
+            event.listen(Engine, "handle_error", self._handle_error)
+            self.enabled = True
+            logger.info(f'Query diagnostics enabled: slow query threshold {self.slow_query_seconds * 1000:g}ms, N+1 threshold {self.n_plus_one_threshold}')
+
+    def disable(self):
+        if self.enabled:
+            event.remove(Engine, "before_cursor_execute", self._before_cursor_execute)
+            event.remove(Engine, "after_cursor_execute", self._after_cursor_execute)
+            event.remove(Engine, "handle_error", self._handle_error)
+            self.enabled = False
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("diagnostics_started", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        seconds = time.perf_counter() - conn.info["diagnostics_started"].pop()
+        stats = metrics.current_request.get()
+        route = stats.route if stats is not None else None
+        if seconds >= self.slow_query_seconds:
+            slow_queries.inc(route or "-")
+            logger.warning(f'Slow query ({seconds * 1000:.1f}ms) on route {route or "-"}: {_WHITESPACE.sub(" ", statement)[:1000]}')
+
+        if stats is None:
+            return
+        if stats.statement_counts is None:
+            stats.statement_counts = {}
+        normalized = normalize_statement(statement)
+        count = stats.statement_counts.get(normalized, 0) + 1
+        stats.statement_counts[normalized] = count
+        # Reported once per statement and request, when the threshold is first crossed.
+        if count == self.n_plus_one_threshold + 1:
+            n_plus_one_queries.inc(route or "-")
+            logger.warning(f'Possible N+1 on route {route or "-"}: statement ran more than {self.n_plus_one_threshold} times in one request: {normalized[:1000]}')
+
+    def _handle_error(self, context):
+        if context.connection is not None:
+            started = context.connection.info.get("diagnostics_started")
+            if started:
+                started.pop()
+
+query_diagnostics = QueryDiagnostics(settings.db_slow_query_ms, settings.db_n_plus_one_threshold)
+
+def parse_hosts(hosts: str | None, default_port: int) -> list[tuple[str, int]]:
+    """
+    Parses a comma separated 'host[:port]' list.
+    """
+    parsed = []
+    for entry in (hosts or "").split(","):
+        if entry.strip():
+            host, _, port = entry.strip().partition(":")
+            parsed.append((host, int(port) if port else default_port))
+    return parsed
+
+class ReplicaRouter:
+    """
+    Spreads reads over the read replicas round-robin.
+
+    A replica whose connection fails (refused, dropped, or timed out) is taken out of rotation for
+    ``retry_interval`` seconds and then tried again by the next read that reaches it. When every
+    replica is out, ``pick`` returns None and callers fall back to the primary.
+    Engines are created per replica on first use, separately for sync and async callers.
+    """
+    def __init__(self, connection: "DBConnection", hosts: list[tuple[str, int]], retry_interval: float):
+        self.connection = connection
+        self.hosts = hosts
+        self.retry_interval = retry_interval
+        self.down_until = [0.0] * len(hosts)
+        self.failures = [0] * len(hosts)
+        self._engines = {"sync": {}, "async": {}}
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def _engine(self, kind: str, index: int):
+        engines = self._engines[kind]
+        if index not in engines:
+            host, port = self.hosts[index]
+            if kind == "sync":
+                url = str(self.connection.get_db_connection_url(host=host, port=port))
+                engine = create_engine(url, poolclass=InstrumentedQueuePool, **engine_options())
+                events_target = engine
+            else:
+                url = str(self.connection.get_db_connection_url(scheme=self.connection.db_async_scheme, host=host, port=port))
+                engine = create_async_engine(url, poolclass=InstrumentedAsyncQueuePool, **engine_options())
+                events_target = engine.sync_engine
+            event.listen(events_target, "handle_error", lambda context: self._on_error(index, context))
+            engines[index] = engine
+            logger.debug(f'Replica {kind} engine created for {host}:{port}.')
+        return engines[index]
+
+    def _on_error(self, index: int, context):
+        if context.connection is None or context.is_disconnect or isinstance(context.sqlalchemy_exception, exc.TimeoutError):
+            self.mark_down(index)
+
+    def mark_down(self, index: int):
+        with self._lock:
+            self.down_until[index] = time.monotonic() + self.retry_interval
+            self.failures[index] += 1
+        host, port = self.hosts[index]
+        logger.warning(f'Replica {host}:{port} marked down for {self.retry_interval}s')
+
+    def mark_engine_down(self, engine):
+        for engines in self._engines.values():
+            for index, replica_engine in engines.items():
+                if replica_engine is engine and self.down_until[index] <= time.monotonic():
+                    self.mark_down(index)
+
+    def pick(self, kind: str):
+        with self._lock:
+            now = time.monotonic()
+            for _ in range(len(self.hosts)):
+                index = self._next
+                self._next = (self._next + 1) % len(self.hosts)
+                if self.down_until[index] <= now:
+                    break
+            else:
+                return None
+        return self._engine(kind, index)
+
+    def stats(self) -> list[dict]:
+        now = time.monotonic()
+        return [
+            {
+                "host": f"{host}:{port}",
+                "healthy": self.down_until[index] <= now,
+                "failures": self.failures[index],
+                "pools": {
+                    kind: (engines[index].pool if kind == "sync" else engines[index].sync_engine.pool).status_dict()
+                    for kind, engines in self._engines.items() if index in engines
+                },
+            }
+            for index, (host, port) in enumerate(self.hosts)
+        ]
+
 class DBConnection(metaclass=SingletonMetaClass):
     def __init__(self):
         self.db_scheme = settings.db_scheme
+        self.db_async_scheme = settings.db_async_scheme
         self.db_port = settings.db_port
         self.db_username = settings.db_user
         self.db_password = settings.db_password
         self.db_host = settings.db_host
         self.db_path = settings.db_name
+        self.replica_hosts = parse_hosts(settings.db_replica_hosts, settings.db_port)
+        if settings.db_diagnostics:
+            query_diagnostics.enable()
 
-    def get_db_connection_url(self) -> PostgresDsn:
+    def get_db_connection_url(self, scheme: str = None, host: str = None, port: int = None) -> PostgresDsn:
         logger.debug(f'Connecting to db {self.db_path}')
         return MultiHostUrl.build(
-            scheme=self.db_scheme,
+            scheme=scheme or self.db_scheme,
             username=self.db_username,
             password=self.db_password,
-            host=self.db_host,
-            port=self.db_port,
+            host=host or self.db_host,
+            port=port or self.db_port,
             path=self.db_path
         )
 
@@ -37,7 +288,7 @@ class DBConnection(metaclass=SingletonMetaClass):
         if not (hasattr(self, "engine") and isinstance(self.engine, Engine)):
             if not p_db_url:
                 p_db_url = str(self.get_db_connection_url())
-            self.engine = create_engine(p_db_url, echo=True, pool_size=5, max_overflow=20)
+            self.engine = create_engine(p_db_url, poolclass=InstrumentedQueuePool, **engine_options())
             logger.debug('Engine object is now available. Access it using "instance.engine".')
         else:
             logger.debug('Engine object is already created.')
@@ -55,4 +306,84 @@ class DBConnection(metaclass=SingletonMetaClass):
             Create a session object for the db and binds the created engine.
         """
         session = Session(bind=self.get_engine(), expire_on_commit=False)
-        return session
\ No newline at end of file
+        return session
+
+    def create_async_engine(self, p_db_url: str = None):
+        if not (hasattr(self, "async_engine") and isinstance(self.async_engine, AsyncEngine)):
+            if not p_db_url:
+                p_db_url = str(self.get_db_connection_url(scheme=self.db_async_scheme))
+            self.async_engine = create_async_engine(p_db_url, poolclass=InstrumentedAsyncQueuePool, **engine_options())
+            logger.debug('Async engine object is now available. Access it using "instance.async_engine".')
+        else:
+            logger.debug('Async engine object is already created.')
+
+    def get_async_engine(self) -> AsyncEngine:
+        if hasattr(self, "async_engine") and self.async_engine and isinstance(self.async_engine, AsyncEngine):
+            return self.async_engine
+        else:
+            logger.debug('Async engine object was not available, so creating it ...')
+            self.create_async_engine()
+        return self.async_engine
+
+    def create_async_session(self) -> AsyncSession:
+        """
+            Create an async session object for the db and binds the created async engine.
+        """
+        session = AsyncSession(bind=self.get_async_engine(), expire_on_commit=False)
+        return session
+
+    def get_replica_router(self) -> "ReplicaRouter":
+        if not isinstance(getattr(self, "replica_router", None), ReplicaRouter):
+            self.replica_router = ReplicaRouter(self, self.replica_hosts, settings.db_replica_retry_interval)
+        return self.replica_router
+
+    def get_replica_engine(self) -> Engine:
+        """
+            Engine of the next healthy read replica, or of the primary when there is none.
+        """
+        return self.get_replica_router().pick("sync") or self.get_engine()
+
+    def get_replica_async_engine(self) -> AsyncEngine:
+        """
+            Async engine of the next healthy read replica, or of the primary when there is none.
+        """
+        return self.get_replica_router().pick("async") or self.get_async_engine()
+
+    def create_replica_session(self) -> Session:
+        return Session(bind=self.get_replica_engine(), expire_on_commit=False)
+
+    def create_replica_async_session(self) -> AsyncSession:
+        return AsyncSession(bind=self.get_replica_async_engine(), expire_on_commit=False)
+
+    async def connect_replica_async_session(self) -> AsyncSession:
+        """
+            Replica session whose connection is already checked out. A replica that fails to
+            connect is marked down by the router and the next one is tried, ending on the primary,
+            so a dead replica costs a retry instead of a failed request.
+        """
+        for _ in range(len(self.replica_hosts)):
+            session = self.create_replica_async_session()
+            if session.bind is self.get_async_engine():
+                return session
+            try:
+                await session.connection()
+                return session
+            except (exc.OperationalError, exc.InterfaceError, exc.TimeoutError, OSError):
+                # asyncpg raises OSError unwrapped when the host refuses the connection
+                self.get_replica_router().mark_engine_down(session.bind)
+                await session.close()
+        return self.create_async_session()
+
+    def get_pool_stats(self) -> dict:
+        """
+            Live statistics of every pool created so far, keyed by engine.
+        """
+        pools = {}
+        if isinstance(getattr(self, "engine", None), Engine):
+            pools["sync"] = self.engine.pool
+        if isinstance(getattr(self, "async_engine", None), AsyncEngine):
+            pools["async"] = self.async_engine.sync_engine.pool
+        stats = {name: pool.status_dict() for name, pool in pools.items() if hasattr(pool, "status_dict")}
+        if isinstance(getattr(self, "replica_router", None), ReplicaRouter):
+            stats["replicas"] = self.replica_router.stats()
+        return stats
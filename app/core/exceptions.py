@@ -0,0 +1,9 @@
+
+class HashingPoolSaturatedException(Exception):
+    """Exception raised when the password hashing pool has no room for more work."""
+    def __init__(self, message="Too many password hashing requests in flight."):
+        self.message = message
+        super().__init__(self.message)
+
+    def __str__(self):
+        return f"HashingPoolSaturatedException: {self.message}"
@@ -1,4 +1,8 @@
-from logging import Logger
+from logging import Logger, StreamHandler, Formatter
 from app.core.config import settings
 
-logger = Logger(name=settings.app_name, level=settings.log_level)
\ No newline at end of file
+logger = Logger(name=settings.app_name, level=settings.log_level)
+
+_handler = StreamHandler()
+_handler.setFormatter(Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+logger.addHandler(_handler)
@@ -0,0 +1,176 @@
+"""
+In-process Prometheus metrics.
+
+A small registry of counters, gauges and histograms rendered in the Prometheus text format, plus
+per-request accounting of database and password-hashing time. The request in flight is tracked
+in a context variable; SQLAlchemy's cursor events and the hashing executor add to it, so every
+query or hash is attributed to the request that caused it, on any engine, sync or async.
+
+Recording is a dict lookup and a few float additions under a lock, which keeps the middleware
+inside its budget of ``REQUEST_OVERHEAD_BUDGET_US`` microseconds per request
+(see benchmarks/bench_metrics_overhead.py).
+"""
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+REQUEST_OVERHEAD_BUDGET_US = 25
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, *labels, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> list[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return self.header() + [f"{self.name}{_format_labels(self.labels, labels)} {value}" for labels, value in values]
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def dec(self, *labels, amount: float = 1.0):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels, value: float):
+        with self._lock:
+            self._values[labels] = value
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = (), buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, *labels, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    def render(self) -> list[str]:
+        with self._lock:
+            values = [(labels, list(counts), total) for labels, (counts, total) in self._values.items()]
+        lines = self.header()
+        for labels, counts, total in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, labels)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, labels)} {cumulative}")
+        return lines
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+        self.collectors = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector):
+        """
+        Registers a callable returning extra metrics, built at scrape time (e.g. pool gauges).
+        """
+        self.collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        for collector in self.collectors:
+            for metric in collector():
+                lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+http_requests = registry.register(Counter("http_requests_total", "HTTP requests by route, method and status.", ("route", "method", "status")))
+http_request_seconds = registry.register(Histogram("http_request_duration_seconds", "HTTP request latency by route.", ("route", "method")))
+http_in_flight = registry.register(Gauge("http_requests_in_flight", "HTTP requests being served."))
+request_db_seconds = registry.register(Histogram("http_request_db_seconds", "Database time per HTTP request by route.", ("route", "method")))
+request_db_queries = registry.register(Histogram("http_request_db_queries", "Database queries per HTTP request by route.", ("route", "method"), buckets=COUNT_BUCKETS))
+db_query_seconds = registry.register(Histogram("db_query_duration_seconds", "Duration of individual database queries."))
+request_hashing_seconds = registry.register(Histogram("http_request_hashing_seconds", "Password hashing time per HTTP request that hashed, by route.", ("route", "method")))
+password_hash_seconds = registry.register(Histogram("password_hash_duration_seconds", "Wall time of bcrypt hash and verify calls, queueing included."))
+
+class RequestStats:
+    __slots__ = ("scope", "db_seconds", "db_queries", "hashing_seconds", "statement_counts")
+
+    def __init__(self, scope: dict = None):
+        self.scope = scope
+        self.db_seconds = 0.0
+        self.db_queries = 0
+        self.hashing_seconds = 0.0
+        self.statement_counts = None
+
+    @property
+    def route(self) -> str | None:
+        route = self.scope.get("route") if self.scope else None
+        return getattr(route, "path", None)
+
+current_request: ContextVar[RequestStats | None] = ContextVar("current_request", default=None)
+
+def record_hashing(seconds: float):
+    password_hash_seconds.observe(value=seconds)
+    stats = current_request.get()
+    if stats is not None:
+        stats.hashing_seconds += seconds
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started"].pop()
+    seconds = time.perf_counter() - started
+    db_query_seconds.observe(value=seconds)
+    stats = current_request.get()
+    if stats is not None:
+        stats.db_seconds += seconds
+        stats.db_queries += 1
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(context):
+    if context.connection is not None:
+        started = context.connection.info.get("query_started")
+        if started:
+            started.pop()
@@ -0,0 +1,119 @@
+import json
+import time
+import jwt
+from app.core import metrics
+from app.core import ratelimit
+from app.core.config import settings
+from app.core.security import decode_jwt_token_cached
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording latency, status, in-flight count, database time and queries,
+    and password hashing time of every HTTP request. Requests are labelled with their route
+    template (``/books/{book_id}``), not the raw path, to keep the number of series bounded.
+    Unlike ``BaseHTTPMiddleware`` it does not wrap the response body, so streaming responses
+    are passed through untouched and timed until their last chunk is sent.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = metrics.RequestStats(scope)
+        token = metrics.current_request.set(stats)
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        metrics.http_in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            seconds = time.perf_counter() - started
+            metrics.http_in_flight.dec()
+            metrics.current_request.reset(token)
+            route = scope.get("route")
+            labels = (getattr(route, "path", UNMATCHED_ROUTE), scope["method"])
+            metrics.http_requests.inc(*labels, status)
+            metrics.http_request_seconds.observe(*labels, value=seconds)
+            metrics.request_db_seconds.observe(*labels, value=stats.db_seconds)
+            metrics.request_db_queries.observe(*labels, value=stats.db_queries)
+            if stats.hashing_seconds:
+                metrics.request_hashing_seconds.observe(*labels, value=stats.hashing_seconds)
+
+class AdmissionMiddleware:
+    """
+    Pure ASGI middleware applying the rate and concurrency limits of ``app.core.ratelimit`` to
+    the route classes it defines; other requests pass straight through. A request keeps its
+    concurrency slot until its response, streamed bodies included, has been sent.
+    """
+    def __init__(self, app, classes: list[ratelimit.RouteClass] = None, store=None):
+        self.app = app
+        self.classes = ratelimit.route_classes() if classes is None else classes
+        self.store = ratelimit.create_bucket_store(settings.rate_limit_url) if store is None else store
+
+    def client_key(self, scope, route_class: ratelimit.RouteClass) -> str:
+        headers = dict(scope["headers"])
+        if route_class.by_user:
+            scheme, _, token = headers.get(b"authorization", b"").decode("latin-1").partition(" ")
+            if scheme.lower() == "bearer" and token:
+                try:
+                    return f"{route_class.name}:user:{decode_jwt_token_cached(token)['id']}"
+                except (jwt.PyJWTError, KeyError):
+                    pass
+        forwarded = headers.get(b"x-forwarded-for") if settings.rate_limit_trust_forwarded else None
+        if forwarded:
+            ip = forwarded.decode("latin-1").split(",")[0].strip()
+        else:
+            ip = scope["client"][0] if scope.get("client") else "unknown"
+        return f"{route_class.name}:ip:{ip}"
+
+    async def reject(self, send, status: int, detail: str, retry_after: str):
+        body = json.dumps({"detail": detail}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", retry_after.encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.rate_limit_enabled:
+            await self.app(scope, receive, send)
+            return
+        route_class = next((c for c in self.classes if c.matches(scope["method"], scope["path"])), None)
+        if route_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        allowed, wait = await self.store.take(self.client_key(scope, route_class), route_class.rate, route_class.burst)
+        if not allowed:
+            ratelimit.rejected_requests.inc(route_class.name, "rate_limited")
+            await self.reject(send, 429, "Too many requests, retry later.", ratelimit.retry_after_header(wait))
+            return
+        if route_class.in_flight >= route_class.max_concurrency:
+            ratelimit.rejected_requests.inc(route_class.name, "overloaded")
+            await self.reject(send, 503, "Server is busy, retry later.", str(settings.load_shed_retry_after))
+            return
+
+        route_class.in_flight += 1
+        ratelimit.class_in_flight.inc(route_class.name)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            route_class.in_flight -= 1
+            ratelimit.class_in_flight.dec(route_class.name)
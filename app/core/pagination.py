@@ -0,0 +1,56 @@
+import base64
+import json
+import math
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable
+from fastapi import HTTPException, status
+
+def encode_cursor(values: list) -> str:
+    """
+    Encodes the sort key of the last row of a page as an opaque keyset cursor.
+    """
+    return base64.urlsafe_b64encode(json.dumps(values, separators=(",", ":")).encode()).decode()
+
+def decode_cursor(cursor: str, size: int) -> list:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        values = None
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor.")
+    return values
+
+def decode_created_at_cursor(cursor: str) -> tuple[datetime, str]:
+    """
+    Decodes a (created_at, id) keyset cursor.
+    """
+    created_at, id = decode_cursor(cursor, 2)
+    try:
+        return datetime.fromisoformat(created_at), str(id)
+    except (TypeError, ValueError):
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor.")
+
+def decode_rank_cursor(cursor: str) -> tuple[float, str]:
+    """
+    Decodes a (rank, id) keyset cursor.
+    """
+    rank, id = decode_cursor(cursor, 2)
+    if isinstance(rank, bool) or not isinstance(rank, (int, float)) or not math.isfinite(rank) or not isinstance(id, str):
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor.")
+    return float(rank), id
+
+async def stream_page(rows: AsyncIterator, limit: int, serialize: Callable[[Any], str], cursor_of: Callable[[Any], list], message: str) -> AsyncIterator[bytes]:
+    """
+    Streams one keyset page in the ``ResponseSchema`` envelope, sending each row as soon as it is
+    serialized. ``rows`` must yield up to ``limit + 1`` rows; the extra row only signals that
+    there is a next page, whose cursor is built from the last row sent.
+    """
+    yield f'{{"status":"success","message":{json.dumps(message)},"data":{{"items":['.encode()
+    sent, last, next_cursor = 0, None, None
+    async for row in rows:
+        if sent == limit:
+            next_cursor = encode_cursor(cursor_of(last))
+            break
+        yield (b"," if sent else b"") + serialize(row).encode()
+        sent, last = sent + 1, row
+    yield f'],"next_cursor":{json.dumps(next_cursor)}}}}}'.encode()
@@ -0,0 +1,125 @@
+"""
+Admission control for expensive endpoints: token-bucket rate limits and concurrency limits.
+
+Requests are matched to a route class by path prefix. Every class has a token bucket per client,
+keyed by user id when the request carries a valid bearer token and by client IP otherwise, and
+a cap on the requests of the class in flight in this process. Over the rate a request gets 429;
+over the concurrency cap it gets 503. Both carry ``Retry-After``, and both are answered before
+any work is queued, so a burst is turned away instead of piling up behind the bcrypt pool or
+the scorer until every request times out.
+
+Buckets live in this process by default. With ``rate_limit_url`` set they live in Redis and are
+shared by every worker and node; if Redis fails, the process falls back to its own buckets.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from app.core import metrics
+from app.core.config import settings
+from app.core.logging import logger
+
+rejected_requests = metrics.registry.register(metrics.Counter("http_requests_rejected_total", "Requests turned away by admission control, by route class and reason.", ("route_class", "reason")))
+class_in_flight = metrics.registry.register(metrics.Gauge("http_route_class_in_flight", "Requests in flight per rate-limited route class.", ("route_class",)))
+
+class TokenBucketStore:
+    """
+    In-process token buckets, at most ``max_keys`` of them; the least recently used are dropped,
+    which at worst gives an idle client a full bucket again.
+    """
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def take(self, key: str, rate: float, burst: float, cost: float = 1.0) -> tuple[bool, float]:
+        """
+        Takes ``cost`` tokens from the bucket refilling at ``rate`` per second up to ``burst``.
+        Returns (allowed, seconds until enough tokens are back when not allowed).
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, 0.0 if allowed else (cost - tokens) / rate
+
+# Refill and take in one round trip; the Redis clock is used so nodes with skewed clocks agree.
+TAKE_SCRIPT = """
+local now = redis.call('TIME')
+now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+local rate, burst, cost = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or burst
+local updated = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+local allowed = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+class RedisTokenBucketStore:
+    """
+    Token buckets in Redis, shared by every process using the same ``url``. Needs the optional
+    ``redis`` package.
+    """
+    KEY_PREFIX = "ratelimit:"
+
+    def __init__(self, url: str, fallback: TokenBucketStore):
+        try:
+            import redis.asyncio
+        except ImportError:
+            raise RuntimeError("The 'redis' package is required for a shared rate limit backend.")
+        self.client = redis.asyncio.from_url(url)
+        self.script = self.client.register_script(TAKE_SCRIPT)
+        self.fallback = fallback
+
+    async def take(self, key: str, rate: float, burst: float, cost: float = 1.0) -> tuple[bool, float]:
+        try:
+            allowed, tokens = await self.script(keys=[self.KEY_PREFIX + key], args=[rate, burst, cost])
+        except Exception as e:
+            logger.warning(f'Shared rate limit backend failed, using local buckets: {e}')
+            return await self.fallback.take(key, rate, burst, cost)
+        tokens = float(tokens)
+        return bool(allowed), 0.0 if allowed else (cost - tokens) / rate
+
+def create_bucket_store(url: str | None):
+    local = TokenBucketStore(settings.rate_limit_max_keys)
+    if not url:
+        return local
+    return RedisTokenBucketStore(url, fallback=local)
+
+class RouteClass:
+    def __init__(self, name: str, prefixes: tuple[str, ...], per_minute: float, burst: int, max_concurrency: int, methods: tuple[str, ...] = None, by_user: bool = True):
+        self.name = name
+        self.prefixes = prefixes
+        self.methods = methods
+        self.rate = per_minute / 60
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self.by_user = by_user
+        self.in_flight = 0
+
+    def matches(self, method: str, path: str) -> bool:
+        return (self.methods is None or method in self.methods) and path.startswith(self.prefixes)
+
+def route_classes() -> list[RouteClass]:
+    return [
+        # Keyed by IP only: the caller is not authenticated yet, and bcrypt is what is being protected.
+        RouteClass("auth", ("/auth/login", "/auth/signup"), settings.rate_limit_auth_per_minute, settings.rate_limit_auth_burst, settings.max_concurrency_auth, methods=("POST",), by_user=False),
+        RouteClass("recommendation", ("/recommendations",), settings.rate_limit_recommendation_per_minute, settings.rate_limit_recommendation_burst, settings.max_concurrency_recommendation),
+        RouteClass("export", ("/exports",), settings.rate_limit_export_per_minute, settings.rate_limit_export_burst, settings.max_concurrency_export),
+    ]
+
+def retry_after_header(seconds: float) -> str:
+    return str(max(1, math.ceil(seconds)))
@@ -1,17 +1,79 @@
-from passlib.context import CryptContext
 from app.core.config import settings
 from app.core.constants import tzinfo
 from datetime import datetime, timedelta
+from app.core.exceptions import HashingPoolSaturatedException
+from app.core.cache import TTLCache
+from app.core.metrics import record_hashing
 from app.modules.auth.schemas import PayloadSchema
+from concurrent.futures import ProcessPoolExecutor
+import asyncio
+import functools
+import hashlib
+import threading
+import time
 import jwt
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+@functools.cache
+def get_pwd_context():
+    """
+    Builds the bcrypt context on first use. Hashing runs in the hashing executor's processes,
+    so the API process itself never needs passlib's backend loaded.
+    """
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 def get_password_hash(password: str):
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
+
+class HashingExecutor:
+    """
+    Runs bcrypt in a dedicated process pool so hashing scales across cores without holding
+    threadpool slots. At most ``max_pending`` calls may be running or queued; past that,
+    callers get HashingPoolSaturatedException instead of waiting in an unbounded queue.
+    """
+    def __init__(self, max_workers: int = None, max_pending: int = 64):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    async def run(self, fn, *args):
+        with self._lock:
+            if self.pending >= self.max_pending:
+                raise HashingPoolSaturatedException()
+            self.pending += 1
+        started = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            record_hashing(time.perf_counter() - started)
+            with self._lock:
+                self.pending -= 1
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+hashing_executor = HashingExecutor(max_workers=settings.hashing_workers, max_pending=settings.hashing_max_pending)
+
+async def get_password_hash_async(password: str) -> str:
+    return await hashing_executor.run(get_password_hash, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await hashing_executor.run(verify_password, plain_password, hashed_password)
 
 def create_jwt_token(payload: PayloadSchema) -> str:
     SECRET_KEY = settings.secret_key
@@ -30,4 +92,18 @@ def decode_jwt_token(token: str) -> dict:
     SECRET_KEY = settings.secret_key
     JWT_HASHING_ALGORITHM = settings.jwt_hashing_algorithm
     payload = jwt.decode(token, SECRET_KEY, JWT_HASHING_ALGORITHM)
-    return payload
\ No newline at end of file
+    return payload
+
+token_cache = TTLCache(maxsize=settings.identity_cache_size, ttl=settings.identity_cache_ttl)
+
+def decode_jwt_token_cached(token: str) -> dict:
+    """
+    Decodes a token, remembering the payload under the token's hash until the cache TTL
+    or the token's own expiry, whichever comes first.
+    """
+    key = hashlib.sha256(token.encode()).hexdigest()
+    payload = token_cache.get(key)
+    if payload is None:
+        payload = decode_jwt_token(token)
+        token_cache.set(key, payload, ttl=min(settings.identity_cache_ttl, payload['exp'] - time.time()))
+    return payload
@@ -1,3 +1,5 @@
+import importlib
+import threading
 import re
 
 def extract_violating_column(error_msg: str):
@@ -10,4 +12,27 @@ def extract_violating_column(error_msg: str):
         column_name = match.group(1)  # Extracts the column name, e.g., "email"
         conflicting_value = match.group(2)  # Extracts the conflicting value, e.g., "yashuranparia@gmail.com"
         return column_name, conflicting_value
-    return None, None
\ No newline at end of file
+    return None, None
+
+class LazyModule:
+    """
+    Stand-in for a module that is imported on first attribute access, so importing a module
+    that only sometimes needs a heavy dependency (NumPy, SciPy, the model code) stays cheap.
+    """
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def __getattr__(self, attr: str):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+    def __repr__(self) -> str:
+        return f"<lazy module '{self._name}'>"
+
+def lazy_import(name: str) -> LazyModule:
+    return LazyModule(name)
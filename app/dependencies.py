@@ -1,4 +1,12 @@
+from fastapi import Depends, HTTPException, Request, status
+from typing import Annotated
+from sqlalchemy.ext.asyncio import AsyncSession
+import jwt
 from app.core.db import DBConnection
+from app.core.security import decode_jwt_token_cached
+from app.modules.auth.services import oauth2_scheme
+from app.modules.users import services as user_services
+from app.modules.users.schemas import UserData
 
 def get_db():
     """
@@ -10,4 +18,65 @@ def get_db():
     try:
         yield session
     finally:
-        session.close()
\ No newline at end of file
+        session.close()
+
+async def get_async_db():
+    """
+    Dependency to get an async database session.
+    Routes using it await their queries on the event loop instead of holding a threadpool slot.
+    """
+    db = DBConnection()
+    session = db.create_async_session()
+    try:
+        yield session
+    finally:
+        await session.close()
+
+async def get_read_db():
+    """
+    Dependency to get an async session on a read replica (the primary when none is healthy).
+    For read-only routes that can tolerate replication lag: search, listings, recommendations.
+    """
+    session = await DBConnection().connect_replica_async_session()
+    try:
+        yield session
+    finally:
+        await session.close()
+
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+async def get_routed_db(request: Request):
+    """
+    Dependency to get a session routed by request type: replicas for reads, the primary for writes.
+    """
+    db = DBConnection()
+    if request.method in READ_METHODS:
+        session = await db.connect_replica_async_session()
+    else:
+        session = db.create_async_session()
+    try:
+        yield session
+    finally:
+        await session.close()
+
+async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)], session: Annotated[AsyncSession, Depends(get_async_db)]) -> UserData:
+    """
+    Dependency to get the authenticated user.
+    Decoded tokens and user rows are cached, so a warm request does not touch the database.
+    """
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    try:
+        payload = decode_jwt_token_cached(token)
+    except jwt.InvalidTokenError:
+        raise credentials_exception
+    try:
+        user = await user_services.get_user_cached(session, payload['id'])
+    except HTTPException:
+        raise credentials_exception
+    if not user.is_active:
+        raise credentials_exception
+    return user
\ No newline at end of file
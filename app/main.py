@@ -1,11 +1,45 @@
+import asyncio
 from fastapi import FastAPI
+from contextlib import asynccontextmanager
 from app.core.config import settings
 from app.core.logging import logger
+from app.core.security import hashing_executor
+from app.core.middleware import MetricsMiddleware, AdmissionMiddleware
+from app import worker as scheduler
 from app.modules.auth import routes as auth_routes
+from app.modules.users import routes as user_routes
+from app.modules.books import routes as book_routes
+from app.modules.ratings import routes as rating_routes
+from app.modules.recommendation import routes as recommendation_routes
+from app.modules.recommendation import services as rec_services
+from app.modules.metrics import routes as metrics_routes
+from app.modules.exports import routes as export_routes
 
-app = FastAPI(title='Book Recommendation System')
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.recommendation_preload:
+        await asyncio.to_thread(rec_services.preload_models)
+    worker = None
+    if settings.worker_enabled:
+        worker = scheduler.Worker(scheduler.default_jobs())
+        worker.start()
+    yield
+    if worker is not None:
+        await asyncio.to_thread(worker.stop)
+    hashing_executor.shutdown()
+
+app = FastAPI(title='Book Recommendation System', lifespan=lifespan)
+# Added first so it runs inside MetricsMiddleware and rejected requests are still counted.
+app.add_middleware(AdmissionMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(auth_routes.router)
+app.include_router(user_routes.router)
+app.include_router(book_routes.router)
+app.include_router(rating_routes.router)
+app.include_router(recommendation_routes.router)
+app.include_router(metrics_routes.router)
+app.include_router(export_routes.router)
 
 @app.get('/')
 def health_check():
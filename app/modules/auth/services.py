@@ -1,9 +1,10 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.modules.auth.schemas import UserSignup, UserLogin, Token, PayloadSchema
 from app.modules.users import repository as user_repo
 from fastapi import HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from app.core.security import verify_password, create_jwt_token
+from app.core.security import verify_password_async, create_jwt_token
+from app.core.exceptions import HashingPoolSaturatedException
 from app.core.logging import logger
 from app.modules.users.exceptions import UserAlreadyExistsException
 
@@ -12,27 +13,41 @@ oauth2_scheme = OAuth2PasswordBearer(
     # scopes={"user-r": "Read permission for user.", 'user-w': "Write permission for user."}
     )  
 
-def user_signup(session: Session, user_data: UserSignup):
+async def user_signup(session: AsyncSession, user_data: UserSignup):
     """
     Function to handle user signup.
     This function will contain the logic for signing up a user.
     """
     try: 
-        user_repo.user_create(session, user_data.model_dump(exclude_unset=True))
+        await user_repo.user_create(session, user_data.model_dump(exclude_unset=True))
     except UserAlreadyExistsException as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e),
         )
+    except HashingPoolSaturatedException as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e),
+            headers={"Retry-After": "1"},
+        )
 
-def user_login(session: Session, credentials: UserLogin):
+async def user_login(session: AsyncSession, credentials: UserLogin):
     """
     Function to handle user login.
     This function will contain the logic for logging in a user.
     """
-    user = user_repo.get_user(session, email=credentials.email)
+    user = await user_repo.get_user(session, email=credentials.email)
     payload = PayloadSchema(id=user.id)
-    if verify_password(credentials.password, user.password):
+    try:
+        verified = await verify_password_async(credentials.password, user.password)
+    except HashingPoolSaturatedException as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e),
+            headers={"Retry-After": "1"},
+        )
+    if verified:
         access_token = create_jwt_token(payload)
         return Token(access_token=access_token, token_type='bearer')
     logger.info('password not verified')
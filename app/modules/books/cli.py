@@ -0,0 +1,36 @@
+"""
+Catalog jobs for the books module.
+
+    python -m app.modules.books.cli import data/books.csv
+    python -m app.modules.books.cli import data/BX-Books.csv --delimiter ';' --encoding latin-1
+"""
+import argparse
+from app.modules.books import ingest
+
+def import_catalog(args: argparse.Namespace):
+    stats = ingest.import_books(
+        args.path,
+        format=args.format,
+        chunk_size=args.chunk_size,
+        delimiter=args.delimiter,
+        encoding=args.encoding,
+    )
+    print(stats)
+
+def main(argv: list[str] = None):
+    parser = argparse.ArgumentParser(prog="app.modules.books.cli", description="Book catalog jobs.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = commands.add_parser("import", help="Bulk load a CSV or JSONL catalog file (optionally gzipped).")
+    import_parser.add_argument("path")
+    import_parser.add_argument("--format", choices=("csv", "jsonl"), default=None, help="Defaults to the file extension.")
+    import_parser.add_argument("--chunk-size", type=int, default=50_000)
+    import_parser.add_argument("--delimiter", default=",")
+    import_parser.add_argument("--encoding", default="utf-8")
+    import_parser.set_defaults(handler=import_catalog)
+
+    args = parser.parse_args(argv)
+    args.handler(args)
+
+if __name__ == "__main__":
+    main()
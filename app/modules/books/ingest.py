@@ -0,0 +1,163 @@
+"""
+Streaming catalog import.
+
+Records are read from CSV or JSONL a chunk at a time, written into a temporary staging
+table with PostgreSQL ``COPY`` and upserted into ``book`` with one statement per chunk,
+so memory stays flat whatever the file size.
+"""
+import csv
+import gzip
+import io
+import json
+import re
+import time
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator
+from app.core.db import DBConnection
+from app.core.logging import logger
+
+BOOK_COLUMNS = ("id", "title", "author", "description", "published_year", "image")
+
+# Source column names (normalised to snake_case) accepted for every book column, in order of preference.
+# Covers our own export plus the Goodreads (books.csv) and Book-Crossing (BX-Books.csv) dumps.
+FIELD_ALIASES = {
+    "id": ("id", "book_id", "isbn13", "isbn"),
+    "title": ("title", "original_title", "book_title"),
+    "author": ("author", "authors", "book_author"),
+    "description": ("description",),
+    "published_year": ("published_year", "original_publication_year", "publication_year", "year_of_publication"),
+    "image": ("image", "image_url", "image_url_l", "image_url_m"),
+}
+
+CREATE_STAGING_SQL = """
+    CREATE TEMP TABLE IF NOT EXISTS book_staging (
+        id text,
+        title text,
+        author text,
+        description text,
+        published_year integer,
+        image text
+    ) ON COMMIT DELETE ROWS
+"""
+
+COPY_SQL = f"COPY book_staging ({', '.join(BOOK_COLUMNS)}) FROM STDIN WITH (FORMAT csv)"
+
+UPSERT_SQL = """
+    INSERT INTO book (id, title, author, description, published_year, image)
+    SELECT DISTINCT ON (id)
+        id, left(title, 255), left(author, 255), left(description, 1000), published_year, left(image, 255)
+    FROM book_staging
+    ORDER BY id
+    ON CONFLICT (id) DO UPDATE SET
+        title = EXCLUDED.title,
+        author = EXCLUDED.author,
+        description = EXCLUDED.description,
+        published_year = EXCLUDED.published_year,
+        image = EXCLUDED.image,
+        updated_at = now(),
+        deleted_at = NULL
+    WHERE (book.title, book.author, book.description, book.published_year, book.image, book.deleted_at)
+        IS DISTINCT FROM (EXCLUDED.title, EXCLUDED.author, EXCLUDED.description, EXCLUDED.published_year, EXCLUDED.image, NULL)
+"""
+
+def _normalise_key(key: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", key.strip().lower()).strip("_")
+
+def _open(path: Path, encoding: str):
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", encoding=encoding, newline="")
+    return open(path, "r", encoding=encoding, newline="")
+
+def detect_format(path: str | Path) -> str:
+    suffixes = Path(path).suffixes
+    return "jsonl" if {".jsonl", ".ndjson"} & set(suffixes) else "csv"
+
+def read_records(path: str | Path, format: str = None, delimiter: str = ",", encoding: str = "utf-8") -> Iterator[dict]:
+    """
+    Lazily yields one dict per record of a CSV or JSONL file (optionally gzipped).
+    """
+    path = Path(path)
+    format = format or detect_format(path)
+    with _open(path, encoding) as file:
+        if format == "jsonl":
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from csv.DictReader(file, delimiter=delimiter)
+
+def _parse_year(value) -> int | None:
+    try:
+        year = int(float(value))
+    except (TypeError, ValueError):
+        return None
+    return year if year > 0 else None
+
+def normalise_record(record: dict) -> tuple | None:
+    """
+    Maps a source record onto BOOK_COLUMNS. Returns None for records without an id, title or author.
+    """
+    record = {_normalise_key(key): value for key, value in record.items() if key}
+    row = {}
+    for column, aliases in FIELD_ALIASES.items():
+        row[column] = next((record[alias] for alias in aliases if record.get(alias) not in (None, "")), None)
+
+    row["published_year"] = _parse_year(row["published_year"])
+    for column in ("id", "title", "author", "description", "image"):
+        if row[column] is not None:
+            row[column] = str(row[column]).strip() or None
+
+    if not (row["id"] and row["title"] and row["author"]):
+        return None
+    return tuple(row[column] for column in BOOK_COLUMNS)
+
+def chunked(rows: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(rows)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+def copy_rows(cursor, rows: list[tuple]):
+    """
+    Streams ``rows`` into the staging table through ``COPY ... FROM STDIN``.
+    """
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows(rows)
+    buffer.seek(0)
+    cursor.copy_expert(COPY_SQL, buffer)
+
+def import_books(path: str | Path, format: str = None, chunk_size: int = 50_000, delimiter: str = ",", encoding: str = "utf-8") -> dict:
+    """
+    Function to bulk load a catalog file into the book table.
+    Each chunk is copied, upserted and committed on its own, so a failure only loses the current chunk.
+    """
+    started = time.perf_counter()
+    stats = {"read": 0, "skipped": 0, "upserted": 0}
+
+    def rows():
+        for record in read_records(path, format=format, delimiter=delimiter, encoding=encoding):
+            stats["read"] += 1
+            row = normalise_record(record)
+            if row is None:
+                stats["skipped"] += 1
+                continue
+            yield row
+
+    connection = DBConnection().get_engine().raw_connection()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(CREATE_STAGING_SQL)
+            for chunk in chunked(rows(), chunk_size):
+                copy_rows(cursor, chunk)
+                cursor.execute(UPSERT_SQL)
+                stats["upserted"] += cursor.rowcount
+                connection.commit()
+                logger.info(f'Imported {stats["read"]} records from {path}')
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
+
+    stats["seconds"] = round(time.perf_counter() - started, 2)
+    return stats
@@ -0,0 +1,48 @@
+from sqlalchemy.ext.asyncio import AsyncSession, AsyncResult
+from datetime import datetime
+from sqlalchemy import select, func, or_, tuple_, literal, literal_column, Float
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from app.modules.books.models import Book
+
+async def search_books(session: AsyncSession, q: str, limit: int, after: tuple[float, str] = None) -> list:
+    """
+    Full-text search over title, author and description, widened with trigram matching on
+    title and author so misspelt queries still hit. Both predicates are served by GIN indexes.
+
+    Hits are ranked by full-text rank plus title word similarity and paginated by keyset on
+    (rank, id) rather than OFFSET, so later pages do not sort and discard the rows of earlier ones.
+    """
+    query = func.websearch_to_tsquery(literal_column("'english'", REGCONFIG), q)
+    rank = (func.ts_rank_cd(Book.search_vector, query) + func.word_similarity(q, Book.title)).cast(Float)
+    sql = (
+        select(Book.id, Book.title, Book.author, Book.published_year, Book.image, rank.label('rank'))
+        .where(
+            Book.deleted_at.is_(None),
+            or_(
+                Book.search_vector.op('@@')(query),
+                literal(q).op('<%')(Book.title),
+                literal(q).op('<%')(Book.author),
+            ),
+        )
+        .order_by(rank.desc(), Book.id.desc())
+        .limit(limit)
+    )
+    if after:
+        sql = sql.where(tuple_(rank, Book.id) < tuple_(*after))
+    result = await session.execute(sql)
+    return result.all()
+
+async def list_books(session: AsyncSession, limit: int, after: tuple[datetime, str] = None) -> AsyncResult:
+    """
+    Newest books first, keyset paginated on (created_at, id) so every page is one index range
+    scan however deep it is. Only the listed columns are selected and rows are streamed.
+    """
+    sql = (
+        select(Book.id, Book.title, Book.author, Book.published_year, Book.image, Book.created_at)
+        .where(Book.deleted_at.is_(None))
+        .order_by(Book.created_at.desc(), Book.id.desc())
+        .limit(limit)
+    )
+    if after:
+        sql = sql.where(tuple_(Book.created_at, Book.id) < tuple_(*after))
+    return await session.stream(sql)
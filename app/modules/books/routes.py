@@ -0,0 +1,27 @@
+from fastapi import APIRouter, Depends, Query, status
+from fastapi.responses import StreamingResponse
+from typing import Annotated
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.dependencies import get_read_db
+from app.modules.books import services as book_services
+from app.core.schemas import ResponseSchema
+from app.core.pagination import decode_created_at_cursor
+
+router = APIRouter(prefix="/books", tags=["Books"])
+
+@router.get("", status_code=status.HTTP_200_OK, response_model=ResponseSchema)
+async def list_books(limit: Annotated[int, Query(ge=1, le=1000)] = 50, cursor: str = None):
+    after = decode_created_at_cursor(cursor) if cursor else None
+
+    return StreamingResponse(book_services.stream_books(limit, after), media_type="application/json")
+
+@router.get("/search", status_code=status.HTTP_200_OK, response_model=ResponseSchema)
+async def search_books(
+    session: Annotated[AsyncSession, Depends(get_read_db)],
+    q: Annotated[str, Query(min_length=2, max_length=200)],
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
+    cursor: str = None,
+):
+    page = await book_services.search_books(session, q, limit, cursor)
+
+    return {"status": "success", "message": "Books fetched successfully!", "data": page.model_dump()}
@@ -0,0 +1,15 @@
+from pydantic import BaseModel
+
+class BookSummary(BaseModel):
+    id: str
+    title: str
+    author: str
+    published_year: int | None = None
+    image: str | None = None
+
+class BookSearchHit(BookSummary):
+    rank: float
+
+class BookSearchPage(BaseModel):
+    items: list[BookSearchHit]
+    next_cursor: str | None = None
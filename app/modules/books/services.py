@@ -0,0 +1,33 @@
+from datetime import datetime
+from typing import AsyncIterator
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.db import DBConnection
+from app.core.pagination import encode_cursor, decode_rank_cursor, stream_page
+from app.modules.books import repository as book_repo
+from app.modules.books.schemas import BookSearchHit, BookSearchPage, BookSummary
+
+async def search_books(session: AsyncSession, q: str, limit: int, cursor: str = None) -> BookSearchPage:
+    """
+    Function to search the catalog, one keyset page at a time.
+    """
+    after = decode_rank_cursor(cursor) if cursor else None
+    rows = await book_repo.search_books(session, q, limit + 1, after)
+    items = [BookSearchHit.model_validate(row, from_attributes=True) for row in rows[:limit]]
+    next_cursor = encode_cursor([items[-1].rank, items[-1].id]) if len(rows) > limit else None
+    return BookSearchPage(items=items, next_cursor=next_cursor)
+
+async def stream_books(limit: int, after: tuple[datetime, str] = None) -> AsyncIterator[bytes]:
+    """
+    Function to stream one page of the catalog listing as JSON.
+    The session is opened here rather than injected, as it has to outlive the route handler.
+    """
+    async with await DBConnection().connect_replica_async_session() as session:
+        rows = await book_repo.list_books(session, limit + 1, after)
+        async for chunk in stream_page(
+            rows,
+            limit,
+            serialize=lambda row: BookSummary.model_validate(row, from_attributes=True).model_dump_json(),
+            cursor_of=lambda row: [row.created_at.isoformat(), row.id],
+            message="Books fetched successfully!",
+        ):
+            yield chunk
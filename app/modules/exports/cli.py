@@ -0,0 +1,33 @@
+"""
+Table exports for offline analysis.
+
+    python -m app.modules.exports.cli ratings --format csv --gzip -o ratings.csv.gz
+    python -m app.modules.exports.cli books > books.ndjson
+"""
+import argparse
+import asyncio
+import sys
+from app.modules.exports import services as export_services
+
+async def export(args: argparse.Namespace):
+    output = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        async for chunk in export_services.export_table(args.table, args.format, args.gzip, args.chunk_size):
+            output.write(chunk)
+    finally:
+        if args.output:
+            output.close()
+        else:
+            output.flush()
+
+def main(argv: list[str] = None):
+    parser = argparse.ArgumentParser(prog="app.modules.exports.cli", description="Stream a table out as NDJSON or CSV.")
+    parser.add_argument("table", choices=sorted(export_services.EXPORTS))
+    parser.add_argument("--format", choices=sorted(export_services.FORMATS), default="ndjson")
+    parser.add_argument("--gzip", action="store_true")
+    parser.add_argument("--chunk-size", type=int, default=10_000)
+    parser.add_argument("-o", "--output", default=None, help="Defaults to stdout.")
+    asyncio.run(export(parser.parse_args(argv)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from typing import Annotated, Literal
+from app.dependencies import get_current_user
+from app.modules.exports import services as export_services
+from app.modules.users.schemas import UserData
+
+router = APIRouter(prefix="/exports", tags=["Exports"])
+
+@router.get("/{table}", status_code=status.HTTP_200_OK)
+async def export_table(
+    user: Annotated[UserData, Depends(get_current_user)],
+    table: Literal["books", "ratings"],
+    format: Annotated[Literal["ndjson", "csv"], Query()] = "ndjson",
+    gzip: bool = False,
+):
+    if not user.is_superuser:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Exports are restricted to superusers.")
+    filename = export_services.export_filename(table, format, gzip)
+
+    return StreamingResponse(
+        export_services.export_table(table, format, gzip),
+        media_type="application/gzip" if gzip else export_services.FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
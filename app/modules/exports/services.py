@@ -0,0 +1,72 @@
+"""
+Streaming table exports.
+
+Rows are read through a server-side cursor ``chunk_size`` at a time, encoded a chunk at a time
+and, optionally, gzip-compressed incrementally, so memory stays bounded by one chunk whatever
+the size of the table. Exports read from the replica when one is configured.
+"""
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from typing import AsyncIterator
+from sqlalchemy import select
+from app.core.db import DBConnection
+from app.modules.books.models import Book
+from app.modules.ratings.models import Rating
+
+EXPORTS = {
+    "books": (Book, (Book.id, Book.title, Book.author, Book.description, Book.published_year, Book.image, Book.created_at, Book.updated_at)),
+    "ratings": (Rating, (Rating.user_id, Rating.book_id, Rating.score, Rating.created_at, Rating.updated_at)),
+}
+
+FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialise {type(value).__name__}")
+
+def _encode_ndjson(rows, columns: list[str]) -> bytes:
+    return "".join(json.dumps(dict(zip(columns, row)), default=_json_default) + "\n" for row in rows).encode()
+
+def _encode_csv(rows, columns: list[str]) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows(
+        [value.isoformat() if isinstance(value, datetime) else value for value in row] for row in rows
+    )
+    return buffer.getvalue().encode()
+
+def _csv_header(columns: list[str]) -> bytes:
+    return (",".join(columns) + "\n").encode()
+
+def export_filename(table: str, format: str, compress: bool) -> str:
+    return f"{table}.{format}" + (".gz" if compress else "")
+
+async def export_table(table: str, format: str = "ndjson", compress: bool = False, chunk_size: int = 10_000) -> AsyncIterator[bytes]:
+    """
+    Function to stream every live row of an exportable table as NDJSON or CSV bytes.
+    """
+    model, columns = EXPORTS[table]
+    names = [column.key for column in columns]
+    encode = _encode_ndjson if format == "ndjson" else _encode_csv
+    compressor = zlib.compressobj(wbits=31) if compress else None
+
+    def output(data: bytes) -> bytes:
+        return compressor.compress(data) if compressor else data
+
+    if format == "csv":
+        yield output(_csv_header(names))
+    sql = select(*columns).where(model.deleted_at.is_(None)).execution_options(yield_per=chunk_size)
+    async with await DBConnection().connect_replica_async_session() as session:
+        result = await session.stream(sql)
+        async for partition in result.partitions():
+            data = output(encode(partition, names))
+            if data:
+                yield data
+    if compressor:
+        yield compressor.flush()
@@ -0,0 +1,55 @@
+from fastapi import APIRouter, status
+from fastapi.responses import PlainTextResponse
+from app.core import metrics
+from app.core.db import DBConnection
+from app.core.schemas import ResponseSchema
+from app.modules.recommendation import services as rec_services
+
+router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def collect_pool_metrics() -> list[metrics.Metric]:
+    checked_out = metrics.Gauge("db_pool_checked_out", "Connections checked out of the pool.", ("pool",))
+    size = metrics.Gauge("db_pool_size", "Connections held by the pool.", ("pool",))
+    timeouts = metrics.Counter("db_pool_checkout_timeouts_total", "Checkouts that timed out waiting for a connection.", ("pool",))
+    wait = metrics.Counter("db_pool_checkout_wait_seconds_total", "Time spent waiting to check out a connection.", ("pool",))
+    pools = DBConnection().get_pool_stats()
+    for replica in pools.pop("replicas", []):
+        for kind, pool in replica["pools"].items():
+            pools[f"replica_{kind}:{replica['host']}"] = pool
+    for name, pool in pools.items():
+        checked_out.set(name, value=pool["checked_out"])
+        size.set(name, value=pool["size"])
+        timeouts.inc(name, amount=pool["timeouts"])
+        wait.inc(name, amount=pool["wait_seconds_total"])
+    return [checked_out, size, timeouts, wait]
+
+def collect_cache_metrics() -> list[metrics.Metric]:
+    stats = rec_services.recommendation_cache_stats()
+    lookups = metrics.Counter("recommendation_cache_lookups_total", "Recommendation cache lookups by outcome.", ("outcome",))
+    lookups.inc("local_hit", amount=stats["local_hits"])
+    lookups.inc("shared_hit", amount=stats["shared_hits"])
+    lookups.inc("miss", amount=stats["misses"])
+    hit_ratio = metrics.Gauge("recommendation_cache_hit_ratio", "Share of recommendation cache lookups served from a cache tier.")
+    hit_ratio.set(value=stats["hit_ratio"])
+    return [lookups, hit_ratio]
+
+metrics.registry.register_collector(collect_pool_metrics)
+metrics.registry.register_collector(collect_cache_metrics)
+
+@router.get("", status_code=status.HTTP_200_OK, response_class=PlainTextResponse)
+def prometheus_metrics():
+    return PlainTextResponse(metrics.registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+@router.get("/db-pool", status_code=status.HTTP_200_OK, response_model=ResponseSchema)
+def db_pool_metrics():
+    pools = DBConnection().get_pool_stats()
+
+    return {"status": "success", "message": "Pool statistics fetched successfully!", "data": pools}
+
+@router.get("/recommendation-cache", status_code=status.HTTP_200_OK, response_model=ResponseSchema)
+def recommendation_cache_metrics():
+    stats = rec_services.recommendation_cache_stats()
+
+    return {"status": "success", "message": "Recommendation cache statistics fetched successfully!", "data": stats}
@@ -0,0 +1,14 @@
+from app.core.db import Base
+from sqlalchemy import String, Float, ForeignKey, Index, text
+from sqlalchemy.orm import mapped_column, Mapped
+
+class Rating(Base):
+    __tablename__ = "rating"
+    __table_args__ = (
+        Index("ix_rating_updated_at", "updated_at"),
+        Index("ix_rating_live", "user_id", "book_id", postgresql_where=text("deleted_at IS NULL")),
+    )
+
+    user_id: Mapped[str] = mapped_column(String, ForeignKey("user.id"), primary_key=True, nullable=False)
+    book_id: Mapped[str] = mapped_column(String, ForeignKey("book.id"), primary_key=True, index=True, nullable=False)
+    score: Mapped[float] = mapped_column(Float, nullable=False)
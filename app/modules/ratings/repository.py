@@ -0,0 +1,22 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy import func, null
+from app.modules.ratings.models import Rating
+
+# asyncpg binds at most 32767 parameters per statement; each row binds user_id, book_id and score.
+MAX_UPSERT_ROWS = 32767 // 3
+
+async def ratings_upsert(session: AsyncSession, rows: list[dict]) -> int:
+    """
+    Writes ``rows`` (at most ``MAX_UPSERT_ROWS``) with a single multi-row INSERT ... ON CONFLICT DO UPDATE.
+    Rows whose score did not change are left untouched so their updated_at stays put.
+    Returns the number of rows inserted or updated.
+    """
+    sql = insert(Rating).values(rows)
+    sql = sql.on_conflict_do_update(
+        index_elements=[Rating.user_id, Rating.book_id],
+        set_={"score": sql.excluded.score, "updated_at": func.now(), "deleted_at": null()},
+        where=Rating.score.is_distinct_from(sql.excluded.score) | Rating.deleted_at.is_not(None),
+    )
+    result = await session.execute(sql)
+    return result.rowcount
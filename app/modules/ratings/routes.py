@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Annotated
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError
+from app.dependencies import get_async_db, get_current_user
+from app.modules.ratings.schemas import RatingBatch
+from app.modules.ratings import services as rating_services
+from app.modules.users.schemas import UserData
+from app.core.schemas import ResponseSchema
+
+router = APIRouter(prefix="/ratings", tags=["Ratings"])
+
+@router.post("/batch", status_code=status.HTTP_200_OK, response_model=ResponseSchema)
+async def rate_books(session: Annotated[AsyncSession, Depends(get_async_db)], user: Annotated[UserData, Depends(get_current_user)], rating_batch: RatingBatch):
+    if not user.is_superuser and any(user_id != user.id for user_id, _, _ in rating_batch.ratings):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Ratings can only be submitted for the authenticated user.")
+    try:
+        result = await rating_services.rate_books(session, rating_batch)
+    except IntegrityError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Ratings reference unknown users or books.")
+
+    return {"status": "success", "message": "Ratings stored successfully!", "data": result.model_dump()}
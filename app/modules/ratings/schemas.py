@@ -0,0 +1,13 @@
+from pydantic import BaseModel, Field
+from typing import Annotated
+
+Score = Annotated[float, Field(ge=0, le=10)]
+
+class RatingBatch(BaseModel):
+    # (user_id, book_id, score) triples; validated as tuples rather than one model per rating
+    ratings: list[tuple[str, str, Score]] = Field(min_length=1, max_length=10_000)
+
+class RatingBatchResult(BaseModel):
+    received: int
+    written: int
+    batches: int
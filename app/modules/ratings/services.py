@@ -0,0 +1,62 @@
+"""
+Ratings are the highest-volume write path. Incoming ratings are buffered per request,
+de-duplicated (last score wins) and flushed as bounded multi-row upserts inside a single
+transaction, instead of one statement and one commit per rating.
+
+Throughput target: 20,000 ratings/s per API worker against a local PostgreSQL with the
+default batch size of 1,000 (see benchmarks/bench_ratings.py).
+"""
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.logging import logger
+from app.modules.ratings import repository as rating_repo
+from app.modules.ratings.schemas import RatingBatch, RatingBatchResult
+from app.modules.recommendation import services as rec_services
+
+class RatingWriteBuffer:
+    """
+    Collects ratings keyed by (user_id, book_id) and flushes them in batches of at most ``batch_size`` rows.
+    """
+    def __init__(self, batch_size: int = None):
+        self.batch_size = min(batch_size or settings.ratings_batch_size, rating_repo.MAX_UPSERT_ROWS)
+        self._rows = {}
+
+    def add(self, user_id: str, book_id: str, score: float):
+        self._rows[(user_id, book_id)] = score
+
+    def __len__(self):
+        return len(self._rows)
+
+    async def flush(self, session: AsyncSession) -> tuple[int, int]:
+        """
+        Writes the buffered ratings and commits once. Rows are sent in primary key order so
+        concurrent batches lock rows in the same order and cannot deadlock each other.
+        Returns (rows written, batches sent).
+        """
+        rows = [
+            {"user_id": user_id, "book_id": book_id, "score": score}
+            for (user_id, book_id), score in sorted(self._rows.items())
+        ]
+        written = batches = 0
+        try:
+            for start in range(0, len(rows), self.batch_size):
+                written += await rating_repo.ratings_upsert(session, rows[start:start + self.batch_size])
+                batches += 1
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+        self._rows.clear()
+        return written, batches
+
+async def rate_books(session: AsyncSession, rating_batch: RatingBatch) -> RatingBatchResult:
+    """
+    Function to store a batch of ratings.
+    """
+    buffer = RatingWriteBuffer()
+    for user_id, book_id, score in rating_batch.ratings:
+        buffer.add(user_id, book_id, score)
+    written, batches = await buffer.flush(session)
+    rec_services.invalidate_recommendations({user_id for user_id, _, _ in rating_batch.ratings})
+    logger.debug(f'Stored {written} ratings in {batches} batches')
+    return RatingBatchResult(received=len(rating_batch.ratings), written=written, batches=batches)
@@ -0,0 +1,257 @@
+"""
+Matrix factorization with alternating least squares.
+
+Explicit mode fits the ratings themselves with weighted-lambda regularisation. Implicit mode
+treats every rating as a positive interaction with confidence ``1 + alpha * score``
+(Hu, Koren & Volinsky).
+
+Each half-epoch holds one side's factors fixed and solves every row of the other side
+independently. Rows are solved a block at a time: each row's normal equations are formed with one
+BLAS product over the factors of the columns it rated (far cheaper than materialising per-rating
+outer products), and the whole block is then solved with one batched ``np.linalg.solve``.
+Blocks are spread over a process pool; the rating matrices and the fixed factors are handed to
+workers as ``.npy`` files they memory-map, so nothing large is pickled.
+Each worker process runs its own BLAS, so set ``OMP_NUM_THREADS=1`` (or the equivalent for your
+BLAS) when training with one worker per core.
+
+Every solve depends only on the fixed side and the seed-initialised factors, so results are the
+same whatever the number of workers.
+"""
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import numpy as np
+from scipy import sparse
+from app.core.logging import logger
+
+def solve_rows(ratings: sparse.csr_matrix, fixed: np.ndarray, regularization: float, implicit: bool = False, alpha: float = 40.0, gram: np.ndarray = None) -> np.ndarray:
+    """
+    Solves the least-squares factors of every row of ``ratings`` given the ``fixed`` factors of
+    its columns. ``gram`` is ``fixed.T @ fixed`` and is only used in implicit mode.
+    """
+    n_rows, n_factors = ratings.shape[0], fixed.shape[1]
+    counts = np.diff(ratings.indptr)
+
+    if implicit:
+        weights = (alpha * ratings.data).astype(np.float32)
+        targets = 1.0 + weights
+    else:
+        weights, targets = None, ratings.data
+
+    lhs = np.zeros((n_rows, n_factors, n_factors), dtype=np.float64)
+    for row in np.flatnonzero(counts):
+        start, stop = ratings.indptr[row], ratings.indptr[row + 1]
+        vectors = fixed[ratings.indices[start:stop]]
+        lhs[row] = vectors.T @ (weights[start:stop, None] * vectors if implicit else vectors)
+
+    if implicit:
+        lhs += gram
+        penalty = np.full(n_rows, regularization)
+    else:
+        penalty = regularization * np.maximum(counts, 1)
+    lhs[:, np.arange(n_factors), np.arange(n_factors)] += penalty[:, None]
+
+    rhs = sparse.csr_matrix((targets, ratings.indices, ratings.indptr), shape=ratings.shape) @ fixed
+    return np.linalg.solve(lhs, rhs[:, :, None])[:, :, 0].astype(np.float32)
+
+def _save_csr(directory: Path, name: str, matrix: sparse.csr_matrix):
+    for part in ("indptr", "indices", "data"):
+        np.save(directory / f"{name}_{part}.npy", getattr(matrix, part), allow_pickle=False)
+
+def _load_csr(directory: Path, name: str, shape: tuple[int, int]) -> sparse.csr_matrix:
+    parts = [np.load(directory / f"{name}_{part}.npy", mmap_mode="r") for part in ("data", "indices", "indptr")]
+    return sparse.csr_matrix(tuple(parts), shape=shape, copy=False)
+
+_worker_state = {}
+
+def _init_worker(directory: str, shapes: dict):
+    directory = Path(directory)
+    _worker_state["matrices"] = {name: _load_csr(directory, name, shape) for name, shape in shapes.items()}
+
+def _solve_block(side: str, start: int, stop: int, fixed_path: str, regularization: float, implicit: bool, alpha: float, gram: np.ndarray) -> np.ndarray:
+    fixed = np.load(fixed_path, mmap_mode="r")
+    ratings = _worker_state["matrices"][side][start:stop]
+    return solve_rows(ratings, fixed, regularization, implicit, alpha, gram)
+
+class ALSModel:
+    """
+    Serving state of the matrix factorization recommender.
+
+    Scores are ``user_factors[user] @ item_factors.T``; ``user_items`` is kept to leave out
+    books the user already rated.
+    """
+    kind = "als"
+
+    def __init__(self, user_ids: np.ndarray, item_ids: np.ndarray, user_items: sparse.csr_matrix, user_factors: np.ndarray, item_factors: np.ndarray, params: dict = None):
+        self.user_ids = user_ids
+        self.item_ids = item_ids
+        self.user_items = user_items
+        self.user_factors = user_factors
+        self.item_factors = item_factors
+        self.params = params or {}
+        self.version = None
+        self.metadata = {}
+
+    @classmethod
+    def initial(cls, user_ids: np.ndarray, item_ids: np.ndarray, user_items: sparse.csr_matrix, factors: int, seed: int, params: dict) -> "ALSModel":
+        rng = np.random.default_rng(seed)
+        user_factors = (rng.standard_normal((len(user_ids), factors)) * 0.01).astype(np.float32)
+        item_factors = (rng.standard_normal((len(item_ids), factors)) * 0.01).astype(np.float32)
+        return cls(user_ids, item_ids, user_items, user_factors, item_factors, params=params)
+
+    def to_arrays(self) -> dict[str, np.ndarray]:
+        return {
+            "user_ids": self.user_ids,
+            "item_ids": self.item_ids,
+            "user_items_indptr": self.user_items.indptr,
+            "user_items_indices": self.user_items.indices,
+            "user_items_data": self.user_items.data,
+            "user_factors": self.user_factors,
+            "item_factors": self.item_factors,
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays: dict[str, np.ndarray], params: dict) -> "ALSModel":
+        user_items = sparse.csr_matrix(
+            (arrays["user_items_data"], arrays["user_items_indices"], arrays["user_items_indptr"]),
+            shape=(len(arrays["user_ids"]), len(arrays["item_ids"])),
+            copy=False,
+        )
+        return cls(arrays["user_ids"], arrays["item_ids"], user_items, arrays["user_factors"], arrays["item_factors"], params=params)
+
+    def user_index(self, user_id: str) -> int | None:
+        position = int(np.searchsorted(self.user_ids, user_id))
+        if position < len(self.user_ids) and self.user_ids[position] == user_id:
+            return position
+        return None
+
+    def training_rmse(self, chunk_size: int = 1_000_000) -> float:
+        """
+        Root mean squared error of the factorization on the training ratings (explicit mode).
+        """
+        matrix = self.user_items
+        rows = np.repeat(np.arange(matrix.shape[0]), np.diff(matrix.indptr))
+        total = 0.0
+        for start in range(0, matrix.nnz, chunk_size):
+            stop = start + chunk_size
+            predicted = np.einsum("ij,ij->i", self.user_factors[rows[start:stop]], self.item_factors[matrix.indices[start:stop]])
+            total += float(np.sum((predicted - matrix.data[start:stop]) ** 2))
+        return float(np.sqrt(total / max(matrix.nnz, 1)))
+
+    def score_users(self, rows: np.ndarray, k: int = 10, block_size: int = 256) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Same contract as ``ItemItemModel.score_users``: returns parallel arrays (position in
+        ``rows``, item index, score) of each user's ``k`` best unseen items, best first.
+        Scores are computed ``block_size`` users at a time to bound the dense score matrix.
+        """
+        k = min(k, len(self.item_ids))
+        positions, items, values = [], [], []
+        for start in range(0, len(rows), block_size):
+            block = np.asarray(rows[start:start + block_size])
+            scores = self.user_factors[block] @ self.item_factors.T
+            seen = self.user_items[block]
+            scores[np.repeat(np.arange(len(block)), np.diff(seen.indptr)), seen.indices] = -np.inf
+            if k <= 0:
+                continue
+            best = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            best_scores = np.take_along_axis(scores, best, axis=1)
+            order = np.argsort(-best_scores, axis=1, kind="stable")
+            best = np.take_along_axis(best, order, axis=1)
+            best_scores = np.take_along_axis(best_scores, order, axis=1)
+            keep = np.isfinite(best_scores)
+            positions.append(np.broadcast_to(np.arange(start, start + len(block))[:, None], best.shape)[keep])
+            items.append(best[keep])
+            values.append(best_scores[keep])
+        if not positions:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        return np.concatenate(positions), np.concatenate(items), np.concatenate(values)
+
+    def recommend_batch(self, user_ids: list[str], k: int = 10) -> list[list[tuple[str, float]]]:
+        user_ids = np.asarray(user_ids, dtype=str)
+        found = np.zeros(len(user_ids), dtype=bool)
+        rows = np.zeros(len(user_ids), dtype=np.int64)
+        if len(self.user_ids):
+            rows = np.minimum(np.searchsorted(self.user_ids, user_ids), len(self.user_ids) - 1)
+            found = self.user_ids[rows] == user_ids
+        positions, items, values = self.score_users(rows[found], k)
+
+        results = [[] for _ in range(len(user_ids))]
+        targets = np.flatnonzero(found)
+        for position, item, value in zip(targets[positions].tolist(), items.tolist(), values.tolist()):
+            results[position].append((str(self.item_ids[item]), value))
+        return results
+
+    def recommend(self, user_id: str, k: int = 10) -> list[tuple[str, float]]:
+        row = self.user_index(user_id)
+        if row is None:
+            return []
+        positions, items, values = self.score_users(np.array([row]), k)
+        return [(str(self.item_ids[i]), float(s)) for i, s in zip(items, values)]
+
+    def most_active_users(self, n: int) -> np.ndarray:
+        counts = np.diff(self.user_items.indptr)
+        n = min(n, len(counts))
+        if n <= 0:
+            return self.user_ids[:0]
+        top = np.argpartition(-counts, n - 1)[:n]
+        return self.user_ids[top[np.argsort(-counts[top], kind="stable")]]
+
+class ALSTrainer:
+    """
+    Runs ALS epochs over ``model``, solving ``block_size`` rows per task on ``workers`` processes
+    (inline when ``workers`` is 1). ``checkpoint`` is called with the model after every epoch.
+    """
+    def __init__(self, regularization: float = 0.1, implicit: bool = False, alpha: float = 40.0, block_size: int = 4096, workers: int = None, checkpoint=None):
+        self.regularization = regularization
+        self.implicit = implicit
+        self.alpha = alpha
+        self.block_size = block_size
+        self.workers = workers or os.cpu_count()
+        self.checkpoint = checkpoint
+
+    def _half_epoch(self, pool, directory: Path, side: str, ratings: sparse.csr_matrix, fixed: np.ndarray) -> np.ndarray:
+        gram = (fixed.T.astype(np.float64) @ fixed) if self.implicit else None
+        bounds = [(start, min(start + self.block_size, ratings.shape[0])) for start in range(0, ratings.shape[0], self.block_size)]
+        if pool is None:
+            blocks = [solve_rows(ratings[start:stop], fixed, self.regularization, self.implicit, self.alpha, gram) for start, stop in bounds]
+        else:
+            fixed_path = directory / f"{side}_fixed.npy"
+            np.save(fixed_path, fixed, allow_pickle=False)
+            futures = [
+                pool.submit(_solve_block, side, start, stop, str(fixed_path), self.regularization, self.implicit, self.alpha, gram)
+                for start, stop in bounds
+            ]
+            blocks = [future.result() for future in futures]
+        return np.concatenate(blocks) if blocks else np.zeros((0, fixed.shape[1]), dtype=np.float32)
+
+    def train(self, model: ALSModel, epochs: int, start_epoch: int = 0) -> ALSModel:
+        user_items = model.user_items.tocsr()
+        item_users = user_items.T.tocsr()
+        directory = Path(tempfile.mkdtemp(prefix="als-"))
+        pool = None
+        try:
+            if self.workers > 1:
+                _save_csr(directory, "users", user_items)
+                _save_csr(directory, "items", item_users)
+                shapes = {"users": user_items.shape, "items": item_users.shape}
+                pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=(str(directory), shapes))
+
+            for epoch in range(start_epoch, epochs):
+                started = time.perf_counter()
+                model.user_factors = self._half_epoch(pool, directory, "users", user_items, np.asarray(model.item_factors))
+                model.item_factors = self._half_epoch(pool, directory, "items", item_users, model.user_factors)
+                seconds = time.perf_counter() - started
+                model.metadata = {**model.metadata, "epoch": epoch + 1, "epoch_seconds": round(seconds, 3)}
+                if not self.implicit:
+                    model.metadata["training_rmse"] = round(model.training_rmse(), 5)
+                logger.info(f'ALS epoch {epoch + 1}/{epochs} in {seconds:.2f}s {model.metadata}')
+                if self.checkpoint is not None:
+                    self.checkpoint(model)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+            shutil.rmtree(directory, ignore_errors=True)
+        return model
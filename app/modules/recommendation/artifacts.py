@@ -0,0 +1,138 @@
+"""
+On-disk format for trained recommendation models.
+
+Every model version lives in its own directory holding one ``.npy`` file per array and a
+``manifest.json`` describing them. A ``CURRENT`` file at the root names the version being
+served. Arrays are opened with ``mmap_mode='r'``, so every worker on a host maps the same
+page-cache copy instead of holding a private one.
+
+    <root>/
+        CURRENT
+        20250607121041123456/
+            manifest.json
+            user_ids.npy
+            ...
+"""
+import json
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+import numpy as np
+from app.core import constants
+from app.modules.recommendation.engine import ItemItemModel
+from app.modules.recommendation.content import ContentModel
+from app.modules.recommendation.als import ALSModel
+from app.modules.recommendation.exceptions import ModelNotAvailableException
+
+FORMAT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+CURRENT_FILE = "CURRENT"
+
+MODEL_KINDS = {
+    ItemItemModel.kind: ItemItemModel,
+    ContentModel.kind: ContentModel,
+    ALSModel.kind: ALSModel,
+}
+
+def new_version() -> str:
+    return datetime.now(constants.tzinfo).strftime("%Y%m%d%H%M%S%f")
+
+def current_version(root: str | Path) -> str | None:
+    """
+    Returns the version named by the ``CURRENT`` pointer, or None if nothing was published yet.
+    """
+    try:
+        return (Path(root) / CURRENT_FILE).read_text().strip() or None
+    except FileNotFoundError:
+        return None
+
+def save_model(model, root: str | Path, version: str = None, metadata: dict = None, publish: bool = True) -> str:
+    """
+    Writes ``model`` as a new version under ``root`` and, if ``publish`` is set, points ``CURRENT`` at it.
+    The version directory is written under a temporary name and renamed into place, so a reader
+    never sees a half-written model.
+    """
+    root = Path(root)
+    version = version or new_version()
+    staging = root / f".{version}.tmp"
+    target = root / version
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+
+    arrays = {}
+    for name, array in model.to_arrays().items():
+        array = np.ascontiguousarray(array)
+        np.save(staging / f"{name}.npy", array, allow_pickle=False)
+        arrays[name] = {"file": f"{name}.npy", "dtype": array.dtype.str, "shape": list(array.shape)}
+
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "kind": model.kind,
+        "version": version,
+        "created_at": datetime.now(constants.tzinfo).isoformat(),
+        "params": model.params,
+        "metadata": metadata or {},
+        "arrays": arrays,
+    }
+    (staging / MANIFEST_FILE).write_text(json.dumps(manifest, indent=2))
+    os.replace(staging, target)
+
+    if publish:
+        publish_version(root, version)
+    return version
+
+def publish_version(root: str | Path, version: str):
+    """
+    Atomically points ``CURRENT`` at ``version``.
+    """
+    root = Path(root)
+    pointer = root / f".{CURRENT_FILE}.tmp"
+    pointer.write_text(version)
+    os.replace(pointer, root / CURRENT_FILE)
+
+def read_manifest(root: str | Path, version: str) -> dict:
+    manifest = json.loads((Path(root) / version / MANIFEST_FILE).read_text())
+    if manifest.get("format_version") != FORMAT_VERSION:
+        raise ModelNotAvailableException(f"Unsupported model format version {manifest.get('format_version')} for version '{version}'.")
+    return manifest
+
+def load_model(root: str | Path, version: str = None, mmap: bool = True):
+    """
+    Opens a model version (the published one by default). With ``mmap`` the arrays stay on disk
+    and are paged in on demand, so loading costs a few file opens regardless of model size.
+    """
+    version = version or current_version(root)
+    if not version:
+        raise ModelNotAvailableException(f"No published model under '{root}'.")
+    try:
+        manifest = read_manifest(root, version)
+    except FileNotFoundError:
+        raise ModelNotAvailableException(f"Model version '{version}' not found under '{root}'.")
+
+    model_class = MODEL_KINDS.get(manifest["kind"])
+    if model_class is None:
+        raise ModelNotAvailableException(f"Unknown model kind '{manifest['kind']}'.")
+
+    directory = Path(root) / version
+    arrays = {
+        name: np.load(directory / spec["file"], mmap_mode="r" if mmap else None, allow_pickle=False)
+        for name, spec in manifest["arrays"].items()
+    }
+    model = model_class.from_arrays(arrays, manifest["params"])
+    model.version = version
+    model.metadata = manifest.get("metadata", {})
+    return model
+
+def prune_versions(root: str | Path, keep: int):
+    """
+    Removes all but the ``keep`` newest versions, never touching the published one.
+    Workers that still map a removed version keep reading it until they reload, as the
+    files stay alive for as long as they are mapped.
+    """
+    root = Path(root)
+    current = current_version(root)
+    versions = sorted(p.name for p in root.iterdir() if p.is_dir() and not p.name.startswith("."))
+    for version in versions[:-keep] if keep > 0 else versions:
+        if version != current:
+            shutil.rmtree(root / version, ignore_errors=True)
@@ -0,0 +1,96 @@
+"""
+Cache of per-user recommendation lists.
+
+Lists are computed once at ``recommendation_cache_list_size`` entries and sliced to the requested
+``k``. Lookups go through two tiers: a per-worker LRU with a short TTL, then an optional shared
+tier (Redis, or ``LocalStore`` in tests) with a longer one. Every entry records the model version
+it was computed with, so publishing a new model makes all older entries misses without a flush.
+Rating writes invalidate the writing worker's tier and the shared one; other workers drop their
+local copy when its TTL runs out.
+"""
+import json
+import threading
+from app.core.cache import TTLCache, create_shared_store
+from app.core.config import settings
+from app.core.logging import logger
+
+KEY_PREFIX = "rec:"
+
+class RecommendationCache:
+    def __init__(self, maxsize: int, ttl: float, local_ttl: float, shared=None):
+        self.local = TTLCache(maxsize=maxsize, ttl=local_ttl)
+        self.shared = shared
+        self.ttl = ttl
+        self.local_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def get(self, user_id: str, version: str) -> list[tuple[str, float]] | None:
+        entry = self.local.get(user_id)
+        if entry is not None and entry[0] == version:
+            self._count("local_hits")
+            return entry[1]
+
+        if self.shared is not None:
+            try:
+                raw = self.shared.get(KEY_PREFIX + user_id)
+            except Exception as e:
+                logger.warning(f'Shared recommendation cache read failed: {e}')
+                raw = None
+            if raw is not None:
+                cached_version, items = json.loads(raw)
+                if cached_version == version:
+                    items = [tuple(item) for item in items]
+                    self.local.set(user_id, (version, items))
+                    self._count("shared_hits")
+                    return items
+
+        self._count("misses")
+        return None
+
+    def set(self, user_id: str, version: str, items: list[tuple[str, float]]):
+        self.local.set(user_id, (version, items))
+        if self.shared is not None:
+            try:
+                self.shared.set(KEY_PREFIX + user_id, json.dumps([version, items]), ex=int(self.ttl))
+            except Exception as e:
+                logger.warning(f'Shared recommendation cache write failed: {e}')
+
+    def invalidate(self, user_ids):
+        user_ids = list(user_ids)
+        for user_id in user_ids:
+            self.local.delete(user_id)
+        if self.shared is not None and user_ids:
+            try:
+                self.shared.delete(*(KEY_PREFIX + user_id for user_id in user_ids))
+            except Exception as e:
+                logger.warning(f'Shared recommendation cache invalidation failed: {e}')
+
+    def clear(self):
+        self.local.clear()
+        with self._lock:
+            self.local_hits = self.shared_hits = self.misses = 0
+
+    def stats(self) -> dict:
+        lookups = self.local_hits + self.shared_hits + self.misses
+        return {
+            "lookups": lookups,
+            "local_hits": self.local_hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "hit_ratio": round((self.local_hits + self.shared_hits) / lookups, 4) if lookups else 0.0,
+            "local_size": len(self.local),
+            "shared_tier": self.shared is not None,
+        }
+
+recommendation_cache = RecommendationCache(
+    maxsize=settings.recommendation_cache_size,
+    ttl=settings.recommendation_cache_ttl,
+    local_ttl=settings.recommendation_cache_local_ttl,
+    shared=create_shared_store(settings.cache_url),
+)
@@ -0,0 +1,121 @@
+"""
+Offline jobs for the recommendation module.
+
+    python -m app.modules.recommendation.cli train
+    python -m app.modules.recommendation.cli update
+    python -m app.modules.recommendation.cli train-als [--resume]
+    python -m app.modules.recommendation.cli build-content
+    python -m app.modules.recommendation.cli warm-cache [--users N]
+    python -m app.modules.recommendation.cli export-top-n [--k 50] [--parquet top_n.parquet] [--workers N]
+    python -m app.modules.recommendation.cli refresh-popularity [--full]
+
+``train`` and ``update`` also warm the shared recommendation cache when ``cache_url`` is set.
+"""
+import argparse
+from app.core.config import settings
+from app.core.db import DBConnection
+from app.core.utils import lazy_import
+from app.modules.recommendation import services as rec_services
+
+# Only the jobs that score or load models pay for NumPy and SciPy.
+artifacts = lazy_import("app.modules.recommendation.artifacts")
+export = lazy_import("app.modules.recommendation.export")
+
+def train(args: argparse.Namespace):
+    session = DBConnection().create_replica_session()
+    try:
+        model = rec_services.train_model(session)
+    finally:
+        session.close()
+    version = rec_services.publish_model(model)
+    print(version, model.metadata)
+    warm_shared_cache(version)
+
+def train_als(args: argparse.Namespace):
+    session = DBConnection().create_replica_session()
+    try:
+        model = rec_services.train_als_model(session, resume=args.resume)
+    finally:
+        session.close()
+    version = rec_services.publish_model(model)
+    print(version, model.metadata)
+    warm_shared_cache(version)
+
+def update(args: argparse.Namespace):
+    session = DBConnection().create_replica_session()
+    try:
+        model = rec_services.update_model(session)
+    finally:
+        session.close()
+    if model is None:
+        print("up to date")
+        return
+    version = rec_services.publish_model(model)
+    print(version, model.metadata)
+    warm_shared_cache(version)
+
+def warm_shared_cache(version: str):
+    if settings.cache_url and not settings.cache_url.startswith("local://"):
+        warm_cache(argparse.Namespace(users=None, version=version))
+
+def warm_cache(args: argparse.Namespace):
+    model = artifacts.load_model(settings.recommendation_model_dir, getattr(args, "version", None))
+    print(rec_services.warm_recommendation_cache(model, args.users))
+
+def export_top_n(args: argparse.Namespace):
+    stats = export.export_top_n(path=args.parquet, k=args.k, chunk_size=args.chunk_size, workers=args.workers)
+    print(stats)
+
+def build_content(args: argparse.Namespace):
+    session = DBConnection().create_replica_session()
+    try:
+        model = rec_services.build_content_model(session)
+    finally:
+        session.close()
+    version = rec_services.publish_model(model, settings.content_model_dir)
+    print(version, model.metadata)
+
+def refresh_popularity(args: argparse.Namespace):
+    session = DBConnection().create_session()
+    try:
+        print(rec_services.refresh_popularity(session, full=args.full))
+    finally:
+        session.close()
+
+def main(argv: list[str] = None):
+    parser = argparse.ArgumentParser(prog="app.modules.recommendation.cli", description="Recommendation model jobs.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    train_parser = commands.add_parser("train", help="Build the item-item model from the ratings table and publish it.")
+    train_parser.set_defaults(handler=train)
+
+    als_parser = commands.add_parser("train-als", help="Train the matrix factorization model from the ratings table and publish it.")
+    als_parser.add_argument("--resume", action="store_true", help="Continue from the latest epoch checkpoint.")
+    als_parser.set_defaults(handler=train_als)
+
+    update_parser = commands.add_parser("update", help="Apply ratings changed since the published model and publish the result.")
+    update_parser.set_defaults(handler=update)
+
+    warm_parser = commands.add_parser("warm-cache", help="Precompute recommendation lists of the most active users into the cache.")
+    warm_parser.add_argument("--users", type=int, default=None, help="Number of users to warm (default: recommendation_warm_users).")
+    warm_parser.set_defaults(handler=warm_cache)
+
+    export_parser = commands.add_parser("export-top-n", help="Score every user of the published model and store their top-N books.")
+    export_parser.add_argument("--k", type=int, default=50)
+    export_parser.add_argument("--parquet", default=None, help="Write to this Parquet file instead of the user_recommendation table.")
+    export_parser.add_argument("--chunk-size", type=int, default=10_000)
+    export_parser.add_argument("--workers", type=int, default=None, help="Scoring processes (default: one per CPU).")
+    export_parser.set_defaults(handler=export_top_n)
+
+    content_parser = commands.add_parser("build-content", help="Build the content-based similar-books index from the catalog and publish it.")
+    content_parser.set_defaults(handler=build_content)
+
+    popularity_parser = commands.add_parser("refresh-popularity", help="Update the popular/trending rollup with the ratings written since the last refresh.")
+    popularity_parser.add_argument("--full", action="store_true", help="Recompute every rated book.")
+    popularity_parser.set_defaults(handler=refresh_popularity)
+
+    args = parser.parse_args(argv)
+    args.handler(args)
+
+if __name__ == "__main__":
+    main()
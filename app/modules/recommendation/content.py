@@ -0,0 +1,213 @@
+"""
+Content-based "similar books".
+
+Book text (title, author, description) is turned into hashed TF-IDF vectors, reduced to dense
+float32 embeddings with a truncated SVD and indexed with an IVF-flat index: the embeddings are
+clustered with spherical k-means and a query only scans the ``nprobe`` closest clusters instead
+of the whole catalog. Everything is plain NumPy/SciPy arrays, so the index is saved and
+memory-mapped through ``artifacts`` like the collaborative model.
+"""
+import re
+import zlib
+from typing import Iterable
+import numpy as np
+from scipy import sparse
+from scipy.sparse.linalg import svds
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+def tokenize(text: str) -> list[str]:
+    return TOKEN_RE.findall(text.lower()) if text else []
+
+def hashed_term_counts(documents: Iterable[str], n_features: int, chunk_size: int = 1_000_000) -> sparse.csr_matrix:
+    """
+    Builds the documents x features term-count matrix with the hashing trick, in one pass and
+    without a vocabulary. crc32 keeps the hashing stable across processes. Token hashes are packed
+    into int32 arrays every ``chunk_size`` tokens so no large Python list builds up.
+    """
+    lengths, chunks, pending = [], [], []
+    for document in documents:
+        tokens = tokenize(document)
+        pending.extend(zlib.crc32(token.encode()) % n_features for token in tokens)
+        lengths.append(len(tokens))
+        if len(pending) >= chunk_size:
+            chunks.append(np.asarray(pending, dtype=np.int32))
+            pending = []
+    chunks.append(np.asarray(pending, dtype=np.int32))
+
+    indices = np.concatenate(chunks)
+    indptr = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=indptr[1:])
+    matrix = sparse.csr_matrix(
+        (np.ones(len(indices), dtype=np.float32), indices, indptr),
+        shape=(len(lengths), n_features),
+    )
+    matrix.sum_duplicates()
+    return matrix
+
+def tfidf(counts: sparse.csr_matrix) -> sparse.csr_matrix:
+    """
+    Sublinear TF, smoothed IDF and L2-normalised rows.
+    """
+    matrix = counts.copy()
+    matrix.data = 1.0 + np.log(matrix.data)
+    df = np.bincount(matrix.indices, minlength=matrix.shape[1])
+    idf = (np.log((1.0 + matrix.shape[0]) / (1.0 + df)) + 1.0).astype(np.float32)
+    matrix = (matrix @ sparse.diags(idf)).tocsr()
+    return _normalize_rows_sparse(matrix)
+
+def _normalize_rows_sparse(matrix: sparse.csr_matrix) -> sparse.csr_matrix:
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return (sparse.diags(1.0 / norms) @ matrix).astype(np.float32).tocsr()
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32)
+
+def embed(matrix: sparse.csr_matrix, dim: int, seed: int = 0) -> np.ndarray:
+    """
+    Projects TF-IDF rows onto their top ``dim`` singular directions (LSA) and L2-normalises them.
+    A single-row matrix has no SVD short of its own rank, so it gets a one-dimensional unit vector.
+    """
+    if min(matrix.shape) < 2:
+        return np.ones((matrix.shape[0], 1), dtype=np.float32)
+    dim = max(1, min(dim, min(matrix.shape) - 1))
+    u, s, _ = svds(matrix.astype(np.float64), k=dim, random_state=seed)
+    return normalize_rows(u * s)
+
+def spherical_kmeans(vectors: np.ndarray, n_clusters: int, iterations: int = 10, sample_size: int = 256, batch_size: int = 65536, seed: int = 0) -> np.ndarray:
+    """
+    Trains ``n_clusters`` unit-norm centroids on a sample of ``sample_size`` vectors per cluster.
+    """
+    rng = np.random.default_rng(seed)
+    n = len(vectors)
+    sample = vectors[rng.choice(n, size=min(n, n_clusters * sample_size), replace=False)]
+    centroids = sample[rng.choice(len(sample), size=n_clusters, replace=False)].copy()
+    for _ in range(iterations):
+        assignments = assign(sample, centroids, batch_size)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, sample)
+        empty = np.bincount(assignments, minlength=n_clusters) == 0
+        sums[empty] = sample[rng.choice(len(sample), size=int(empty.sum()))]
+        centroids = normalize_rows(sums)
+    return centroids
+
+def assign(vectors: np.ndarray, centroids: np.ndarray, batch_size: int = 65536) -> np.ndarray:
+    assignments = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), batch_size):
+        assignments[start:start + batch_size] = np.argmax(vectors[start:start + batch_size] @ centroids.T, axis=1)
+    return assignments
+
+class ContentModel:
+    """
+    IVF-flat index over book embeddings.
+
+    ``vectors`` are stored grouped by cluster, cluster ``c`` occupying rows
+    ``list_offsets[c]:list_offsets[c + 1]``. ``row_items`` maps a vector row to its index in the
+    sorted ``item_ids`` and ``item_rows`` maps back.
+    """
+    kind = "content"
+
+    def __init__(self, item_ids: np.ndarray, vectors: np.ndarray, row_items: np.ndarray, item_rows: np.ndarray, centroids: np.ndarray, list_offsets: np.ndarray, params: dict = None):
+        self.item_ids = item_ids
+        self.vectors = vectors
+        self.row_items = row_items
+        self.item_rows = item_rows
+        self.centroids = centroids
+        self.list_offsets = list_offsets
+        self.params = params or {}
+        self.version = None
+        self.metadata = {}
+
+    @classmethod
+    def fit(cls, item_ids: np.ndarray, embeddings: np.ndarray, n_lists: int = None, seed: int = 0) -> "ContentModel":
+        """
+        Builds the index for ``embeddings`` (one unit-norm row per entry of the sorted ``item_ids``).
+        ``n_lists`` defaults to about the square root of the catalog size.
+        """
+        n = len(item_ids)
+        if n == 0:
+            # An empty catalog gets an index without lists, which every lookup misses.
+            empty = np.zeros(0, dtype=np.int32)
+            return cls(item_ids, embeddings, empty, empty, np.zeros((0, embeddings.shape[1]), dtype=np.float32), np.zeros(1, dtype=np.int64), params={"n_lists": 0, "seed": seed, "dim": embeddings.shape[1]})
+        n_lists = max(1, min(n, n_lists or int(np.sqrt(n))))
+        centroids = spherical_kmeans(embeddings, n_lists, seed=seed)
+        assignments = assign(embeddings, centroids)
+        order = np.argsort(assignments, kind="stable").astype(np.int32)
+        item_rows = np.empty(n, dtype=np.int32)
+        item_rows[order] = np.arange(n, dtype=np.int32)
+        list_offsets = np.zeros(n_lists + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assignments, minlength=n_lists), out=list_offsets[1:])
+        return cls(item_ids, embeddings[order], order, item_rows, centroids, list_offsets, params={"n_lists": n_lists, "seed": seed, "dim": embeddings.shape[1]})
+
+    def to_arrays(self) -> dict[str, np.ndarray]:
+        return {
+            "item_ids": self.item_ids,
+            "vectors": self.vectors,
+            "row_items": self.row_items,
+            "item_rows": self.item_rows,
+            "centroids": self.centroids,
+            "list_offsets": self.list_offsets,
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays: dict[str, np.ndarray], params: dict) -> "ContentModel":
+        return cls(
+            arrays["item_ids"], arrays["vectors"], arrays["row_items"], arrays["item_rows"],
+            arrays["centroids"], arrays["list_offsets"], params=params,
+        )
+
+    def item_index(self, item_id: str) -> int | None:
+        position = int(np.searchsorted(self.item_ids, item_id))
+        if position < len(self.item_ids) and self.item_ids[position] == item_id:
+            return position
+        return None
+
+    def search(self, query: np.ndarray, k: int = 10, nprobe: int = 16, exclude: int = None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns (item indexes, cosine similarities) of the ``k`` best matches for a unit-norm
+        ``query`` among the ``nprobe`` clusters closest to it.
+        """
+        nprobe = min(nprobe, len(self.centroids))
+        probes = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+        rows = np.concatenate([
+            np.arange(self.list_offsets[c], self.list_offsets[c + 1]) for c in probes
+        ])
+        if exclude is not None:
+            rows = rows[self.row_items[rows] != exclude]
+        scores = self.vectors[rows] @ query
+        if len(scores) > k:
+            best = np.argpartition(-scores, k - 1)[:k]
+        else:
+            best = np.arange(len(scores))
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return self.row_items[rows[best]], scores[best]
+
+    def similar(self, item_id: str, k: int = 10, nprobe: int = 16) -> list[tuple[str, float]]:
+        item = self.item_index(item_id)
+        if item is None:
+            return []
+        query = np.asarray(self.vectors[self.item_rows[item]])
+        items, scores = self.search(query, k, nprobe, exclude=item)
+        return [(str(self.item_ids[i]), float(s)) for i, s in zip(items, scores)]
+
+def build_content_model(books: Iterable[tuple[str, str]], dim: int = 128, n_features: int = 2 ** 18, n_lists: int = None, seed: int = 0) -> ContentModel:
+    """
+    Runs the whole offline pipeline: hashed TF-IDF, SVD embeddings and the IVF-flat index.
+    ``books`` are (id, text) pairs sorted by id; they are read in a single pass.
+    """
+    item_ids = []
+
+    def documents():
+        for item_id, document in books:
+            item_ids.append(item_id)
+            yield document
+
+    counts = hashed_term_counts(documents(), n_features)
+    item_ids = np.asarray(item_ids, dtype=str)
+    embeddings = embed(tfidf(counts), dim, seed=seed)
+    model = ContentModel.fit(item_ids, embeddings, n_lists=n_lists, seed=seed)
+    model.params.update({"n_features": n_features})
+    return model
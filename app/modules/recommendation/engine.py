@@ -0,0 +1,338 @@
+"""
+Item-item collaborative filtering on a sparse interaction matrix.
+
+Ratings are held as a SciPy CSR matrix (users x items). The neighbour table
+is itself a CSR matrix (items x items) with at most ``top_k`` entries per
+row, built one block of items at a time so the full item x item similarity
+matrix never has to be materialised.
+"""
+import numpy as np
+from scipy import sparse
+
+def sort_ids(ids: list[str], codes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Sorts the distinct ids and remaps ``codes`` (indexes into ``ids``) onto the sorted order.
+    Sorted id arrays let the model look ids up with ``np.searchsorted`` instead of a dict.
+    """
+    ids = np.asarray(ids, dtype=str)
+    order = np.argsort(ids, kind="stable")
+    remap = np.empty(len(order), dtype=np.int32)
+    remap[order] = np.arange(len(order), dtype=np.int32)
+    return ids[order], remap[codes]
+
+def build_interaction_matrix(user_codes: np.ndarray, item_codes: np.ndarray, scores: np.ndarray, shape: tuple[int, int]) -> sparse.csr_matrix:
+    """
+    Builds the users x items CSR matrix from parallel arrays of codes and scores.
+    """
+    matrix = sparse.csr_matrix(
+        (np.asarray(scores, dtype=np.float32), (user_codes, item_codes)),
+        shape=shape,
+    )
+    matrix.sum_duplicates()
+    return matrix
+
+def _top_k_block(block: sparse.csr_matrix, row_items: np.ndarray, top_k: int):
+    """
+    Keeps the ``top_k`` largest positive entries of every row of ``block``, dropping the diagonal
+    (``row_items`` gives the item each block row belongs to).
+    Returns (counts, indices, data) ready to be appended to a CSR matrix.
+    """
+    counts = np.zeros(block.shape[0], dtype=np.int64)
+    indices, data = [], []
+    for row in range(block.shape[0]):
+        start, stop = block.indptr[row], block.indptr[row + 1]
+        cols = block.indices[start:stop]
+        sims = block.data[start:stop]
+        keep = (cols != row_items[row]) & (sims > 0)
+        cols, sims = cols[keep], sims[keep]
+        if len(sims) > top_k:
+            best = np.argpartition(-sims, top_k - 1)[:top_k]
+            cols, sims = cols[best], sims[best]
+        order = np.argsort(-sims, kind="stable")
+        counts[row] = len(order)
+        indices.append(cols[order])
+        data.append(sims[order])
+    return counts, indices, data
+
+def build_neighbours(matrix: sparse.csr_matrix, top_k: int = 50, block_size: int = 2048) -> sparse.csr_matrix:
+    """
+    Builds the items x items cosine-similarity neighbour table, keeping ``top_k`` neighbours per item.
+
+    Similarities are computed for ``block_size`` items at a time, so peak memory is bounded by
+    one sparse block of the similarity matrix rather than the whole of it.
+    """
+    n_items = matrix.shape[1]
+    normalized = _normalize_columns(matrix)
+    item_vectors = normalized.T.tocsr()
+
+    indptr = [np.zeros(1, dtype=np.int64)]
+    indices, data = [], []
+    for start in range(0, n_items, block_size):
+        stop = min(start + block_size, n_items)
+        block = (item_vectors[start:stop] @ normalized).tocsr()
+        counts, block_indices, block_data = _top_k_block(block, np.arange(start, stop), top_k)
+        indptr.append(indptr[-1][-1] + np.cumsum(counts))
+        indices.extend(block_indices)
+        data.extend(block_data)
+
+    return sparse.csr_matrix(
+        (
+            np.concatenate(data) if data else np.zeros(0, dtype=np.float32),
+            np.concatenate(indices) if indices else np.zeros(0, dtype=np.int32),
+            np.concatenate(indptr),
+        ),
+        shape=(n_items, n_items),
+    )
+
+def _top_k_entries(rows: np.ndarray, cols: np.ndarray, data: np.ndarray, top_k: int):
+    """
+    Vectorised per-row top-K over COO entries: keeps the ``top_k`` largest values of every row.
+    Values must be cosine similarities in (0, 1], which lets a single float key order entries by
+    row and then by descending value (several times faster than ``np.lexsort``).
+    """
+    order = np.argsort(rows.astype(np.float64) * 4.0 - data, kind="stable")
+    rows, cols, data = rows[order], cols[order], data[order]
+    rank = np.arange(len(rows)) - np.searchsorted(rows, rows, side="left")
+    keep = rank < top_k
+    return rows[keep], cols[keep], data[keep]
+
+def _normalize_columns(matrix: sparse.csr_matrix) -> sparse.csr_matrix:
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=0), dtype=np.float32).ravel())
+    norms[norms == 0] = 1.0
+    return (matrix @ sparse.diags(1.0 / norms)).astype(np.float32).tocsr()
+
+def update_neighbours(matrix: sparse.csr_matrix, similarity: sparse.csr_matrix, changed_items: np.ndarray, top_k: int = 50, block_size: int = 2048) -> sparse.csr_matrix:
+    """
+    Refreshes a neighbour table after the columns ``changed_items`` of ``matrix`` changed.
+
+    Only similarities involving a changed item can move, so the rows of the changed items are
+    recomputed exactly and every other row only merges in its fresh similarities to changed
+    items. Rows untouched by the change are copied through as they are.
+
+    The merge is approximate in one case: when a changed item drops out of another item's list,
+    the replacement is picked among the neighbours that list still holds, not the whole catalog.
+    A periodic full rebuild with ``build_neighbours`` removes that drift.
+    """
+    n_items = matrix.shape[1]
+    is_changed = np.zeros(n_items, dtype=bool)
+    is_changed[changed_items] = True
+
+    old = similarity.tocoo()
+    stale = is_changed[old.row] | is_changed[old.col]
+    losing = np.zeros(n_items, dtype=bool)
+    losing[old.row[stale]] = True
+
+    # The K-th best similarity of every full row: a fresh candidate below it cannot enter that row.
+    # Rows losing a stale entry take any candidate, as they have room again.
+    counts = np.diff(similarity.indptr)
+    row_floor = np.zeros(n_items, dtype=np.float32)
+    nonempty = counts > 0
+    if nonempty.any():
+        row_floor[nonempty] = np.minimum.reduceat(similarity.data, similarity.indptr[:-1][nonempty])
+    row_floor[(counts < top_k) | losing] = 0
+
+    normalized = _normalize_columns(matrix)
+    changed_vectors = normalized[:, changed_items].T.tocsr()
+
+    fresh_rows, fresh_cols, fresh_data = [], [], []
+    for start in range(0, len(changed_items), block_size):
+        block_items = changed_items[start:start + block_size]
+        block = (changed_vectors[start:start + block_size] @ normalized).tocsr()
+        # exact rows for the changed items
+        counts, block_indices, block_data = _top_k_block(block, block_items, top_k)
+        fresh_rows.append(np.repeat(block_items, counts))
+        fresh_cols.extend(block_indices)
+        fresh_data.extend(block_data)
+        # the same similarities seen from the other side, for unchanged rows they can enter
+        rows = np.repeat(block_items, np.diff(block.indptr))
+        cols, data = block.indices, block.data
+        mirrored = ~is_changed[cols] & (data > row_floor[cols]) & (data > 0)
+        fresh_rows.append(cols[mirrored])
+        fresh_cols.append(rows[mirrored])
+        fresh_data.append(data[mirrored])
+
+    kept = ~stale
+    rows = np.concatenate([old.row[kept]] + fresh_rows)
+    cols = np.concatenate([old.col[kept]] + fresh_cols)
+    data = np.concatenate([old.data[kept]] + fresh_data).astype(np.float32)
+
+    # only rows holding more than top_k entries after the merge need to be ranked again
+    overfull = np.bincount(rows, minlength=n_items) > top_k
+    passthrough = ~overfull[rows]
+    top_rows, top_cols, top_data = _top_k_entries(rows[~passthrough], cols[~passthrough], data[~passthrough], top_k)
+    return sparse.csr_matrix(
+        (
+            np.concatenate([data[passthrough], top_data]),
+            (np.concatenate([rows[passthrough], top_rows]), np.concatenate([cols[passthrough], top_cols])),
+        ),
+        shape=(n_items, n_items),
+    )
+
+class ItemItemModel:
+    """
+    Serving state of the item-item recommender.
+
+    ``user_ids`` and ``item_ids`` are sorted so ids are resolved with a binary search, and
+    ``similarity`` holds the precomputed top-K neighbours of every item.
+    """
+    kind = "item_item"
+
+    def __init__(self, user_ids: np.ndarray, item_ids: np.ndarray, user_items: sparse.csr_matrix, similarity: sparse.csr_matrix, params: dict = None):
+        self.user_ids = user_ids
+        self.item_ids = item_ids
+        self.user_items = user_items
+        self.similarity = similarity
+        self.params = params or {}
+        self.version = None
+        self.metadata = {}
+
+    @classmethod
+    def fit(cls, user_ids: np.ndarray, item_ids: np.ndarray, user_items: sparse.csr_matrix, top_k: int = 50, block_size: int = 2048) -> "ItemItemModel":
+        similarity = build_neighbours(user_items, top_k=top_k, block_size=block_size)
+        return cls(user_ids, item_ids, user_items, similarity, params={"top_k": top_k, "block_size": block_size})
+
+    def apply_updates(self, user_ids: np.ndarray, item_ids: np.ndarray, scores: np.ndarray, deleted: np.ndarray = None) -> "ItemItemModel":
+        """
+        Returns a new model with the given ratings set (or removed where ``deleted``), refreshing
+        only the neighbour lists the changed items can affect. When a (user, item) pair appears
+        more than once, the last occurrence wins.
+        """
+        user_ids = np.asarray(user_ids, dtype=str)
+        item_ids = np.asarray(item_ids, dtype=str)
+        scores = np.asarray(scores, dtype=np.float32)
+        deleted = np.zeros(len(scores), dtype=bool) if deleted is None else np.asarray(deleted, dtype=bool)
+
+        all_users = np.union1d(self.user_ids, user_ids)
+        all_items = np.union1d(self.item_ids, item_ids)
+        n_users, n_items = len(all_users), len(all_items)
+        user_map = np.searchsorted(all_users, self.user_ids).astype(np.int32)
+        item_map = np.searchsorted(all_items, self.item_ids).astype(np.int32)
+
+        change_rows = np.searchsorted(all_users, user_ids).astype(np.int32)
+        change_cols = np.searchsorted(all_items, item_ids).astype(np.int32)
+        change_keys = change_rows.astype(np.int64) * n_items + change_cols
+        _, last = np.unique(change_keys[::-1], return_index=True)
+        last = len(change_keys) - 1 - last
+        change_rows, change_cols, change_keys = change_rows[last], change_cols[last], change_keys[last]
+        scores, deleted = scores[last], deleted[last]
+
+        old = self.user_items.tocoo()
+        rows, cols = user_map[old.row], item_map[old.col]
+        untouched = ~np.isin(rows.astype(np.int64) * n_items + cols, change_keys)
+        user_items = build_interaction_matrix(
+            np.concatenate([rows[untouched], change_rows[~deleted]]),
+            np.concatenate([cols[untouched], change_cols[~deleted]]),
+            np.concatenate([old.data[untouched], scores[~deleted]]),
+            shape=(n_users, n_items),
+        )
+
+        old_similarity = self.similarity.tocoo()
+        similarity = sparse.csr_matrix(
+            (old_similarity.data, (item_map[old_similarity.row], item_map[old_similarity.col])),
+            shape=(n_items, n_items),
+        )
+        top_k = self.params.get("top_k", 50)
+        block_size = self.params.get("block_size", 2048)
+        similarity = update_neighbours(user_items, similarity, np.unique(change_cols), top_k=top_k, block_size=block_size)
+        return type(self)(all_users, all_items, user_items, similarity, params=dict(self.params))
+
+    def to_arrays(self) -> dict[str, np.ndarray]:
+        return {
+            "user_ids": self.user_ids,
+            "item_ids": self.item_ids,
+            "user_items_indptr": self.user_items.indptr,
+            "user_items_indices": self.user_items.indices,
+            "user_items_data": self.user_items.data,
+            "similarity_indptr": self.similarity.indptr,
+            "similarity_indices": self.similarity.indices,
+            "similarity_data": self.similarity.data,
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays: dict[str, np.ndarray], params: dict) -> "ItemItemModel":
+        n_users, n_items = len(arrays["user_ids"]), len(arrays["item_ids"])
+        user_items = sparse.csr_matrix(
+            (arrays["user_items_data"], arrays["user_items_indices"], arrays["user_items_indptr"]),
+            shape=(n_users, n_items),
+            copy=False,
+        )
+        similarity = sparse.csr_matrix(
+            (arrays["similarity_data"], arrays["similarity_indices"], arrays["similarity_indptr"]),
+            shape=(n_items, n_items),
+            copy=False,
+        )
+        return cls(arrays["user_ids"], arrays["item_ids"], user_items, similarity, params=params)
+
+    def user_index(self, user_id: str) -> int | None:
+        position = int(np.searchsorted(self.user_ids, user_id))
+        if position < len(self.user_ids) and self.user_ids[position] == user_id:
+            return position
+        return None
+
+    def score_users(self, rows: np.ndarray, k: int = 10) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Scores many users at once with a single sparse product of their rating rows and the
+        neighbour table. ``rows`` are user indexes. Returns parallel arrays (position in ``rows``,
+        item index, score) holding each user's ``k`` best unseen items, best first.
+        """
+        history = self.user_items[rows]
+        scores = (history @ self.similarity).tocsr()
+        seen = history.copy()
+        seen.data = np.ones_like(seen.data)
+        scores = (scores - scores.multiply(seen)).tocsr()
+        scores.eliminate_zeros()
+
+        positions = np.repeat(np.arange(len(rows)), np.diff(scores.indptr))
+        order = np.lexsort((-scores.data, positions))
+        positions, items, values = positions[order], scores.indices[order], scores.data[order]
+        rank = np.arange(len(positions)) - np.searchsorted(positions, positions, side="left")
+        keep = rank < k
+        return positions[keep], items[keep], values[keep]
+
+    def recommend_batch(self, user_ids: list[str], k: int = 10) -> list[list[tuple[str, float]]]:
+        """
+        Batched ``recommend``: returns one list per entry of ``user_ids`` (empty for unknown users).
+        """
+        user_ids = np.asarray(user_ids, dtype=str)
+        found = np.zeros(len(user_ids), dtype=bool)
+        rows = np.zeros(len(user_ids), dtype=np.int64)
+        if len(self.user_ids):
+            rows = np.minimum(np.searchsorted(self.user_ids, user_ids), len(self.user_ids) - 1)
+            found = self.user_ids[rows] == user_ids
+        positions, items, values = self.score_users(rows[found], k)
+
+        results = [[] for _ in range(len(user_ids))]
+        targets = np.flatnonzero(found)
+        for position, item, value in zip(targets[positions].tolist(), items.tolist(), values.tolist()):
+            results[position].append((str(self.item_ids[item]), value))
+        return results
+
+    def most_active_users(self, n: int) -> np.ndarray:
+        """
+        Returns the ids of the ``n`` users with the most ratings, most active first.
+        """
+        counts = np.diff(self.user_items.indptr)
+        n = min(n, len(counts))
+        if n <= 0:
+            return self.user_ids[:0]
+        top = np.argpartition(-counts, n - 1)[:n]
+        return self.user_ids[top[np.argsort(-counts[top], kind="stable")]]
+
+    def recommend(self, user_id: str, k: int = 10) -> list[tuple[str, float]]:
+        """
+        Scores the neighbours of every item the user rated, weighted by the rating,
+        and returns the ``k`` best items the user has not rated yet.
+        """
+        row = self.user_index(user_id)
+        if row is None:
+            return []
+        history = self.user_items[row]
+        scores = (history @ self.similarity).tocsr()
+        candidates, values = scores.indices, scores.data
+        unseen = ~np.isin(candidates, history.indices)
+        candidates, values = candidates[unseen], values[unseen]
+        if len(values) > k:
+            best = np.argpartition(-values, k - 1)[:k]
+            candidates, values = candidates[best], values[best]
+        order = np.argsort(-values, kind="stable")
+        return [(str(self.item_ids[i]), float(s)) for i, s in zip(candidates[order], values[order])]
@@ -0,0 +1,9 @@
+
+class ModelNotAvailableException(Exception):
+    """Exception raised when no recommendation model can be served."""
+    def __init__(self, message="Recommendation model is not available."):
+        self.message = message
+        super().__init__(self.message)
+
+    def __str__(self):
+        return f"ModelNotAvailableException: {self.message}"
@@ -0,0 +1,138 @@
+"""
+Offline top-N scoring for every user.
+
+Users are split into chunks of contiguous rows and scored in a process pool. Each worker
+memory-maps the same published model version, so the model is read from the page cache instead
+of being pickled to every process. Chunks come back in order and are streamed to either the
+``user_recommendation`` table (through ``COPY``) or a Parquet file. At most two chunks per
+worker are submitted ahead of the one being written, so only a few chunks are ever held in
+memory, however much slower the writer is than the scorers.
+"""
+import csv
+import io
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator
+import numpy as np
+from app.core.config import settings
+from app.core.db import DBConnection
+from app.core.logging import logger
+from app.modules.recommendation import artifacts
+
+COPY_SQL = "COPY user_recommendation (user_id, model_version, rank, book_id, score) FROM STDIN WITH (FORMAT csv)"
+DELETE_VERSION_SQL = "DELETE FROM user_recommendation WHERE model_version = %s"
+DELETE_OLD_SQL = "DELETE FROM user_recommendation WHERE model_version <> %s"
+
+_worker_model = None
+
+def _init_worker(root: str, version: str):
+    global _worker_model
+    _worker_model = artifacts.load_model(root, version)
+
+def _score_chunk(start: int, stop: int, k: int) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Scores user rows ``start:stop`` of the worker's model.
+    Returns (user rows, ranks, item indexes, scores).
+    """
+    positions, items, scores = _worker_model.score_users(np.arange(start, stop), k)
+    ranks = np.arange(len(positions)) - np.searchsorted(positions, positions, side="left")
+    return positions + start, ranks.astype(np.int32), items, scores
+
+def score_all_users(root: str, version: str, k: int, chunk_size: int = 10_000, workers: int = None) -> Iterator[tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Yields (user rows, ranks, item indexes, scores) chunk by chunk, in user order.
+    """
+    n_users = len(np.load(os.path.join(root, version, "user_ids.npy"), mmap_mode="r"))
+    workers = workers or os.cpu_count()
+    bounds = deque((start, min(start + chunk_size, n_users)) for start in range(0, n_users, chunk_size))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(root, version)) as pool:
+        pending = deque()
+        while bounds or pending:
+            # Unlike pool.map, submit only as results are consumed, so a slow writer holds back the scorers.
+            while bounds and len(pending) < 2 * workers:
+                start, stop = bounds.popleft()
+                pending.append(pool.submit(_score_chunk, start, stop, k))
+            yield pending.popleft().result()
+
+def _rows(model, version: str, chunk):
+    users, ranks, items, scores = chunk
+    for user, rank, item, score in zip(users.tolist(), ranks.tolist(), items.tolist(), scores.tolist()):
+        yield (model.user_ids[user], version, rank, model.item_ids[item], score)
+
+def write_table(model, version: str, chunks) -> int:
+    """
+    Copies every chunk into ``user_recommendation`` and removes the rows of other model versions,
+    in one transaction, so readers switch from the old lists to the new ones atomically. Rows
+    already written for ``version`` (a retry or re-export) are replaced.
+    """
+    written = 0
+    connection = DBConnection().get_engine().raw_connection()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(DELETE_VERSION_SQL, (version,))
+            for chunk in chunks:
+                buffer = io.StringIO()
+                csv.writer(buffer, lineterminator="\n").writerows(_rows(model, version, chunk))
+                buffer.seek(0)
+                cursor.copy_expert(COPY_SQL, buffer)
+                written += len(chunk[0])
+                logger.info(f'Copied {written} recommendations')
+            cursor.execute(DELETE_OLD_SQL, (version,))
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
+    return written
+
+def write_parquet(model, version: str, chunks, path: str) -> int:
+    """
+    Writes every chunk as one row group of a Parquet file. Needs the optional ``pyarrow`` package.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("The 'pyarrow' package is required to write Parquet files.")
+
+    schema = pa.schema([
+        ("user_id", pa.string()),
+        ("rank", pa.int32()),
+        ("book_id", pa.string()),
+        ("score", pa.float32()),
+    ])
+    written = 0
+    with pq.ParquetWriter(path, schema, metadata={"model_version": version}) as writer:
+        for users, ranks, items, scores in chunks:
+            writer.write_table(pa.table({
+                "user_id": model.user_ids[users],
+                "rank": ranks,
+                "book_id": model.item_ids[items],
+                "score": scores.astype(np.float32),
+            }, schema=schema))
+            written += len(users)
+            logger.info(f'Wrote {written} recommendations to {path}')
+    return written
+
+def export_top_n(path: str = None, k: int = 50, chunk_size: int = 10_000, workers: int = None) -> dict:
+    """
+    Function to score every user of the published model and store their top ``k`` books,
+    in the ``user_recommendation`` table or, when ``path`` is given, in a Parquet file.
+    """
+    started = time.perf_counter()
+    root = settings.recommendation_model_dir
+    model = artifacts.load_model(root)
+    chunks = score_all_users(root, model.version, k, chunk_size=chunk_size, workers=workers)
+    if path:
+        written = write_parquet(model, model.version, chunks, path)
+    else:
+        written = write_table(model, model.version, chunks)
+    return {
+        "model_version": model.version,
+        "users": len(model.user_ids),
+        "written": written,
+        "seconds": round(time.perf_counter() - started, 2),
+    }
@@ -0,0 +1,45 @@
+from app.core.db import Base
+from sqlalchemy import String, Float, Integer, ForeignKey, Index, text
+from datetime import datetime
+from sqlalchemy.orm import mapped_column, Mapped
+
+class UserRecommendation(Base):
+    """
+    Precomputed top-N lists written by the offline scoring job, one row per (user, rank).
+    Rows of older model versions are replaced when a new export is committed.
+    """
+    __tablename__ = "user_recommendation"
+    __table_args__ = (
+        Index("ix_user_recommendation_updated_at", "updated_at"),
+        Index("ix_user_recommendation_live", "user_id", "model_version", "rank", postgresql_where=text("deleted_at IS NULL")),
+    )
+
+    user_id: Mapped[str] = mapped_column(String, primary_key=True, nullable=False)
+    model_version: Mapped[str] = mapped_column(String, primary_key=True, nullable=False)
+    rank: Mapped[int] = mapped_column(Integer, primary_key=True, nullable=False)
+    book_id: Mapped[str] = mapped_column(String, nullable=False)
+    score: Mapped[float] = mapped_column(Float, nullable=False)
+
+class BookPopularity(Base):
+    """
+    Rollup of the live ratings of every rated book, refreshed incrementally from ``rating``.
+
+    ``log_trend`` is log(sum(exp(decay_rate * (rated_at - TREND_EPOCH)))) over the book's ratings.
+    Exponential decay multiplies every book's sum by the same factor as time passes, so ranking
+    by the undecayed log-sum is the same as ranking by the decayed score, and rows only change
+    when their ratings do. Logs keep the growing exponents in float range.
+    """
+    __tablename__ = "book_popularity"
+    __table_args__ = (
+        Index("ix_book_popularity_popular", text("rating_count DESC"), "book_id", postgresql_where=text("rating_count > 0")),
+        Index("ix_book_popularity_trending", text("log_trend DESC"), "book_id", postgresql_where=text("log_trend IS NOT NULL")),
+        Index("ix_book_popularity_refreshed_through", "refreshed_through"),
+        Index("ix_book_popularity_updated_at", "updated_at"),
+        Index("ix_book_popularity_live", "book_id", postgresql_where=text("deleted_at IS NULL")),
+    )
+
+    book_id: Mapped[str] = mapped_column(String, ForeignKey("book.id"), primary_key=True, nullable=False)
+    rating_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    score_sum: Mapped[float] = mapped_column(Float, nullable=False)
+    log_trend: Mapped[float] = mapped_column(Float, nullable=True)
+    refreshed_through: Mapped[datetime] = mapped_column(nullable=False)
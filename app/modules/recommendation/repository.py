@@ -0,0 +1,149 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import select, func, text
+from datetime import datetime
+from typing import Iterator
+from app.modules.ratings.models import Rating
+from app.modules.books.models import Book
+from app.modules.recommendation.models import BookPopularity
+from app.core.utils import lazy_import
+
+np = lazy_import("numpy")
+sparse = lazy_import("scipy.sparse")
+engine = lazy_import("app.modules.recommendation.engine")
+
+def fetch_interactions(session: Session, chunk_size: int = 100_000) -> tuple["np.ndarray", "np.ndarray", "sparse.csr_matrix"]:
+    """
+    Streams the live ratings out of the database and returns (user_ids, item_ids, user_items).
+    Rows are read in chunks and encoded to integer codes as they arrive, so only the distinct
+    ids are ever held as Python strings.
+    """
+    sql = select(Rating.user_id, Rating.book_id, Rating.score).where(Rating.deleted_at.is_(None))
+    result = session.execute(sql.execution_options(yield_per=chunk_size))
+
+    user_codes, item_codes = {}, {}
+    rows, cols, scores = [], [], []
+    for partition in result.partitions():
+        rows.append(np.fromiter((user_codes.setdefault(r.user_id, len(user_codes)) for r in partition), dtype=np.int32, count=len(partition)))
+        cols.append(np.fromiter((item_codes.setdefault(r.book_id, len(item_codes)) for r in partition), dtype=np.int32, count=len(partition)))
+        scores.append(np.fromiter((r.score for r in partition), dtype=np.float32, count=len(partition)))
+
+    empty = np.zeros(0, dtype=np.int32)
+    user_ids, rows = engine.sort_ids(list(user_codes), np.concatenate(rows) if rows else empty)
+    item_ids, cols = engine.sort_ids(list(item_codes), np.concatenate(cols) if cols else empty)
+    scores = np.concatenate(scores) if scores else np.zeros(0, dtype=np.float32)
+
+    user_items = engine.build_interaction_matrix(rows, cols, scores, shape=(len(user_ids), len(item_ids)))
+    return user_ids, item_ids, user_items
+
+def latest_rating_update(session: Session) -> datetime | None:
+    return session.scalar(select(func.max(Rating.updated_at)))
+
+def fetch_rating_changes(session: Session, since: datetime, chunk_size: int = 100_000) -> tuple["np.ndarray", "np.ndarray", "np.ndarray", "np.ndarray"]:
+    """
+    Returns (user_ids, item_ids, scores, deleted) for every rating written after ``since``,
+    soft-deleted ones included so they can be removed from the model.
+    """
+    sql = (
+        select(Rating.user_id, Rating.book_id, Rating.score, Rating.deleted_at.is_not(None).label("deleted"))
+        .where(Rating.updated_at > since)
+        .order_by(Rating.updated_at)
+    )
+    result = session.execute(sql.execution_options(yield_per=chunk_size))
+    user_ids, item_ids, scores, deleted = [], [], [], []
+    for partition in result.partitions():
+        user_ids.extend(r.user_id for r in partition)
+        item_ids.extend(r.book_id for r in partition)
+        scores.extend(r.score for r in partition)
+        deleted.extend(r.deleted for r in partition)
+    return (
+        np.asarray(user_ids, dtype=str),
+        np.asarray(item_ids, dtype=str),
+        np.asarray(scores, dtype=np.float32),
+        np.asarray(deleted, dtype=bool),
+    )
+
+def fetch_book_documents(session: Session, chunk_size: int = 50_000) -> Iterator[tuple[str, str]]:
+    """
+    Streams (id, text) pairs of the live books, the text being title, author and description.
+    Books are sorted by id in the "C" collation, i.e. by code point, the order ``np.searchsorted``
+    looks them up in. Ids and text come from one query, so a concurrent import or delete cannot
+    pair a text with the wrong id.
+    """
+    sql = (
+        select(Book.id, Book.title, Book.author, Book.description)
+        .where(Book.deleted_at.is_(None))
+        .order_by(Book.id.collate("C"))
+        .execution_options(yield_per=chunk_size)
+    )
+    for row in session.execute(sql):
+        yield row.id, " ".join(filter(None, (row.title, row.author, row.description)))
+
+TREND_EPOCH = datetime(2020, 1, 1)
+
+# Recomputes the rollup rows of every book with a rating written after :since. The log-sum-exp
+# is shifted by the per-book maximum so exp() never overflows, and floored so it never underflows.
+REFRESH_POPULARITY_SQL = text("""
+    WITH touched AS (
+        SELECT DISTINCT book_id FROM rating WHERE updated_at > :since
+    ),
+    weighted AS (
+        SELECT touched.book_id, rating.score,
+            extract(epoch FROM rating.created_at - :epoch) * :decay_rate AS weight
+        FROM touched
+        LEFT JOIN rating ON rating.book_id = touched.book_id AND rating.deleted_at IS NULL
+    ),
+    shifted AS (
+        SELECT book_id, score, weight, max(weight) OVER (PARTITION BY book_id) AS max_weight
+        FROM weighted
+    )
+    INSERT INTO book_popularity (book_id, rating_count, score_sum, log_trend, refreshed_through)
+    SELECT book_id, count(score), coalesce(sum(score), 0),
+        max(max_weight) + ln(sum(exp(greatest(weight - max_weight, -700)))), :through
+    FROM shifted
+    GROUP BY book_id
+    ON CONFLICT (book_id) DO UPDATE SET
+        rating_count = EXCLUDED.rating_count,
+        score_sum = EXCLUDED.score_sum,
+        log_trend = EXCLUDED.log_trend,
+        refreshed_through = EXCLUDED.refreshed_through,
+        updated_at = now()
+""")
+
+def popularity_watermark(session: Session) -> datetime | None:
+    return session.scalar(select(func.max(BookPopularity.refreshed_through)))
+
+def refresh_popularity(session: Session, since: datetime, through: datetime, decay_rate: float) -> int:
+    """
+    Rebuilds the rollup rows of the books rated after ``since``; books whose ratings were all
+    deleted keep a row with a zero count. Returns the number of rows written.
+    """
+    result = session.execute(REFRESH_POPULARITY_SQL, {
+        "since": since,
+        "through": through,
+        "epoch": TREND_EPOCH,
+        "decay_rate": decay_rate,
+    })
+    return result.rowcount
+
+def popular_books(session: Session, kind: str, limit: int, decay_rate: float) -> list[tuple[str, int, float | None]]:
+    """
+    Returns (book_id, rating_count, log of the decayed rating count) of the ``limit`` live books
+    ranked first by ``kind`` ("popular": most ratings, "trending": highest decayed rating count),
+    read off the rollup's ranking index. The decay runs up to the database's ``localtimestamp``,
+    the clock the rating timestamps were written with.
+    """
+    if kind == "popular":
+        order = (BookPopularity.rating_count.desc(), BookPopularity.book_id)
+        condition = BookPopularity.rating_count > 0
+    else:
+        order = (BookPopularity.log_trend.desc(), BookPopularity.book_id)
+        condition = BookPopularity.log_trend.is_not(None)
+    elapsed = func.extract("epoch", func.localtimestamp() - TREND_EPOCH)
+    sql = (
+        select(BookPopularity.book_id, BookPopularity.rating_count, BookPopularity.log_trend - elapsed * decay_rate)
+        .join(Book, Book.id == BookPopularity.book_id)
+        .where(condition, Book.deleted_at.is_(None))
+        .order_by(*order)
+        .limit(limit)
+    )
+    return [tuple(row) for row in session.execute(sql)]
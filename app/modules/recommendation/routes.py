@@ -0,0 +1,59 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import Annotated
+from app.modules.recommendation import services as rec_services
+from app.modules.recommendation.exceptions import ModelNotAvailableException
+from app.modules.recommendation.schemas import RecommendationBatchRequest
+from app.core.schemas import ResponseSchema
+from app.dependencies import get_current_user
+from app.modules.users.schemas import UserData
+
+router = APIRouter(prefix="/recommendations", tags=["Recommendations"])
+
+def _recommendations(user_id: str, k: int) -> dict:
+    try:
+        recommendations = rec_services.recommend(user_id, k)
+    except ModelNotAvailableException as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+
+    return {"status": "success", "message": "Recommendations fetched successfully!", "data": recommendations.model_dump()}
+
+@router.get("/users/{user_id}", status_code=status.HTTP_200_OK, response_model=ResponseSchema)
+def user_recommendations(user: Annotated[UserData, Depends(get_current_user)], user_id: str, k: Annotated[int, Query(ge=1, le=100)] = 10):
+    # Recommendations reveal what a user has read, so only the user and superusers may see them.
+    if user_id != user.id and not user.is_superuser:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Recommendations of other users are restricted to superusers.")
+    return _recommendations(user_id, k)
+
+@router.post("/batch", status_code=status.HTTP_200_OK, response_model=ResponseSchema)
+def batch_recommendations(user: Annotated[UserData, Depends(get_current_user)], batch: RecommendationBatchRequest):
+    if not user.is_superuser:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Batch recommendations are restricted to superusers.")
+    try:
+        recommendations = rec_services.recommend_batch(batch.user_ids, batch.k)
+    except ModelNotAvailableException as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+
+    return {"status": "success", "message": "Recommendations fetched successfully!", "data": recommendations.model_dump()}
+
+@router.get("/books/{book_id}/similar", status_code=status.HTTP_200_OK, response_model=ResponseSchema)
+def similar_books(book_id: str, k: Annotated[int, Query(ge=1, le=100)] = 10):
+    try:
+        similar = rec_services.similar_books(book_id, k)
+    except ModelNotAvailableException as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+
+    return {"status": "success", "message": "Similar books fetched successfully!", "data": similar.model_dump()}
+
+@router.get("/popular", status_code=status.HTTP_200_OK, response_model=ResponseSchema)
+def popular_books(k: Annotated[int, Query(ge=1, le=100)] = 10):
+    popular = rec_services.popular_books("popular", k)
+    return {"status": "success", "message": "Popular books fetched successfully!", "data": popular.model_dump()}
+
+@router.get("/trending", status_code=status.HTTP_200_OK, response_model=ResponseSchema)
+def trending_books(k: Annotated[int, Query(ge=1, le=100)] = 10):
+    trending = rec_services.popular_books("trending", k)
+    return {"status": "success", "message": "Trending books fetched successfully!", "data": trending.model_dump()}
+
+@router.get("/me", status_code=status.HTTP_200_OK, response_model=ResponseSchema)
+def my_recommendations(user: Annotated[UserData, Depends(get_current_user)], k: Annotated[int, Query(ge=1, le=100)] = 10):
+    return _recommendations(user.id, k)
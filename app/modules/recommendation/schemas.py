@@ -0,0 +1,26 @@
+from pydantic import BaseModel, Field
+
+class RecommendedBook(BaseModel):
+    book_id: str
+    score: float
+
+class UserRecommendations(BaseModel):
+    user_id: str
+    items: list[RecommendedBook]
+    # "personalized", or "trending" for users the model cannot recommend to yet
+    source: str = "personalized"
+
+class SimilarBooks(BaseModel):
+    book_id: str
+    items: list[RecommendedBook]
+
+class RecommendationBatchRequest(BaseModel):
+    user_ids: list[str] = Field(min_length=1, max_length=1000)
+    k: int = Field(default=10, ge=1, le=100)
+
+class BatchRecommendations(BaseModel):
+    items: list[UserRecommendations]
+
+class PopularBooks(BaseModel):
+    kind: str
+    items: list[RecommendedBook]
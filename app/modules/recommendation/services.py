@@ -0,0 +1,330 @@
+import math
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
+from sqlalchemy.orm import Session
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.db import DBConnection
+from app.core.utils import lazy_import
+from app.core.logging import logger
+from app.modules.recommendation import repository as rec_repo
+from app.modules.recommendation.cache import recommendation_cache
+from app.modules.recommendation.exceptions import ModelNotAvailableException
+from app.modules.recommendation.schemas import UserRecommendations, RecommendedBook, SimilarBooks, BatchRecommendations, PopularBooks
+
+# The model code pulls in NumPy and SciPy; it is imported when a model is first built or loaded.
+artifacts = lazy_import("app.modules.recommendation.artifacts")
+content = lazy_import("app.modules.recommendation.content")
+engine = lazy_import("app.modules.recommendation.engine")
+als = lazy_import("app.modules.recommendation.als")
+
+if TYPE_CHECKING:
+    from app.modules.recommendation.engine import ItemItemModel
+    from app.modules.recommendation.content import ContentModel
+    from app.modules.recommendation.als import ALSModel
+
+def train_model(session: Session) -> "ItemItemModel":
+    """
+    Function to build the item-item model from the whole ratings table.
+    """
+    started = time.perf_counter()
+    watermark = rec_repo.latest_rating_update(session)
+    user_ids, item_ids, user_items = rec_repo.fetch_interactions(session)
+    model = engine.ItemItemModel.fit(
+        user_ids,
+        item_ids,
+        user_items,
+        top_k=settings.recommendation_neighbours,
+        block_size=settings.recommendation_block_size,
+    )
+    seconds = time.perf_counter() - started
+    model.metadata = {"mode": "full", "watermark": watermark.isoformat() if watermark else None, "seconds": round(seconds, 3)}
+    logger.info(f'Built item-item model for {len(user_ids)} users and {len(item_ids)} items in {seconds:.2f}s')
+    return model
+
+def update_model(session: Session) -> "ItemItemModel | None":
+    """
+    Function to fold the ratings written since the published model's watermark into it.
+    Returns None when nothing changed. Falls back to a full build when no model was published yet.
+
+    Changes are re-read from a little before the watermark so rows committed late are not missed;
+    applying a rating twice sets the same value, so the overlap is harmless.
+    """
+    try:
+        current = artifacts.load_model(settings.recommendation_model_dir)
+    except ModelNotAvailableException:
+        return train_model(session)
+    if not hasattr(current, "apply_updates"):
+        logger.info(f'Published {current.kind} model does not support incremental updates')
+        return None
+    if not current.metadata.get("watermark"):
+        return train_model(session)
+
+    started = time.perf_counter()
+    since = datetime.fromisoformat(current.metadata["watermark"]) - timedelta(seconds=settings.recommendation_watermark_overlap)
+    watermark = rec_repo.latest_rating_update(session)
+    user_ids, item_ids, scores, deleted = rec_repo.fetch_rating_changes(session, since)
+    if not len(scores):
+        logger.info('No rating changes since the published model')
+        return None
+
+    model = current.apply_updates(user_ids, item_ids, scores, deleted)
+    seconds = time.perf_counter() - started
+    model.metadata = {
+        "mode": "incremental",
+        "watermark": watermark.isoformat(),
+        "base_version": current.version,
+        "changes": int(len(scores)),
+        "seconds": round(seconds, 3),
+    }
+    logger.info(f'Applied {len(scores)} rating changes to model {current.version} in {seconds:.2f}s')
+    return model
+
+def train_als_model(session: Session, resume: bool = False) -> "ALSModel":
+    """
+    Function to train the matrix factorization model on the whole ratings table.
+    The model is checkpointed to ``als_checkpoint_dir`` after every epoch; with ``resume`` training
+    continues from the latest checkpoint if it was made with the same ratings and parameters.
+    """
+    started = time.perf_counter()
+    watermark = rec_repo.latest_rating_update(session)
+    user_ids, item_ids, user_items = rec_repo.fetch_interactions(session)
+    params = {
+        "factors": settings.als_factors,
+        "regularization": settings.als_regularization,
+        "implicit": settings.als_implicit,
+        "alpha": settings.als_alpha,
+        "seed": settings.als_seed,
+    }
+    watermark = watermark.isoformat() if watermark else None
+
+    model, start_epoch = None, 0
+    if resume:
+        try:
+            checkpoint = artifacts.load_model(settings.als_checkpoint_dir, mmap=False)
+        except ModelNotAvailableException:
+            checkpoint = None
+        if checkpoint is not None and checkpoint.params == params and checkpoint.metadata.get("watermark") == watermark:
+            model, start_epoch = checkpoint, checkpoint.metadata["epoch"]
+            logger.info(f'Resuming ALS training from checkpoint {checkpoint.version} after epoch {start_epoch}')
+    if model is None:
+        model = als.ALSModel.initial(user_ids, item_ids, user_items, settings.als_factors, settings.als_seed, params)
+    model.metadata = {**model.metadata, "mode": "full", "watermark": watermark}
+
+    def checkpoint(model: "ALSModel"):
+        artifacts.save_model(model, settings.als_checkpoint_dir, metadata=model.metadata)
+        artifacts.prune_versions(settings.als_checkpoint_dir, keep=2)
+
+    trainer = als.ALSTrainer(
+        regularization=settings.als_regularization,
+        implicit=settings.als_implicit,
+        alpha=settings.als_alpha,
+        block_size=settings.als_block_size,
+        workers=settings.als_workers,
+        checkpoint=checkpoint,
+    )
+    model = trainer.train(model, settings.als_epochs, start_epoch=start_epoch)
+    seconds = time.perf_counter() - started
+    model.metadata["seconds"] = round(seconds, 3)
+    logger.info(f'Trained ALS model for {len(user_ids)} users and {len(item_ids)} items in {seconds:.2f}s')
+    return model
+
+def publish_model(model, root: str = None) -> str:
+    """
+    Function to write a trained model as a new artifact version and make it the served one.
+    """
+    root = root or settings.recommendation_model_dir
+    version = artifacts.save_model(model, root, metadata=model.metadata)
+    artifacts.prune_versions(root, keep=settings.recommendation_keep_versions)
+    logger.info(f'Published {model.kind} model version {version}')
+    return version
+
+class ModelHolder:
+    """
+    Holds the model served from one artifact root, memory-mapping the published version on first use.
+    Every ``recommendation_reload_interval`` seconds the ``CURRENT`` pointer is checked and a newly
+    published version is swapped in; requests already holding the old model finish on it.
+    """
+    def __init__(self, root: str, on_load=None):
+        self.root = root
+        self.on_load = on_load
+        self.model = None
+        self._lock = threading.Lock()
+        self._last_reload_check = 0.0
+
+    def _reload_due(self) -> bool:
+        return self.model is None or time.monotonic() - self._last_reload_check >= settings.recommendation_reload_interval
+
+    def get(self):
+        if self._reload_due():
+            with self._lock:
+                if self._reload_due():
+                    version = artifacts.current_version(self.root)
+                    if self.model is None or (version and version != self.model.version):
+                        self.model = artifacts.load_model(self.root, version)
+                        logger.info(f'Loaded {self.model.kind} model version {self.model.version}')
+                        if self.on_load is not None:
+                            self.on_load(self.model)
+                    self._last_reload_check = time.monotonic()
+        return self.model
+
+    def set(self, model):
+        self.model = model
+
+def warm_recommendation_cache(model: "ItemItemModel", limit: int = None) -> int:
+    """
+    Function to precompute the recommendation lists of the most active users of ``model``.
+    Returns the number of lists cached.
+    """
+    started = time.perf_counter()
+    limit = settings.recommendation_warm_users if limit is None else limit
+    user_ids = model.most_active_users(limit)
+    for user_id in user_ids:
+        user_id = str(user_id)
+        recommendation_cache.set(user_id, model.version, model.recommend(user_id, settings.recommendation_cache_list_size))
+    logger.info(f'Warmed {len(user_ids)} recommendation lists for model {model.version} in {time.perf_counter() - started:.2f}s')
+    return len(user_ids)
+
+def start_cache_warmup(model: "ItemItemModel"):
+    """
+    Function to warm the cache for a freshly loaded model in a background thread, so the
+    request that triggered the load is not held up by it.
+    """
+    if settings.recommendation_warm_users > 0:
+        threading.Thread(target=warm_recommendation_cache, args=(model,), name="recommendation-cache-warmup", daemon=True).start()
+
+item_model = ModelHolder(settings.recommendation_model_dir, on_load=start_cache_warmup)
+content_model = ModelHolder(settings.content_model_dir)
+
+def preload_models():
+    """
+    Function to load the published models (and with them NumPy and SciPy) before serving,
+    so the first recommendation request does not pay for it. Missing models are not an error;
+    they are loaded once published.
+    """
+    for holder in (item_model, content_model):
+        try:
+            holder.get()
+        except ModelNotAvailableException as e:
+            logger.info(f'No model to preload from {holder.root}: {e}')
+
+def set_model(model: "ItemItemModel"):
+    item_model.set(model)
+
+def get_model() -> "ItemItemModel":
+    return item_model.get()
+
+def recommend(user_id: str, k: int = 10) -> UserRecommendations:
+    """
+    Function to get the top ``k`` books for a user from the precomputed neighbour table,
+    served from the recommendation cache when the user's list is already there.
+    """
+    model = get_model()
+    if k > settings.recommendation_cache_list_size:
+        items = model.recommend(user_id, k)
+    else:
+        items = recommendation_cache.get(user_id, model.version)
+        if items is None:
+            items = model.recommend(user_id, settings.recommendation_cache_list_size)
+            recommendation_cache.set(user_id, model.version, items)
+        items = items[:k]
+    if not items:
+        return UserRecommendations(user_id=user_id, items=popular_books("trending", k).items, source="trending")
+    return UserRecommendations(
+        user_id=user_id,
+        items=[RecommendedBook(book_id=book_id, score=score) for book_id, score in items],
+    )
+
+def recommend_batch(user_ids: list[str], k: int = 10) -> BatchRecommendations:
+    """
+    Function to get the top ``k`` books for many users, scored together in one sparse product.
+    """
+    results = get_model().recommend_batch(user_ids, k)
+    return BatchRecommendations(items=[
+        UserRecommendations(user_id=user_id, items=[RecommendedBook(book_id=book_id, score=score) for book_id, score in items])
+        for user_id, items in zip(user_ids, results)
+    ])
+
+def invalidate_recommendations(user_ids):
+    recommendation_cache.invalidate(user_ids)
+
+def recommendation_cache_stats() -> dict:
+    return recommendation_cache.stats()
+
+def build_content_model(session: Session) -> "ContentModel":
+    """
+    Function to build the content-based similar-books index from the catalog text.
+    """
+    started = time.perf_counter()
+    model = content.build_content_model(
+        rec_repo.fetch_book_documents(session),
+        dim=settings.content_embedding_dim,
+        n_features=settings.content_hash_features,
+        n_lists=settings.content_lists,
+    )
+    seconds = time.perf_counter() - started
+    model.metadata = {"seconds": round(seconds, 3)}
+    logger.info(f'Built content index for {len(model.item_ids)} books in {seconds:.2f}s')
+    return model
+
+def similar_books(book_id: str, k: int = 10) -> SimilarBooks:
+    """
+    Function to get the ``k`` books whose text is closest to ``book_id``.
+    """
+    items = content_model.get().similar(book_id, k, nprobe=settings.content_nprobe)
+    return SimilarBooks(
+        book_id=book_id,
+        items=[RecommendedBook(book_id=similar_id, score=score) for similar_id, score in items],
+    )
+
+POPULARITY_KINDS = ("popular", "trending")
+
+popularity_lists = TTLCache(maxsize=len(POPULARITY_KINDS), ttl=settings.popularity_cache_ttl)
+
+def popularity_decay_rate() -> float:
+    return math.log(2) / (settings.popularity_half_life_days * 86400)
+
+def refresh_popularity(session: Session, full: bool = False) -> dict:
+    """
+    Function to bring the popularity rollup up to date with the ratings table. Only books with
+    ratings written since the last refresh are recomputed, re-read from a little before the
+    watermark like ``update_model``; ``full`` recomputes every rated book.
+    """
+    started = time.perf_counter()
+    watermark = rec_repo.popularity_watermark(session)
+    if full or watermark is None:
+        since = datetime.min
+    else:
+        since = watermark - timedelta(seconds=settings.recommendation_watermark_overlap)
+    through = rec_repo.latest_rating_update(session)
+    if through is None:
+        return {"books": 0, "seconds": 0.0}
+    books = rec_repo.refresh_popularity(session, since, through, popularity_decay_rate())
+    session.commit()
+    seconds = time.perf_counter() - started
+    logger.info(f'Refreshed popularity of {books} books in {seconds:.2f}s')
+    return {"books": books, "watermark": through.isoformat(), "seconds": round(seconds, 3)}
+
+def _load_popularity_list(kind: str) -> list[RecommendedBook]:
+    session = DBConnection().create_replica_session()
+    try:
+        rows = rec_repo.popular_books(session, kind, settings.popularity_list_size, popularity_decay_rate())
+    finally:
+        session.close()
+    if kind == "popular":
+        return [RecommendedBook(book_id=book_id, score=count) for book_id, count, _ in rows]
+    return [RecommendedBook(book_id=book_id, score=math.exp(log_score)) for book_id, _, log_score in rows]
+
+def popular_books(kind: str, k: int = 10) -> PopularBooks:
+    """
+    Function to get the ``k`` most rated ("popular") or most rated recently ("trending") books.
+    The top ``popularity_list_size`` of each list is read from the rollup table and kept in
+    memory for ``popularity_cache_ttl`` seconds.
+    """
+    items = popularity_lists.get(kind)
+    if items is None:
+        items = _load_popularity_list(kind)
+        popularity_lists.set(kind, items)
+    return PopularBooks(kind=kind, items=items[:k])
@@ -1,5 +1,5 @@
 from app.core.db import Base
-from sqlalchemy import Column, Integer, String, Boolean
+from sqlalchemy import Column, Integer, String, Boolean, Index, text
 from sqlalchemy.orm import mapped_column, validates, Mapped
 from string import punctuation
 import email_validator
@@ -8,6 +8,11 @@ import uuid
 
 class User(Base):
     __tablename__ = "user"
+    __table_args__ = (
+        Index("ix_user_created_at_id", "created_at", "id", postgresql_where=text("deleted_at IS NULL")),
+        Index("ix_user_updated_at", "updated_at"),
+        Index("ix_user_live", "id", postgresql_where=text("deleted_at IS NULL")),
+    )
 
     id: Mapped[str] = mapped_column(primary_key=True, default= lambda: str(uuid.uuid4()), unique=True, nullable=False)
     email: Mapped[str] = mapped_column(String(255), unique=True, nullable=False)
@@ -1,37 +1,83 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession, AsyncResult
+from datetime import datetime
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy import select
+from sqlalchemy import select, update, func, tuple_
 from app.modules.users.models import User
 from app.core.logging import logger
 from fastapi import HTTPException, status
-from app.core.security import get_password_hash
-from psycopg2.errors import UniqueViolation
+from app.core.security import get_password_hash_async
 from app.modules.users.exceptions import UserAlreadyExistsException
 from app.core.utils import extract_violating_column
 
-def user_create(session: Session, user_data: dict):
+UNIQUE_VIOLATION = '23505'
+
+async def user_create(session: AsyncSession, user_data: dict):
     """
     Function to handle user creation.
     This function will contain the logic for creating a user in the database.
     """
     new_user = User(**user_data)
-    new_user.password = get_password_hash(new_user.password)
+    new_user.password = await get_password_hash_async(new_user.password)
     try:
         session.add(new_user)
-        session.commit()
+        await session.commit()
     except IntegrityError as e:
-        session.rollback()
-        if isinstance(e.orig, UniqueViolation):
-            col_name, col_value = extract_violating_column(str(e.orig))
+        await session.rollback()
+        if getattr(e.orig, 'pgcode', None) == UNIQUE_VIOLATION:
+            # asyncpg keeps the "Key (col)=(value)" part in the detail of the original error
+            error_msg = getattr(e.orig.__cause__, 'detail', None) or str(e.orig)
+            col_name, col_value = extract_violating_column(error_msg)
             if col_name:
                 raise UserAlreadyExistsException(f"User with {col_name} '{col_value}' already exists.")
     
-def get_user(session: Session, email: str= None, id: int = None) -> User:
+async def get_user(session: AsyncSession, email: str= None, id: int = None) -> User:
     if not email and not id:
         raise HTTPException(status.HTTP_400_BAD_REQUEST, detail="No unique identification provided to get user.")
     sql = select(User).where((User.id == id) if id else (User.email == email))
-    user = session.scalar(sql)
+    user = await session.scalar(sql)
     if not user or user.deleted_at:
         raise HTTPException(status.HTTP_404_NOT_FOUND, detail='User not found!')
     
-    return user
\ No newline at end of file
+    return user
+
+async def user_update(session: AsyncSession, id: str, user_data: dict) -> User:
+    sql = (
+        update(User)
+        .where(User.id == id, User.deleted_at.is_(None))
+        .values(**user_data, updated_at=func.now())
+        .returning(User)
+    )
+    user = await session.scalar(sql)
+    if not user:
+        await session.rollback()
+        raise HTTPException(status.HTTP_404_NOT_FOUND, detail='User not found!')
+    await session.commit()
+
+    return user
+
+async def user_soft_delete(session: AsyncSession, id: str):
+    sql = (
+        update(User)
+        .where(User.id == id, User.deleted_at.is_(None))
+        .values(deleted_at=func.now(), updated_at=func.now())
+    )
+    result = await session.execute(sql)
+    if not result.rowcount:
+        await session.rollback()
+        raise HTTPException(status.HTTP_404_NOT_FOUND, detail='User not found!')
+    await session.commit()
+
+async def list_users(session: AsyncSession, limit: int, after: tuple[datetime, str] = None) -> AsyncResult:
+    """
+    Newest users first, keyset paginated on (created_at, id). Only the profile columns are
+    selected, so password hashes never leave the database for a listing.
+    """
+    sql = (
+        select(User.id, User.email, User.first_name, User.last_name, User.created_at)
+        .where(User.deleted_at.is_(None))
+        .order_by(User.created_at.desc(), User.id.desc())
+        .limit(limit)
+    )
+    if after:
+        sql = sql.where(tuple_(User.created_at, User.id) < tuple_(*after))
+    return await session.stream(sql)
@@ -1,3 +1,38 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from typing import Annotated
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.dependencies import get_routed_db, get_current_user
+from app.modules.users.schemas import UserData, UserUpdate, UserProfile
+from app.modules.users import services as user_services
+from app.core.schemas import ResponseSchema
+from app.core.pagination import decode_created_at_cursor
 
-router = APIRouter(prefix="/users", tags=["users"])
\ No newline at end of file
+router = APIRouter(prefix="/users", tags=["users"])
+
+@router.get("", status_code=status.HTTP_200_OK, response_model=ResponseSchema)
+async def list_users(user: Annotated[UserData, Depends(get_current_user)], limit: Annotated[int, Query(ge=1, le=1000)] = 50, cursor: str = None):
+    if not user.is_superuser:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Listing users is restricted to superusers.")
+    after = decode_created_at_cursor(cursor) if cursor else None
+
+    return StreamingResponse(user_services.stream_users(limit, after), media_type="application/json")
+
+@router.get("/me", status_code=status.HTTP_200_OK, response_model=ResponseSchema)
+async def get_me(user: Annotated[UserData, Depends(get_current_user)]):
+    profile = UserProfile.model_validate(user, from_attributes=True)
+
+    return {"status": "success", "message": "User fetched successfully!", "data": profile.model_dump()}
+
+@router.patch("/me", status_code=status.HTTP_200_OK, response_model=ResponseSchema)
+async def update_me(session: Annotated[AsyncSession, Depends(get_routed_db)], user: Annotated[UserData, Depends(get_current_user)], user_data: UserUpdate):
+    updated = await user_services.update_user(session, user.id, user_data)
+    profile = UserProfile.model_validate(updated, from_attributes=True)
+
+    return {"status": "success", "message": "User updated successfully!", "data": profile.model_dump()}
+
+@router.delete("/me", status_code=status.HTTP_200_OK, response_model=ResponseSchema)
+async def delete_me(session: Annotated[AsyncSession, Depends(get_routed_db)], user: Annotated[UserData, Depends(get_current_user)]):
+    await user_services.delete_user(session, user.id)
+
+    return {"status": "success", "message": "User deleted successfully!"}
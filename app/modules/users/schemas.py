@@ -7,4 +7,14 @@ class UserData(BaseModel):
     first_name: str | None = None
     last_name: str | None = None
     is_active: bool = True
-    is_superuser: bool = False
\ No newline at end of file
+    is_superuser: bool = False
+
+class UserUpdate(BaseModel):
+    first_name: str | None = None
+    last_name: str | None = None
+
+class UserProfile(BaseModel):
+    id: str
+    email: EmailStr
+    first_name: str | None = None
+    last_name: str | None = None
@@ -0,0 +1,92 @@
+import asyncio
+from datetime import datetime
+from typing import AsyncIterator
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import TTLCache, create_shared_store
+from app.core.config import settings
+from app.core.db import DBConnection
+from app.core.logging import logger
+from app.core.pagination import stream_page
+from app.modules.users import repository as user_repo
+from app.modules.users.schemas import UserData, UserUpdate, UserProfile
+
+# Cache of user rows for authenticated requests, in two tiers like the recommendation cache.
+# Each worker keeps entries for a few seconds only, since deactivating or deleting a user must
+# take effect everywhere; the shared tier, when configured, holds them longer and is
+# invalidated on writes, so the other workers pick the change up within the local TTL.
+USER_KEY_PREFIX = "user:"
+
+user_cache = TTLCache(maxsize=settings.identity_cache_size, ttl=settings.identity_cache_local_ttl)
+shared_user_store = create_shared_store(settings.cache_url)
+
+def _shared_get(id: str) -> UserData | None:
+    try:
+        raw = shared_user_store.get(USER_KEY_PREFIX + id)
+    except Exception as e:
+        logger.warning(f'Shared identity cache read failed: {e}')
+        return None
+    return UserData.model_validate_json(raw) if raw is not None else None
+
+def _shared_set(id: str, user: UserData):
+    # SecretStr serialises masked, so the password hash never reaches the shared tier.
+    try:
+        shared_user_store.set(USER_KEY_PREFIX + id, user.model_dump_json(), ex=int(settings.identity_cache_ttl))
+    except Exception as e:
+        logger.warning(f'Shared identity cache write failed: {e}')
+
+async def get_user_cached(session: AsyncSession, id: str) -> UserData:
+    """
+    Function to get a user by id, going to the database only on a cache miss.
+    Local hits are not written back, so a local entry always expires ``identity_cache_local_ttl``
+    after it was read from the shared tier or the database.
+    """
+    user = user_cache.get(id)
+    if user is not None:
+        return user
+    # The shared store client is synchronous; keep its round trips off the event loop.
+    if shared_user_store is not None:
+        user = await asyncio.to_thread(_shared_get, id)
+    if user is None:
+        user = UserData.model_validate(await user_repo.get_user(session, id=id), from_attributes=True)
+        if shared_user_store is not None:
+            await asyncio.to_thread(_shared_set, id, user)
+    user_cache.set(id, user)
+    return user
+
+def invalidate_user(id: str):
+    user_cache.delete(id)
+    if shared_user_store is not None:
+        try:
+            shared_user_store.delete(USER_KEY_PREFIX + id)
+        except Exception as e:
+            logger.warning(f'Shared identity cache invalidation failed: {e}')
+
+async def update_user(session: AsyncSession, id: str, user_data: UserUpdate) -> UserData:
+    """
+    Function to update a user's profile.
+    """
+    user = await user_repo.user_update(session, id, user_data.model_dump(exclude_unset=True))
+    await asyncio.to_thread(invalidate_user, id)
+    return UserData.model_validate(user, from_attributes=True)
+
+async def delete_user(session: AsyncSession, id: str):
+    """
+    Function to soft delete a user.
+    """
+    await user_repo.user_soft_delete(session, id)
+    await asyncio.to_thread(invalidate_user, id)
+
+async def stream_users(limit: int, after: tuple[datetime, str] = None) -> AsyncIterator[bytes]:
+    """
+    Function to stream one page of the user listing as JSON.
+    """
+    async with await DBConnection().connect_replica_async_session() as session:
+        rows = await user_repo.list_users(session, limit + 1, after)
+        async for chunk in stream_page(
+            rows,
+            limit,
+            serialize=lambda row: UserProfile.model_validate(row, from_attributes=True).model_dump_json(),
+            cursor_of=lambda row: [row.created_at.isoformat(), row.id],
+            message="Users fetched successfully!",
+        ):
+            yield chunk
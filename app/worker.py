@@ -0,0 +1,335 @@
+"""
+Scheduler for periodic background jobs: model updates and rebuilds, the popularity rollup and
+cache warmup.
+
+Every job runs on an interval or a cron expression. A job only runs on the node that holds its
+Postgres advisory lock; the lock is taken on a dedicated connection and kept between runs, so the
+node that wins stays leader until it stops or its connection drops, and the others take over
+then. Runs are counted and timed in ``app.core.metrics``.
+
+The worker runs standalone:
+
+    python -m app.worker [--metrics-port 9100]
+
+or inside the API process when ``worker_enabled`` is set, started and stopped by the FastAPI
+lifespan. Stopping waits up to ``worker_shutdown_timeout`` seconds for running jobs.
+"""
+import argparse
+import signal
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable
+from sqlalchemy import text
+from sqlalchemy.engine import Engine, create_engine
+from sqlalchemy.pool import NullPool
+from app.core import constants
+from app.core import metrics
+from app.core.config import settings
+from app.core.db import DBConnection
+from app.core.logging import logger
+from app.core.utils import lazy_import
+from app.modules.recommendation import services as rec_services
+
+artifacts = lazy_import("app.modules.recommendation.artifacts")
+
+job_runs = metrics.registry.register(metrics.Counter("worker_job_runs_total", "Scheduled job runs by job and outcome.", ("job", "status")))
+job_seconds = metrics.registry.register(metrics.Histogram("worker_job_duration_seconds", "Duration of scheduled job runs.", ("job",), buckets=(0.1, 0.5, 1, 5, 10, 30, 60, 300, 900, 1800, 3600)))
+job_last_success = metrics.registry.register(metrics.Gauge("worker_job_last_success_timestamp_seconds", "Unix time of the last successful run of each job.", ("job",)))
+job_leader = metrics.registry.register(metrics.Gauge("worker_job_leader", "1 when this process holds the job's leader lock.", ("job",)))
+
+class CronSchedule:
+    """
+    Five-field cron expression (minute, hour, day of month, month, day of week), each field
+    '*', a number, a range 'a-b', a step '*/n', 'a-b/n' or 'a/n' (a, a+n, ... up to the field's
+    maximum), or a comma separated list of those.
+    As in cron, when both day fields are restricted a day matching either one fires.
+    """
+    # Sunday may be written as 0 or 7.
+    FIELDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Invalid cron expression '{expression}': expected 5 fields.")
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, weekdays = (
+            self._parse(field, low, high) for field, (low, high) in zip(fields, self.FIELDS)
+        )
+        self.weekdays = frozenset(weekday % 7 for weekday in weekdays)
+        self.any_day = fields[2] == "*"
+        self.any_weekday = fields[4] == "*"
+
+    def _parse(self, field: str, low: int, high: int) -> frozenset[int]:
+        values = set()
+        for part in field.split(","):
+            span, _, step = part.partition("/")
+            if span == "*":
+                start, stop = low, high
+            elif "-" in span:
+                start, stop = (int(value) for value in span.split("-", 1))
+            else:
+                start = stop = int(span)
+                if step:
+                    stop = high
+            if not low <= start <= stop <= high:
+                raise ValueError(f"Invalid cron field '{field}': values must be within {low}-{high}.")
+            values.update(range(start, stop + 1, int(step) if step else 1))
+        return frozenset(values)
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day = moment.day in self.days
+        weekday = (moment.isoweekday() % 7) in self.weekdays
+        if self.any_day or self.any_weekday:
+            return day and weekday
+        return day or weekday
+
+    def next_after(self, moment: datetime) -> datetime:
+        """
+        Returns the first matching minute strictly after ``moment``, skipping whole days and
+        hours that cannot match.
+        """
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + timedelta(days=366 * 5)
+        while candidate < limit:
+            if candidate.month not in self.months or not self._day_matches(candidate):
+                candidate = (candidate + timedelta(days=1)).replace(hour=0, minute=0)
+            elif candidate.hour not in self.hours:
+                candidate = (candidate + timedelta(hours=1)).replace(minute=0)
+            elif candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+        raise ValueError(f"Cron expression '{self.expression}' never fires.")
+
+class Job:
+    def __init__(self, name: str, func: Callable[[], object], interval: float = None, cron: str = None):
+        if (interval is None) == (cron is None):
+            raise ValueError(f"Job '{name}' needs exactly one of interval or cron.")
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.cron = CronSchedule(cron) if cron else None
+        self.next_run = None
+        self.running = False
+        self.lock = LeaderLock(name)
+
+    def schedule_next(self, now: datetime):
+        if self.cron is not None:
+            self.next_run = self.cron.next_after(now)
+        else:
+            self.next_run = now + timedelta(seconds=self.interval)
+
+_lock_engine = None
+_lock_engine_lock = threading.Lock()
+
+def get_lock_engine() -> Engine:
+    """
+    Engine for the leader lock connections. They are held for the life of the process, so they
+    are opened outside the primary pool the API's requests check connections out of.
+    """
+    global _lock_engine
+    with _lock_engine_lock:
+        if _lock_engine is None:
+            _lock_engine = create_engine(str(DBConnection().get_db_connection_url()), poolclass=NullPool)
+        return _lock_engine
+
+class LeaderLock:
+    """
+    Session-level ``pg_try_advisory_lock`` held on its own connection. The key is derived from the
+    job name, so every node agrees on it without coordination.
+    """
+    def __init__(self, name: str):
+        self.name = name
+        self.key = zlib.crc32(f"worker:{name}".encode())
+        self.connection = None
+
+    def acquire(self) -> bool:
+        if self.connection is not None:
+            try:
+                self.connection.execute(text("SELECT 1"))
+                self.connection.commit()
+                return True
+            except Exception as e:
+                logger.warning(f'Lost leader lock for job {self.name}: {e}')
+                self._close()
+        try:
+            self.connection = get_lock_engine().connect()
+            if self.connection.scalar(text("SELECT pg_try_advisory_lock(:key)"), {"key": self.key}):
+                self.connection.commit()
+                job_leader.set(self.name, value=1)
+                logger.info(f'Acquired leader lock for job {self.name}')
+                return True
+        except Exception as e:
+            logger.warning(f'Could not take leader lock for job {self.name}: {e}')
+        self._close()
+        return False
+
+    def release(self):
+        if self.connection is not None:
+            try:
+                self.connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self.key})
+                self.connection.commit()
+            except Exception as e:
+                logger.warning(f'Could not release leader lock for job {self.name}: {e}')
+            self._close()
+
+    def _close(self):
+        job_leader.set(self.name, value=0)
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            except Exception:
+                pass
+            self.connection = None
+
+class Worker:
+    def __init__(self, jobs: list[Job], threads: int = None, tick: float = None):
+        self.jobs = jobs
+        self.tick = tick or settings.worker_tick_seconds
+        # Jobs run in daemon threads, so one stuck past the shutdown timeout cannot hold up the
+        # interpreter exit; at most ``threads`` of them run at once.
+        self._slots = threading.BoundedSemaphore(threads or settings.worker_threads)
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def start(self):
+        now = datetime.now(constants.tzinfo)
+        for job in self.jobs:
+            job.schedule_next(now)
+        self._thread = threading.Thread(target=self._run, name="worker-scheduler", daemon=True)
+        self._thread.start()
+        logger.info(f'Worker started with jobs: {", ".join(job.name for job in self.jobs) or "none"}')
+
+    def _run(self):
+        while not self._stopping.wait(self.tick):
+            now = datetime.now(constants.tzinfo)
+            for job in self.jobs:
+                if job.running or now < job.next_run:
+                    continue
+                # With every slot busy the job stays due and is retried on the next tick.
+                if not self._slots.acquire(blocking=False):
+                    break
+                job.schedule_next(now)
+                if not job.lock.acquire():
+                    self._slots.release()
+                    continue
+                job.running = True
+                threading.Thread(target=self._execute, args=(job,), name=f"worker-job-{job.name}", daemon=True).start()
+
+    def _execute(self, job: Job):
+        started = time.perf_counter()
+        try:
+            result = job.func()
+            job_runs.inc(job.name, "success")
+            job_last_success.set(job.name, value=time.time())
+            logger.info(f'Job {job.name} finished in {time.perf_counter() - started:.2f}s: {result}')
+        except Exception:
+            job_runs.inc(job.name, "failure")
+            logger.exception(f'Job {job.name} failed')
+        finally:
+            job_seconds.observe(job.name, value=time.perf_counter() - started)
+            job.running = False
+            self._slots.release()
+
+    def stop(self, timeout: float = None):
+        """
+        Stops scheduling, waits up to ``timeout`` seconds for running jobs and releases the
+        leader locks. Jobs still running after the timeout are left to their daemon threads,
+        which end with the process; their leader locks go with its connections.
+        """
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join()
+        deadline = time.monotonic() + (settings.worker_shutdown_timeout if timeout is None else timeout)
+        while any(job.running for job in self.jobs) and time.monotonic() < deadline:
+            time.sleep(0.1)
+        for job in self.jobs:
+            if not job.running:
+                job.lock.release()
+        logger.info('Worker stopped')
+
+def _with_session(func: Callable, replica: bool = False):
+    def run():
+        db = DBConnection()
+        session = db.create_replica_session() if replica else db.create_session()
+        try:
+            return func(session)
+        finally:
+            session.close()
+    return run
+
+def update_model_job():
+    model = _with_session(rec_services.update_model, replica=True)()
+    if model is None:
+        return "up to date"
+    return _publish_and_warm(model)
+
+def retrain_model_job():
+    return _publish_and_warm(_with_session(rec_services.train_model, replica=True)())
+
+def _publish_and_warm(model):
+    version = rec_services.publish_model(model)
+    warmed = rec_services.warm_recommendation_cache(artifacts.load_model(settings.recommendation_model_dir, version))
+    return {"version": version, "warmed": warmed}
+
+def rebuild_content_job():
+    model = _with_session(rec_services.build_content_model, replica=True)()
+    return rec_services.publish_model(model, settings.content_model_dir)
+
+def refresh_popularity_job():
+    return _with_session(rec_services.refresh_popularity)()
+
+def warm_cache_job():
+    return rec_services.warm_recommendation_cache(rec_services.get_model())
+
+def default_jobs() -> list[Job]:
+    """
+    The jobs enabled in settings; a job whose interval or cron setting is empty is left out.
+    """
+    candidates = [
+        ("update-model", update_model_job, settings.job_update_model_interval, None),
+        ("retrain-model", retrain_model_job, None, settings.job_retrain_model_cron),
+        ("rebuild-content", rebuild_content_job, None, settings.job_rebuild_content_cron),
+        ("refresh-popularity", refresh_popularity_job, settings.job_refresh_popularity_interval, None),
+        ("warm-cache", warm_cache_job, settings.job_warm_cache_interval, None),
+    ]
+    return [Job(name, func, interval=interval, cron=cron) for name, func, interval, cron in candidates if interval or cron]
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = metrics.registry.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def main(argv: list[str] = None):
+    parser = argparse.ArgumentParser(prog="app.worker", description="Run the scheduled background jobs.")
+    parser.add_argument("--metrics-port", type=int, default=None, help="Serve Prometheus metrics on this port.")
+    args = parser.parse_args(argv)
+
+    worker = Worker(default_jobs())
+    stopping = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stopping.set())
+
+    server = None
+    if args.metrics_port:
+        server = ThreadingHTTPServer(("0.0.0.0", args.metrics_port), _MetricsHandler)
+        threading.Thread(target=server.serve_forever, name="worker-metrics", daemon=True).start()
+
+    worker.start()
+    stopping.wait()
+    worker.stop()
+    if server is not None:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+ALS training throughput on synthetic ratings.
+
+Reports the time per epoch for the given worker count and extrapolates it linearly in the
+number of ratings, which is how the solve cost scales for a fixed number of factors.
+
+    OMP_NUM_THREADS=1 python -m benchmarks.bench_als --ratings 5000000 --workers 32
+"""
+import argparse
+import time
+import numpy as np
+from app.modules.recommendation.als import ALSModel, ALSTrainer
+from app.modules.recommendation.engine import build_interaction_matrix
+from benchmarks.synthetic import synthetic_ratings
+
+def main(args):
+    user_ids, item_ids, scores = synthetic_ratings(args.users, args.items, args.ratings, seed=args.seed)
+    users, user_codes = np.unique(user_ids, return_inverse=True)
+    items, item_codes = np.unique(item_ids, return_inverse=True)
+    # Keep one rating per (user, item), as the ratings table does, instead of summing repeats.
+    _, first = np.unique(user_codes.astype(np.int64) * len(items) + item_codes, return_index=True)
+    matrix = build_interaction_matrix(user_codes[first], item_codes[first], scores[first], shape=(len(users), len(items)))
+
+    model = ALSModel.initial(users, items, matrix, args.factors, args.seed, params={})
+    trainer = ALSTrainer(regularization=args.regularization, implicit=args.implicit, block_size=args.block_size, workers=args.workers)
+    started = time.perf_counter()
+    trainer.train(model, args.epochs)
+    seconds = (time.perf_counter() - started) / args.epochs
+
+    print(f"ratings={matrix.nnz} users={len(users)} items={len(items)} factors={args.factors} workers={args.workers}")
+    print(f"seconds per epoch:   {seconds:8.2f}")
+    if not args.implicit:
+        print(f"training rmse:       {model.training_rmse():8.4f}")
+    projected = seconds * args.target_ratings / matrix.nnz * args.target_epochs
+    print(f"projected {args.target_epochs} epochs on {args.target_ratings:,} ratings: {projected / 3600:.2f}h")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=200_000)
+    parser.add_argument("--items", type=int, default=50_000)
+    parser.add_argument("--ratings", type=int, default=2_000_000)
+    parser.add_argument("--factors", type=int, default=64)
+    parser.add_argument("--regularization", type=float, default=0.1)
+    parser.add_argument("--implicit", action="store_true")
+    parser.add_argument("--epochs", type=int, default=2)
+    parser.add_argument("--block-size", type=int, default=4096)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--target-ratings", type=int, default=50_000_000)
+    parser.add_argument("--target-epochs", type=int, default=15)
+    main(parser.parse_args())
@@ -0,0 +1,62 @@
+"""
+Incremental model update against a full rebuild of the item-item model, on synthetic data.
+
+Builds a model, applies a batch of new/changed ratings with ``ItemItemModel.apply_updates``,
+then rebuilds from scratch on the same ratings and reports both timings and how many of the
+incrementally maintained neighbours match the exact ones.
+
+    python -m benchmarks.bench_incremental --users 100000 --items 50000 --ratings 3000000 --changes 1000
+"""
+import argparse
+import time
+import numpy as np
+from app.modules.recommendation.engine import ItemItemModel, build_interaction_matrix
+from benchmarks.synthetic import synthetic_ratings
+
+def build(user_ids, item_ids, scores, top_k: int, block_size: int) -> ItemItemModel:
+    users, user_codes = np.unique(user_ids, return_inverse=True)
+    items, item_codes = np.unique(item_ids, return_inverse=True)
+    matrix = build_interaction_matrix(user_codes, item_codes, scores, shape=(len(users), len(items)))
+    return ItemItemModel.fit(users, items, matrix, top_k=top_k, block_size=block_size)
+
+def neighbour_overlap(a: ItemItemModel, b: ItemItemModel) -> float:
+    overlaps = []
+    for row in range(a.similarity.shape[0]):
+        expected = a.similarity.indices[a.similarity.indptr[row]:a.similarity.indptr[row + 1]]
+        if len(expected):
+            got = b.similarity.indices[b.similarity.indptr[row]:b.similarity.indptr[row + 1]]
+            overlaps.append(len(np.intersect1d(expected, got)) / len(expected))
+    return float(np.mean(overlaps)) if overlaps else 1.0
+
+def main(args):
+    user_ids, item_ids, scores = synthetic_ratings(args.users, args.items, args.ratings, seed=args.seed)
+    new_users, new_items, new_scores = synthetic_ratings(args.users, args.items, args.changes, seed=args.seed + 1)
+
+    started = time.perf_counter()
+    model = build(user_ids, item_ids, scores, args.top_k, args.block_size)
+    base_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    updated = model.apply_updates(new_users, new_items, new_scores)
+    incremental_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    rebuilt = ItemItemModel.fit(updated.user_ids, updated.item_ids, updated.user_items, top_k=args.top_k, block_size=args.block_size)
+    full_seconds = time.perf_counter() - started
+
+    print(f"ratings={model.user_items.nnz} users={len(model.user_ids)} items={len(model.item_ids)} changes={args.changes}")
+    print(f"initial build:       {base_seconds:8.2f}s")
+    print(f"full rebuild:        {full_seconds:8.2f}s")
+    print(f"incremental update:  {incremental_seconds:8.2f}s ({full_seconds / incremental_seconds:.1f}x faster)")
+    print(f"neighbour overlap with full rebuild: {neighbour_overlap(rebuilt, updated):.4f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--items", type=int, default=50_000)
+    parser.add_argument("--ratings", type=int, default=3_000_000)
+    parser.add_argument("--changes", type=int, default=1_000)
+    parser.add_argument("--top-k", type=int, default=50)
+    parser.add_argument("--block-size", type=int, default=2048)
+    parser.add_argument("--seed", type=int, default=0)
+    main(parser.parse_args())
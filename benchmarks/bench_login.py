@@ -0,0 +1,49 @@
+"""
+Login throughput: bcrypt verification in the request threadpool (the old sync handlers)
+against the dedicated hashing process pool.
+
+    python -m benchmarks.bench_login --requests 200 --concurrency 32
+"""
+import argparse
+import asyncio
+import os
+import time
+from starlette.concurrency import run_in_threadpool
+from app.core.security import get_password_hash, verify_password, HashingExecutor
+
+PASSWORD = "Benchmark#Pass1"
+
+async def _run(verify, hashed: str, requests: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def login():
+        async with semaphore:
+            assert await verify(PASSWORD, hashed)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(requests)))
+    return requests / (time.perf_counter() - started)
+
+async def main(requests: int, concurrency: int, workers: int):
+    hashed = get_password_hash(PASSWORD)
+
+    threadpool_rate = await _run(lambda p, h: run_in_threadpool(verify_password, p, h), hashed, requests, concurrency)
+
+    executor = HashingExecutor(max_workers=workers, max_pending=concurrency)
+    await executor.run(verify_password, PASSWORD, hashed)  # start the workers outside the timing
+    try:
+        process_pool_rate = await _run(lambda p, h: executor.run(verify_password, p, h), hashed, requests, concurrency)
+    finally:
+        executor.shutdown()
+
+    print(f"cpus={os.cpu_count()} workers={workers} requests={requests} concurrency={concurrency}")
+    print(f"threadpool:   {threadpool_rate:8.1f} logins/s")
+    print(f"process pool: {process_pool_rate:8.1f} logins/s")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency, args.workers))
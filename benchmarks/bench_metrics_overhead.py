@@ -0,0 +1,48 @@
+"""
+Per-request cost of MetricsMiddleware, measured around a trivial ASGI app so only the
+middleware's own work is timed. Fails (exit status 1) when the overhead exceeds
+app.core.metrics.REQUEST_OVERHEAD_BUDGET_US.
+
+    python -m benchmarks.bench_metrics_overhead --requests 100000
+"""
+import argparse
+import asyncio
+import sys
+import time
+from types import SimpleNamespace
+from app.core.metrics import REQUEST_OVERHEAD_BUDGET_US
+from app.core.middleware import MetricsMiddleware
+
+ROUTE = SimpleNamespace(path="/books/{book_id}")
+
+async def app(scope, receive, send):
+    scope["route"] = ROUTE
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+async def receive():
+    return {"type": "http.request", "body": b""}
+
+async def send(message):
+    pass
+
+async def run(handler, requests: int) -> float:
+    scope = {"type": "http", "method": "GET", "path": "/books/1"}
+    started = time.perf_counter()
+    for _ in range(requests):
+        await handler(dict(scope), receive, send)
+    return (time.perf_counter() - started) / requests * 1e6
+
+async def main(requests: int) -> bool:
+    bare = await run(app, requests)
+    instrumented = await run(MetricsMiddleware(app), requests)
+    overhead = instrumented - bare
+    print(f"bare:         {bare:8.2f}us/request")
+    print(f"instrumented: {instrumented:8.2f}us/request")
+    print(f"overhead:     {overhead:8.2f}us/request (budget {REQUEST_OVERHEAD_BUDGET_US}us)")
+    return overhead <= REQUEST_OVERHEAD_BUDGET_US
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=100_000)
+    sys.exit(0 if asyncio.run(main(parser.parse_args().requests)) else 1)
@@ -0,0 +1,82 @@
+"""
+Ratings write throughput against a real PostgreSQL (uses the app's DB settings).
+
+Compares one INSERT + COMMIT per rating (the naive ORM path) with RatingWriteBuffer
+flushing multi-row upserts at several batch sizes. Seeds its own users and books with
+ids prefixed ``bench-`` and deletes them afterwards.
+
+    python -m benchmarks.bench_ratings --ratings 100000 --batch-sizes 100 1000 5000
+"""
+import argparse
+import asyncio
+import random
+import time
+from sqlalchemy import delete, insert, func
+from app.core.db import DBConnection
+from app.modules.users.models import User
+from app.modules.books.models import Book
+from app.modules.ratings.models import Rating
+from app.modules.ratings.services import RatingWriteBuffer
+
+PREFIX = "bench-"
+
+async def seed(session, n_users: int, n_books: int):
+    await session.execute(insert(User), [
+        {"id": f"{PREFIX}u{i}", "email": f"{PREFIX}u{i}@example.com", "password": "x", "is_active": True,
+         "is_superuser": False, "created_at": func.now(), "updated_at": func.now()}
+        for i in range(n_users)
+    ])
+    await session.execute(insert(Book), [
+        {"id": f"{PREFIX}b{i}", "title": f"Book {i}", "author": "Bench", "created_at": func.now(), "updated_at": func.now()}
+        for i in range(n_books)
+    ])
+    await session.commit()
+
+async def cleanup(session):
+    await session.execute(delete(Rating).where(Rating.user_id.startswith(PREFIX)))
+    await session.execute(delete(User).where(User.id.startswith(PREFIX)))
+    await session.execute(delete(Book).where(Book.id.startswith(PREFIX)))
+    await session.commit()
+
+def synthetic_ratings(n: int, n_users: int, n_books: int, seed: int):
+    rng = random.Random(seed)
+    return [(f"{PREFIX}u{rng.randrange(n_users)}", f"{PREFIX}b{rng.randrange(n_books)}", float(rng.randint(1, 10))) for _ in range(n)]
+
+async def per_row(session, ratings) -> float:
+    started = time.perf_counter()
+    for user_id, book_id, score in ratings:
+        buffer = RatingWriteBuffer(batch_size=1)
+        buffer.add(user_id, book_id, score)
+        await buffer.flush(session)
+    return len(ratings) / (time.perf_counter() - started)
+
+async def batched(session, ratings, batch_size: int) -> float:
+    started = time.perf_counter()
+    buffer = RatingWriteBuffer(batch_size=batch_size)
+    for user_id, book_id, score in ratings:
+        buffer.add(user_id, book_id, score)
+    await buffer.flush(session)
+    return len(ratings) / (time.perf_counter() - started)
+
+async def main(args):
+    session = DBConnection().create_async_session()
+    try:
+        await cleanup(session)
+        await seed(session, args.users, args.books)
+        rate = await per_row(session, synthetic_ratings(args.per_row_sample, args.users, args.books, seed=0))
+        print(f"one commit per rating:  {rate:10.0f} ratings/s")
+        for i, batch_size in enumerate(args.batch_sizes, start=1):
+            rate = await batched(session, synthetic_ratings(args.ratings, args.users, args.books, seed=i), batch_size)
+            print(f"batch size {batch_size:>6}:      {rate:10.0f} ratings/s")
+    finally:
+        await cleanup(session)
+        await session.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--books", type=int, default=50_000)
+    parser.add_argument("--ratings", type=int, default=100_000)
+    parser.add_argument("--per-row-sample", type=int, default=2_000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[100, 1000, 5000])
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,241 @@
+"""
+Offline evaluation of the recommenders: speed and quality on a time-based split.
+
+Ratings come from ``benchmarks.synthetic.synthetic_interactions`` or from a CSV/JSONL dump with
+user, book, score and (optionally) timestamp columns; without timestamps the file order is used.
+The newest ``--test-fraction`` of ratings is held out; each recommender is trained on the rest
+and asked for the top ``k`` of every held-out user. Results are printed (or written) as JSON
+so runs can be compared between releases.
+
+    python -m benchmarks.bench_recommenders --users 50000 --items 20000 --ratings 1000000
+    python -m benchmarks.bench_recommenders --dump data/ratings.csv --recommenders item_item als --output results.json
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import time
+import tracemalloc
+import numpy as np
+from app.modules.books.ingest import read_records, _normalise_key
+from app.modules.recommendation.als import ALSModel, ALSTrainer
+from app.modules.recommendation.engine import ItemItemModel, build_interaction_matrix
+from benchmarks.synthetic import synthetic_interactions
+
+DUMP_ALIASES = {
+    "user_id": ("user_id", "user"),
+    "book_id": ("book_id", "item_id", "isbn"),
+    "score": ("score", "rating", "book_rating"),
+    "timestamp": ("timestamp", "updated_at", "created_at", "date_added"),
+}
+
+class PopularityModel:
+    """
+    Baseline: the most rated books the user has not rated yet.
+    """
+    def __init__(self, item_ids: np.ndarray, user_ids: np.ndarray, user_items):
+        self.item_ids = item_ids
+        self.user_ids = user_ids
+        self.user_items = user_items
+        self.ranking = np.argsort(-np.diff(user_items.tocsc().indptr), kind="stable")
+
+    def recommend_batch(self, user_ids: list[str], k: int = 10) -> list[list[tuple[str, float]]]:
+        rows = np.searchsorted(self.user_ids, user_ids)
+        results = []
+        for user_id, row in zip(user_ids, rows):
+            seen = set()
+            if row < len(self.user_ids) and self.user_ids[row] == user_id:
+                seen = set(self.user_items.indices[self.user_items.indptr[row]:self.user_items.indptr[row + 1]].tolist())
+            top = [item for item in self.ranking[:k + len(seen)] if item not in seen][:k]
+            results.append([(str(self.item_ids[item]), 0.0) for item in top])
+        return results
+
+    def recommend(self, user_id: str, k: int = 10) -> list[tuple[str, float]]:
+        return self.recommend_batch([user_id], k)[0]
+
+def fit_popularity(user_ids, item_ids, user_items, args):
+    return PopularityModel(item_ids, user_ids, user_items)
+
+def fit_item_item(user_ids, item_ids, user_items, args):
+    return ItemItemModel.fit(user_ids, item_ids, user_items, top_k=args.neighbours, block_size=args.block_size)
+
+def fit_als(user_ids, item_ids, user_items, args):
+    model = ALSModel.initial(user_ids, item_ids, user_items, args.factors, args.seed, params={})
+    trainer = ALSTrainer(regularization=args.regularization, implicit=args.implicit, workers=args.workers)
+    return trainer.train(model, args.epochs)
+
+RECOMMENDERS = {
+    "popularity": fit_popularity,
+    "item_item": fit_item_item,
+    "als": fit_als,
+}
+
+def load_dump(path: str, delimiter: str, encoding: str):
+    users, items, scores, timestamps = [], [], [], []
+    for position, record in enumerate(read_records(path, delimiter=delimiter, encoding=encoding)):
+        record = {_normalise_key(key): value for key, value in record.items() if key}
+        row = {
+            column: next((record[alias] for alias in aliases if record.get(alias) not in (None, "")), None)
+            for column, aliases in DUMP_ALIASES.items()
+        }
+        if row["user_id"] is None or row["book_id"] is None or row["score"] is None:
+            continue
+        users.append(str(row["user_id"]))
+        items.append(str(row["book_id"]))
+        scores.append(float(row["score"]))
+        timestamp = row["timestamp"]
+        try:
+            timestamps.append(float(timestamp) if timestamp is not None else position)
+        except ValueError:
+            timestamps.append(np.datetime64(timestamp.replace(" ", "T")[:19]).astype("datetime64[s]").astype(np.int64))
+    return np.asarray(users), np.asarray(items), np.asarray(scores, dtype=np.float32), np.asarray(timestamps, dtype=np.float64)
+
+def time_split(user_ids, item_ids, scores, timestamps, test_fraction: float, relevance_threshold: float):
+    """
+    Splits at the ``1 - test_fraction`` quantile of time. Returns the training matrix with its
+    sorted ids and, for every held-out user known at training time, the set of held-out books
+    they rated at least ``relevance_threshold`` that were not already in their training history.
+    """
+    order = np.argsort(timestamps, kind="stable")
+    user_ids, item_ids, scores = user_ids[order], item_ids[order], scores[order]
+    cut = int(len(order) * (1 - test_fraction))
+
+    users, user_codes = np.unique(user_ids[:cut], return_inverse=True)
+    items, item_codes = np.unique(item_ids[:cut], return_inverse=True)
+    # Latest rating wins for repeated (user, book) pairs, as in the ratings table.
+    pair = user_codes.astype(np.int64) * len(items) + item_codes
+    _, last = np.unique(pair[::-1], return_index=True)
+    last = cut - 1 - last
+    train = build_interaction_matrix(user_codes[last], item_codes[last], scores[:cut][last], shape=(len(users), len(items)))
+
+    test_users, test_items = user_ids[cut:], item_ids[cut:]
+    rows = np.minimum(np.searchsorted(users, test_users), len(users) - 1)
+    columns = np.minimum(np.searchsorted(items, test_items), len(items) - 1)
+    known = (users[rows] == test_users) & (items[columns] == test_items) & (scores[cut:] >= relevance_threshold)
+    test_pairs = rows.astype(np.int64) * len(items) + columns
+    train_pairs = np.repeat(np.arange(train.shape[0], dtype=np.int64), np.diff(train.indptr)) * len(items) + train.indices
+    keep = known & ~np.isin(test_pairs, train_pairs)
+
+    relevant = {}
+    for user_id, item_id in zip(test_users[keep].tolist(), test_items[keep].tolist()):
+        relevant.setdefault(user_id, set()).add(item_id)
+    return users, items, train, relevant
+
+def ranking_metrics(recommended: list[list[str]], relevant: list[set[str]], k: int) -> dict:
+    discounts = 1.0 / np.log2(np.arange(2, k + 2))
+    precision, recall, ndcg = [], [], []
+    for items, truth in zip(recommended, relevant):
+        hits = np.array([item in truth for item in items[:k]], dtype=np.float64)
+        precision.append(hits.sum() / k)
+        recall.append(hits.sum() / len(truth))
+        ideal = discounts[:min(len(truth), k)].sum()
+        ndcg.append(float((hits * discounts[:len(hits)]).sum() / ideal))
+    return {
+        f"precision@{k}": round(float(np.mean(precision)), 5) if precision else 0.0,
+        f"recall@{k}": round(float(np.mean(recall)), 5) if recall else 0.0,
+        f"ndcg@{k}": round(float(np.mean(ndcg)), 5) if ndcg else 0.0,
+    }
+
+def evaluate(name: str, users, items, train, relevant: dict, args) -> dict:
+    tracemalloc.start()
+    started = time.perf_counter()
+    model = RECOMMENDERS[name](users, items, train, args)
+    train_seconds = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    test_users = sorted(relevant)
+    rng = np.random.default_rng(args.seed)
+    sample = rng.choice(test_users, size=min(args.latency_requests, len(test_users)), replace=False) if test_users else []
+    latencies = []
+    for user_id in sample:
+        started = time.perf_counter()
+        model.recommend(str(user_id), args.k)
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    recommended = []
+    for start in range(0, len(test_users), args.batch_size):
+        batch = test_users[start:start + args.batch_size]
+        recommended.extend([book_id for book_id, _ in user_items] for user_items in model.recommend_batch(batch, args.k))
+    batch_seconds = time.perf_counter() - started
+
+    latencies = np.asarray(latencies) * 1000
+    return {
+        "recommender": name,
+        "train_seconds": round(train_seconds, 3),
+        "train_peak_memory_mb": round(peak / 2 ** 20, 1),
+        "latency_ms": {
+            "p50": round(float(np.percentile(latencies, 50)), 3) if len(latencies) else None,
+            "p99": round(float(np.percentile(latencies, 99)), 3) if len(latencies) else None,
+        },
+        "throughput_rps": round(len(latencies) / (latencies.sum() / 1000), 1) if len(latencies) else None,
+        "batch_users_per_second": round(len(test_users) / batch_seconds, 1) if batch_seconds else None,
+        **ranking_metrics(recommended, [relevant[user_id] for user_id in test_users], args.k),
+    }
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main(args):
+    if args.dump:
+        user_ids, item_ids, scores, timestamps = load_dump(args.dump, args.delimiter, args.encoding)
+        source = {"dump": args.dump}
+    else:
+        user_ids, item_ids, scores, timestamps = synthetic_interactions(args.users, args.items, args.ratings, seed=args.seed)
+        source = {"synthetic": {"users": args.users, "items": args.items, "ratings": args.ratings, "seed": args.seed}}
+
+    users, items, train, relevant = time_split(user_ids, item_ids, scores, timestamps, args.test_fraction, args.relevance_threshold)
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "cpus": os.cpu_count(),
+        "data": {
+            **source,
+            "train_ratings": int(train.nnz),
+            "train_users": len(users),
+            "train_items": len(items),
+            "test_users": len(relevant),
+            "test_fraction": args.test_fraction,
+        },
+        "k": args.k,
+        "results": [evaluate(name, users, items, train, relevant, args) for name in args.recommenders],
+        "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+    print(output)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--recommenders", nargs="+", choices=sorted(RECOMMENDERS), default=sorted(RECOMMENDERS))
+    parser.add_argument("--dump", default=None, help="CSV or JSONL ratings file (optionally gzipped) instead of synthetic data.")
+    parser.add_argument("--delimiter", default=",")
+    parser.add_argument("--encoding", default="utf-8")
+    parser.add_argument("--users", type=int, default=20_000)
+    parser.add_argument("--items", type=int, default=5_000)
+    parser.add_argument("--ratings", type=int, default=500_000)
+    parser.add_argument("--test-fraction", type=float, default=0.1)
+    parser.add_argument("--relevance-threshold", type=float, default=4.0)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--latency-requests", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--neighbours", type=int, default=50)
+    parser.add_argument("--block-size", type=int, default=2048)
+    parser.add_argument("--factors", type=int, default=64)
+    parser.add_argument("--regularization", type=float, default=0.1)
+    parser.add_argument("--implicit", action="store_true")
+    parser.add_argument("--epochs", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=1, help="ALS processes; memory of extra processes is not in the peak.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="Also write the JSON report to this file.")
+    main(parser.parse_args())
@@ -0,0 +1,115 @@
+"""
+Catalog search latency on a synthetic catalog (1M books by default) in a real PostgreSQL
+with the search migrations applied (uses the app's DB settings).
+
+Loads books with ids prefixed ``bench-`` through the COPY importer, then times full-text,
+misspelt and deep-page queries through the search repository next to a naive ILIKE scan,
+and prints the plan of one search so the GIN index use can be checked.
+
+    python -m benchmarks.bench_search --books 1000000 --queries 200
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from sqlalchemy import delete, select, text
+from app.core.db import DBConnection
+from app.modules.books import ingest
+from app.modules.books import repository as book_repo
+from app.modules.books.models import Book
+
+PREFIX = "bench-"
+WORDS = (
+    "shadow river garden winter empire secret house night letters stone silver queen ocean "
+    "broken city forest journey kingdom whisper lost summer island fire daughter wolf memory "
+    "glass crown storm hidden light dark children mountain song star return war heart road"
+).split()
+SURNAMES = "smith tolkien austen orwell morrison atwood murakami rowling christie dickens".split()
+
+def synthetic_books(n: int, seed: int):
+    rng = random.Random(seed)
+    for i in range(n):
+        title = " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 6))).title()
+        author = f"{rng.choice(WORDS).title()} {rng.choice(SURNAMES).title()}"
+        description = " ".join(rng.choice(WORDS) for _ in range(rng.randint(10, 40)))
+        yield (f"{PREFIX}{i}", title, author, description, rng.randint(1900, 2025), None)
+
+def load(n: int, chunk_size: int = 50_000):
+    connection = DBConnection().get_engine().raw_connection()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(ingest.CREATE_STAGING_SQL)
+            for chunk in ingest.chunked(synthetic_books(n, seed=0), chunk_size):
+                ingest.copy_rows(cursor, chunk)
+                cursor.execute(ingest.UPSERT_SQL)
+                connection.commit()
+            cursor.execute("ANALYZE book")
+        connection.commit()
+    finally:
+        connection.close()
+
+def percentiles(samples: list[float]) -> str:
+    samples = sorted(samples)
+    p50 = statistics.median(samples)
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    return f"p50 {p50 * 1000:7.2f} ms   p99 {p99 * 1000:7.2f} ms"
+
+async def timed(fn, queries: list[str]) -> list[float]:
+    samples = []
+    for q in queries:
+        started = time.perf_counter()
+        await fn(q)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+async def main(args):
+    if not args.skip_load:
+        started = time.perf_counter()
+        load(args.books)
+        print(f"loaded {args.books} books in {time.perf_counter() - started:.1f}s")
+
+    rng = random.Random(1)
+    phrases = [" ".join(rng.sample(WORDS, 2)) for _ in range(args.queries)]
+    typos = [p[:3] + p[4:] for p in phrases]
+
+    session = DBConnection().create_async_session()
+    try:
+        async def search(q):
+            return await book_repo.search_books(session, q, 20)
+
+        async def deep_page(q):
+            after = None
+            for _ in range(10):
+                rows = await book_repo.search_books(session, q, 20, after)
+                if not rows:
+                    break
+                after = (rows[-1].rank, rows[-1].id)
+
+        async def ilike(q):
+            sql = select(Book.id).where(Book.title.ilike(f"%{q}%")).limit(20)
+            return (await session.execute(sql)).all()
+
+        print(f"full-text + trigram: {percentiles(await timed(search, phrases))}")
+        print(f"misspelt query:      {percentiles(await timed(search, typos))}")
+        print(f"10 pages deep:       {percentiles(await timed(deep_page, phrases[:max(1, args.queries // 10)]))}")
+        print(f"ILIKE scan:          {percentiles(await timed(ilike, phrases[:max(1, args.queries // 10)]))}")
+
+        plan = await session.execute(text(
+            "EXPLAIN ANALYZE SELECT id FROM book WHERE search_vector @@ websearch_to_tsquery('english', :q) "
+            "OR :q <% title OR :q <% author"
+        ), {"q": phrases[0]})
+        print("\n".join(row[0] for row in plan))
+    finally:
+        if not args.keep:
+            await session.execute(delete(Book).where(Book.id.startswith(PREFIX)))
+            await session.commit()
+        await session.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--books", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--skip-load", action="store_true", help="Reuse books loaded by an earlier --keep run.")
+    parser.add_argument("--keep", action="store_true", help="Leave the synthetic books in place afterwards.")
+    asyncio.run(main(parser.parse_args()))
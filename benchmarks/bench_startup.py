@@ -0,0 +1,83 @@
+"""
+Cold-start import cost of the API, the worker and the CLI jobs, from ``python -X importtime``.
+
+Every entry point is imported in a fresh interpreter ``--runs`` times; the median cumulative
+import time is compared with its budget in ``STARTUP_BUDGET_MS``. The worker and the CLI must
+also not import the modules in ``DEFERRED_MODULES``: those are loaded by the jobs that use them.
+Fails (exit status 1) on either. ``--output`` writes the report with the slowest imports of
+every entry point, to keep next to test results.
+
+    python -m benchmarks.bench_startup --runs 5 --output importtime.txt
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+STARTUP_BUDGET_MS = {
+    "app.main": 1250,
+    "app.worker": 750,
+    "app.modules.recommendation.cli": 750,
+}
+
+DEFERRED_MODULES = {
+    "app.worker": ("numpy", "scipy", "passlib", "fastapi"),
+    "app.modules.recommendation.cli": ("numpy", "scipy", "passlib", "fastapi"),
+}
+
+def import_times(module: str) -> dict[str, tuple[int, int]]:
+    """
+    Imports ``module`` in a new interpreter. Returns {module: (self us, cumulative us)}.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True, env=os.environ,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(own), int(cumulative))
+    return times
+
+def report(module: str, runs: int, top: int) -> tuple[list[str], bool]:
+    samples = [import_times(module) for _ in range(runs)]
+    totals = [sample[module][1] / 1000 for sample in samples]
+    median = statistics.median(totals)
+    budget = STARTUP_BUDGET_MS[module]
+    loaded = [name for name in DEFERRED_MODULES.get(module, ()) if name in samples[0]]
+    ok = median <= budget and not loaded
+
+    lines = [
+        f"{module}: {median:.0f}ms median of {runs} (min {min(totals):.0f}ms, budget {budget}ms) {'OK' if ok else 'FAIL'}",
+    ]
+    if loaded:
+        lines.append(f"  imports deferred modules: {', '.join(loaded)}")
+    slowest = sorted(samples[totals.index(min(totals, key=lambda total: abs(total - median)))].items(), key=lambda item: -item[1][1])
+    lines.append(f"  {'cumulative':>10} {'self':>8}  module")
+    for name, (own, cumulative) in slowest[:top]:
+        lines.append(f"  {cumulative / 1000:8.1f}ms {own / 1000:6.1f}ms  {name}")
+    return lines, ok
+
+def main(args) -> bool:
+    lines, ok = [], True
+    for module in args.modules:
+        module_lines, module_ok = report(module, args.runs, args.top)
+        lines.extend(module_lines + [""])
+        ok = ok and module_ok
+    output = "\n".join(lines)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output)
+    print(output)
+    return ok
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", nargs="+", choices=sorted(STARTUP_BUDGET_MS), default=list(STARTUP_BUDGET_MS))
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="Slowest imports listed per entry point.")
+    parser.add_argument("--output", default=None, help="Also write the report to this file.")
+    sys.exit(0 if main(parser.parse_args()) else 1)
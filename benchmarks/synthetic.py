@@ -0,0 +1,53 @@
+"""
+Synthetic rating data for the offline benchmarks. User activity and item popularity both
+follow a power law, as they do in the Goodreads and Book-Crossing dumps.
+"""
+import numpy as np
+
+def power_law_indices(rng: np.random.Generator, n: int, size: int, exponent: float) -> np.ndarray:
+    weights = 1.0 / np.arange(1, n + 1) ** exponent
+    weights /= weights.sum()
+    return rng.permutation(n)[rng.choice(n, size=size, p=weights)]
+
+def synthetic_ratings(n_users: int, n_items: int, n_ratings: int, seed: int = 0, user_exponent: float = 0.8, item_exponent: float = 0.9):
+    """
+    Returns (user_ids, item_ids, scores) arrays of ``n_ratings`` ratings on a 1-5 scale.
+    """
+    rng = np.random.default_rng(seed)
+    users = power_law_indices(rng, n_users, n_ratings, user_exponent)
+    items = power_law_indices(rng, n_items, n_ratings, item_exponent)
+    scores = rng.integers(1, 6, n_ratings).astype(np.float32)
+    width = len(str(max(n_users, n_items)))
+    user_ids = np.char.add("u", np.char.zfill(users.astype(str), width))
+    item_ids = np.char.add("b", np.char.zfill(items.astype(str), width))
+    return user_ids, item_ids, scores
+
+def synthetic_interactions(n_users: int, n_items: int, n_ratings: int, seed: int = 0, n_genres: int = 20, affinity: float = 0.8, days: int = 365):
+    """
+    Returns (user_ids, item_ids, scores, timestamps) with learnable structure for quality benchmarks:
+    every user and book belongs to one of ``n_genres`` genres, a share ``affinity`` of each user's
+    ratings go to books of their genre and score higher there. Timestamps (epoch seconds) are
+    spread uniformly over ``days`` days. Activity and popularity follow the same power laws as
+    ``synthetic_ratings``.
+    """
+    rng = np.random.default_rng(seed)
+    users = power_law_indices(rng, n_users, n_ratings, 0.8)
+    user_genres = rng.integers(0, n_genres, n_users)
+    item_genres = rng.integers(0, n_genres, n_items)
+
+    items = power_law_indices(rng, n_items, n_ratings, 0.9)
+    in_genre = rng.random(n_ratings) < affinity
+    by_genre = [np.flatnonzero(item_genres == genre) for genre in range(n_genres)]
+    for genre, genre_items in enumerate(by_genre):
+        targets = np.flatnonzero(in_genre & (user_genres[users] == genre))
+        if len(genre_items) and len(targets):
+            items[targets] = genre_items[power_law_indices(rng, len(genre_items), len(targets), 0.9)]
+
+    matches = item_genres[items] == user_genres[users]
+    scores = np.clip(np.where(matches, rng.normal(4.2, 0.7, n_ratings), rng.normal(2.5, 1.0, n_ratings)).round(), 1, 5).astype(np.float32)
+    timestamps = rng.integers(0, days * 86400, n_ratings, dtype=np.int64) + 1_700_000_000
+
+    width = len(str(max(n_users, n_items)))
+    user_ids = np.char.add("u", np.char.zfill(users.astype(str), width))
+    item_ids = np.char.add("b", np.char.zfill(items.astype(str), width))
+    return user_ids, item_ids, scores, timestamps
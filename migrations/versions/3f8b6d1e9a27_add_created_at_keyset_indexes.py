@@ -0,0 +1,30 @@
+"""Add created_at keyset indexes
+
+Revision ID: 3f8b6d1e9a27
+Revises: e4c7a2b9f013
+Create Date: 2025-06-22 16:05:48.902113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f8b6d1e9a27'
+down_revision: Union[str, None] = 'e4c7a2b9f013'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_book_created_at_id', 'book', ['created_at', 'id'], unique=False, postgresql_where=sa.text('deleted_at IS NULL'))
+    op.create_index('ix_user_created_at_id', 'user', ['created_at', 'id'], unique=False, postgresql_where=sa.text('deleted_at IS NULL'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_user_created_at_id', table_name='user', postgresql_where=sa.text('deleted_at IS NULL'))
+    op.drop_index('ix_book_created_at_id', table_name='book', postgresql_where=sa.text('deleted_at IS NULL'))
@@ -0,0 +1,31 @@
+"""Add book trigram indexes
+
+Revision ID: 6d3a0f8e2c41
+Revises: 2b7e91c4d5a8
+Create Date: 2025-06-14 10:58:03.114207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6d3a0f8e2c41'
+down_revision: Union[str, None] = '2b7e91c4d5a8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index('ix_book_title_trgm', 'book', ['title'], unique=False, postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'})
+    op.create_index('ix_book_author_trgm', 'book', ['author'], unique=False, postgresql_using='gin', postgresql_ops={'author': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_book_author_trgm', table_name='book', postgresql_using='gin', postgresql_ops={'author': 'gin_trgm_ops'})
+    op.drop_index('ix_book_title_trgm', table_name='book', postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'})
@@ -0,0 +1,43 @@
+"""Server-side timestamp defaults, updated_at and live-row indexes
+
+Revision ID: 7b2e5d9c4f60
+Revises: 3f8b6d1e9a27
+Create Date: 2025-06-24 11:18:32.604417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b2e5d9c4f60'
+down_revision: Union[str, None] = '3f8b6d1e9a27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = {
+    'book': ['id'],
+    'user': ['id'],
+    'rating': ['user_id', 'book_id'],
+    'user_recommendation': ['user_id', 'model_version', 'rank'],
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, primary_key in TABLES.items():
+        op.alter_column(table, 'created_at', existing_type=sa.DateTime(), existing_nullable=False, server_default=sa.text('now()'))
+        op.alter_column(table, 'updated_at', existing_type=sa.DateTime(), existing_nullable=False, server_default=sa.text('now()'))
+        op.create_index(f'ix_{table}_updated_at', table, ['updated_at'], unique=False)
+        op.create_index(f'ix_{table}_live', table, primary_key, unique=False, postgresql_where=sa.text('deleted_at IS NULL'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in reversed(TABLES):
+        op.drop_index(f'ix_{table}_live', table_name=table, postgresql_where=sa.text('deleted_at IS NULL'))
+        op.drop_index(f'ix_{table}_updated_at', table_name=table)
+        op.alter_column(table, 'updated_at', existing_type=sa.DateTime(), existing_nullable=False, server_default=None)
+        op.alter_column(table, 'created_at', existing_type=sa.DateTime(), existing_nullable=False, server_default=None)
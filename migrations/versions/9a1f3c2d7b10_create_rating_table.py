@@ -0,0 +1,40 @@
+"""Create Rating table
+
+Revision ID: 9a1f3c2d7b10
+Revises: 4cc0295aaf50
+Create Date: 2025-06-07 12:10:41.218734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a1f3c2d7b10'
+down_revision: Union[str, None] = '4cc0295aaf50'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('rating',
+    sa.Column('user_id', sa.String(), nullable=False),
+    sa.Column('book_id', sa.String(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['book_id'], ['book.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'book_id')
+    )
+    op.create_index(op.f('ix_rating_book_id'), 'rating', ['book_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_rating_book_id'), table_name='rating')
+    op.drop_table('rating')
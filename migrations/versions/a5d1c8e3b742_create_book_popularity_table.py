@@ -0,0 +1,49 @@
+"""Create BookPopularity table
+
+Revision ID: a5d1c8e3b742
+Revises: 7b2e5d9c4f60
+Create Date: 2025-06-26 14:27:05.318846
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a5d1c8e3b742'
+down_revision: Union[str, None] = '7b2e5d9c4f60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('book_popularity',
+    sa.Column('book_id', sa.String(), nullable=False),
+    sa.Column('rating_count', sa.Integer(), nullable=False),
+    sa.Column('score_sum', sa.Float(), nullable=False),
+    sa.Column('log_trend', sa.Float(), nullable=True),
+    sa.Column('refreshed_through', sa.DateTime(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['book_id'], ['book.id'], ),
+    sa.PrimaryKeyConstraint('book_id')
+    )
+    op.create_index('ix_book_popularity_popular', 'book_popularity', [sa.text('rating_count DESC'), 'book_id'], unique=False, postgresql_where=sa.text('rating_count > 0'))
+    op.create_index('ix_book_popularity_trending', 'book_popularity', [sa.text('log_trend DESC'), 'book_id'], unique=False, postgresql_where=sa.text('log_trend IS NOT NULL'))
+    op.create_index('ix_book_popularity_refreshed_through', 'book_popularity', ['refreshed_through'], unique=False)
+    op.create_index('ix_book_popularity_updated_at', 'book_popularity', ['updated_at'], unique=False)
+    op.create_index('ix_book_popularity_live', 'book_popularity', ['book_id'], unique=False, postgresql_where=sa.text('deleted_at IS NULL'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_book_popularity_live', table_name='book_popularity', postgresql_where=sa.text('deleted_at IS NULL'))
+    op.drop_index('ix_book_popularity_updated_at', table_name='book_popularity')
+    op.drop_index('ix_book_popularity_refreshed_through', table_name='book_popularity')
+    op.drop_index('ix_book_popularity_trending', table_name='book_popularity', postgresql_where=sa.text('log_trend IS NOT NULL'))
+    op.drop_index('ix_book_popularity_popular', table_name='book_popularity', postgresql_where=sa.text('rating_count > 0'))
+    op.drop_table('book_popularity')
@@ -0,0 +1,31 @@
+import os
+import time
+import pytest
+
+# Settings are read at import time; the units under test never open a connection.
+for name, value in {
+    "DB_SCHEME": "postgresql",
+    "DB_HOST": "localhost",
+    "DB_PORT": "5432",
+    "DB_NAME": "test",
+    "DB_USER": "test",
+    "DB_PASSWORD": "test",
+    "SECRET_KEY": "test",
+}.items():
+    os.environ.setdefault(name, value)
+
+class Clock:
+    """
+    Stands in for ``time.monotonic``; tests move it forward by adding to ``now``.
+    """
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(time, "monotonic", clock)
+    return clock
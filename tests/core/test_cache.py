@@ -0,0 +1,56 @@
+from app.core.cache import LocalStore, TTLCache, create_shared_store
+
+def test_get_returns_value_until_ttl(clock):
+    store = TTLCache(maxsize=10, ttl=5)
+    store.set("a", 1)
+    clock.now += 4.9
+    assert store.get("a") == 1
+    clock.now += 0.2
+    assert store.get("a") is None
+    assert len(store) == 0
+    assert (store.hits, store.misses) == (1, 1)
+
+def test_per_entry_ttl_overrides_default(clock):
+    store = TTLCache(maxsize=10, ttl=5)
+    store.set("short", 1, ttl=1)
+    store.set("long", 2)
+    clock.now += 2
+    assert store.get("short", "missing") == "missing"
+    assert store.get("long") == 2
+
+def test_least_recently_used_entry_is_evicted(clock):
+    store = TTLCache(maxsize=2, ttl=60)
+    store.set("a", 1)
+    store.set("b", 2)
+    store.get("a")
+    store.set("c", 3)
+    assert store.get("b") is None
+    assert store.get("a") == 1
+    assert store.get("c") == 3
+
+def test_delete_and_clear_invalidate(clock):
+    store = TTLCache(maxsize=10, ttl=60)
+    store.set("a", 1)
+    store.set("b", 2)
+    store.delete("a")
+    store.delete("missing")
+    assert store.get("a") is None
+    assert store.get("b") == 2
+    store.clear()
+    assert store.get("b") is None
+
+def test_local_store_expiry_and_delete(clock):
+    store = LocalStore()
+    store.set("a", "value", ex=5)
+    store.set("b", b"raw")
+    assert store.get("a") == b"value"
+    clock.now += 6
+    assert store.get("a") is None
+    assert store.get("b") == b"raw"
+    assert store.delete("a", "b") == 1
+    assert store.get("b") is None
+
+def test_create_shared_store():
+    assert create_shared_store(None) is None
+    assert create_shared_store("") is None
+    assert isinstance(create_shared_store("local://"), LocalStore)
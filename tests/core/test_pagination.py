@@ -0,0 +1,80 @@
+import asyncio
+import base64
+import json
+from datetime import datetime, timezone
+import pytest
+from fastapi import HTTPException
+from app.core.pagination import decode_created_at_cursor, decode_cursor, decode_rank_cursor, encode_cursor, stream_page
+from app.modules.books import services as book_services
+
+def test_cursor_round_trip():
+    values = [4.5, "a1b2", None]
+    assert decode_cursor(encode_cursor(values), 3) == values
+
+def test_cursor_is_url_safe():
+    cursor = encode_cursor(["??>>~~" * 10])
+    assert not set(cursor) & set("+/")
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    encode_cursor({"a": 1}),
+    encode_cursor([1]),
+    encode_cursor([1, 2, 3]),
+    "",
+])
+def test_invalid_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor, 2)
+    assert error.value.status_code == 400
+
+def test_rank_cursor_round_trip():
+    assert decode_rank_cursor(encode_cursor([0.25, "id-1"])) == (0.25, "id-1")
+    assert decode_rank_cursor(encode_cursor([1, "id-1"])) == (1.0, "id-1")
+
+@pytest.mark.parametrize("cursor", [
+    encode_cursor(["0.25", "id-1"]),
+    encode_cursor([True, "id-1"]),
+    encode_cursor([None, "id-1"]),
+    encode_cursor([0.25, 7]),
+    encode_cursor([0.25, ["id-1"]]),
+    base64.urlsafe_b64encode(b'[NaN,"id-1"]').decode(),
+])
+def test_invalid_rank_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_rank_cursor(cursor)
+    assert error.value.status_code == 400
+
+def test_search_rejects_tampered_cursor_before_querying(monkeypatch):
+    async def search_books(*args):
+        raise AssertionError("the query must not run")
+    monkeypatch.setattr(book_services.book_repo, "search_books", search_books)
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(book_services.search_books(None, "dune", 10, encode_cursor(["1 OR 1=1", "id-1"])))
+    assert error.value.status_code == 400
+
+def test_created_at_cursor_round_trip():
+    created_at = datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+    cursor = encode_cursor([created_at.isoformat(), "id-1"])
+    assert decode_created_at_cursor(cursor) == (created_at, "id-1")
+
+def test_invalid_created_at_is_rejected():
+    with pytest.raises(HTTPException) as error:
+        decode_created_at_cursor(encode_cursor(["yesterday", "id-1"]))
+    assert error.value.status_code == 400
+
+async def rows(values):
+    for value in values:
+        yield value
+
+def page(values, limit: int) -> dict:
+    async def collect():
+        return b"".join([chunk async for chunk in stream_page(rows(values), limit, json.dumps, lambda row: [row], "ok")])
+    return json.loads(asyncio.run(collect()))
+
+def test_stream_page_with_next_page():
+    body = page([1, 2, 3], limit=2)
+    assert body == {"status": "success", "message": "ok", "data": {"items": [1, 2], "next_cursor": encode_cursor([2])}}
+
+def test_stream_page_last_page():
+    assert page([1, 2], limit=2)["data"] == {"items": [1, 2], "next_cursor": None}
+    assert page([], limit=2)["data"] == {"items": [], "next_cursor": None}
@@ -0,0 +1,82 @@
+from types import SimpleNamespace
+import pytest
+from sqlalchemy import create_engine, exc, text
+from app.core import db, metrics
+from app.core.db import QueryDiagnostics, normalize_statement
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+def request_stats():
+    stats = metrics.RequestStats(scope={"route": SimpleNamespace(path="/books/{id}")})
+    token = metrics.current_request.set(stats)
+    yield stats
+    metrics.current_request.reset(token)
+
+def diagnostics(slow_query_ms: float = 60_000, n_plus_one_threshold: int = 3):
+    diagnostics = QueryDiagnostics(slow_query_ms, n_plus_one_threshold)
+    diagnostics.enable()
+    return diagnostics
+
+def count(counter, route: str) -> float:
+    return counter._values.get((route,), 0.0)
+
+def test_normalize_statement():
+    assert normalize_statement("SELECT * FROM book WHERE id = 'x''y' AND year > 1999") == "SELECT * FROM book WHERE id = ? AND year > ?"
+    assert normalize_statement("SELECT 1 FROM t WHERE id IN (%(p1)s, %(p2)s,\n %(p3)s)") == "SELECT ? FROM t WHERE id IN (...)"
+    assert normalize_statement("INSERT INTO t VALUES ($1, $2)") == normalize_statement("INSERT INTO t VALUES ($1)")
+
+def test_repeated_statement_is_reported_once_per_request(engine, request_stats):
+    before = count(db.n_plus_one_queries, "/books/{id}")
+    checker = diagnostics(n_plus_one_threshold=3)
+    try:
+        with engine.connect() as connection:
+            for book_id in range(6):
+                connection.execute(text(f"SELECT {book_id}"))
+            connection.execute(text("SELECT 'other'"))
+    finally:
+        checker.disable()
+    assert count(db.n_plus_one_queries, "/books/{id}") == before + 1
+    assert request_stats.statement_counts == {"SELECT ?": 7}
+
+def test_statements_under_the_threshold_are_not_reported(engine, request_stats):
+    before = count(db.n_plus_one_queries, "/books/{id}")
+    checker = diagnostics(n_plus_one_threshold=3)
+    try:
+        with engine.connect() as connection:
+            for _ in range(3):
+                connection.execute(text("SELECT 1"))
+            connection.execute(text("SELECT 1 WHERE 1 = 1"))
+    finally:
+        checker.disable()
+    assert count(db.n_plus_one_queries, "/books/{id}") == before
+
+def test_slow_queries_are_counted_outside_requests(engine):
+    before = count(db.slow_queries, "-")
+    checker = diagnostics(slow_query_ms=0)
+    try:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+    finally:
+        checker.disable()
+    assert count(db.slow_queries, "-") == before + 1
+
+def test_failed_statement_does_not_leak_timings(engine, request_stats):
+    checker = diagnostics()
+    try:
+        with engine.connect() as connection:
+            with pytest.raises(exc.OperationalError):
+                connection.execute(text("SELECT * FROM missing"))
+            assert connection.info["diagnostics_started"] == []
+    finally:
+        checker.disable()
+
+def test_disable_removes_the_listeners(engine, request_stats):
+    diagnostics().disable()
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+    assert request_stats.statement_counts is None
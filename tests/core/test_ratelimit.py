@@ -0,0 +1,140 @@
+import asyncio
+import time
+import jwt
+import pytest
+from app.core.config import settings
+from app.core.middleware import AdmissionMiddleware
+from app.core.ratelimit import RouteClass, TokenBucketStore, retry_after_header
+
+def take(store, key, rate=1.0, burst=3, cost=1.0):
+    return asyncio.run(store.take(key, rate, burst, cost))
+
+def test_burst_then_reject(clock):
+    store = TokenBucketStore(max_keys=10)
+    assert [take(store, "a")[0] for _ in range(3)] == [True, True, True]
+    allowed, retry_after = take(store, "a")
+    assert not allowed
+    assert retry_after == pytest.approx(1.0)
+
+def test_tokens_refill_up_to_burst(clock):
+    store = TokenBucketStore(max_keys=10)
+    for _ in range(3):
+        take(store, "a", rate=2.0)
+    clock.now += 0.5
+    assert take(store, "a", rate=2.0) == (True, 0.0)
+    assert not take(store, "a", rate=2.0)[0]
+    clock.now += 60
+    assert [take(store, "a", rate=2.0)[0] for _ in range(4)] == [True, True, True, False]
+
+def test_buckets_are_per_key(clock):
+    store = TokenBucketStore(max_keys=10)
+    for _ in range(3):
+        take(store, "a")
+    assert not take(store, "a")[0]
+    assert take(store, "b")[0]
+
+def test_least_recently_used_bucket_is_dropped(clock):
+    store = TokenBucketStore(max_keys=2)
+    for _ in range(3):
+        take(store, "a")
+    take(store, "b")
+    take(store, "c")
+    assert take(store, "a")[0]
+
+def test_cost_larger_than_tokens(clock):
+    store = TokenBucketStore(max_keys=10)
+    take(store, "a", cost=2)
+    allowed, retry_after = take(store, "a", cost=2)
+    assert not allowed
+    assert retry_after == pytest.approx(1.0)
+
+def test_route_class_matching():
+    route = RouteClass("auth", ("/auth/login", "/auth/signup"), per_minute=30, burst=5, max_concurrency=2, methods=("POST",))
+    assert route.rate == pytest.approx(0.5)
+    assert route.matches("POST", "/auth/login")
+    assert not route.matches("GET", "/auth/login")
+    assert not route.matches("POST", "/books")
+
+def test_retry_after_header_rounds_up():
+    assert retry_after_header(0.01) == "1"
+    assert retry_after_header(2.2) == "3"
+
+def route_classes(**overrides) -> list[RouteClass]:
+    options = {"per_minute": 60, "burst": 2, "max_concurrency": 1, **overrides}
+    return [RouteClass("recommendation", ("/recommendations",), **options)]
+
+def http_scope(path: str, token: str = None, client: str = "10.0.0.1") -> dict:
+    headers = [(b"authorization", f"Bearer {token}".encode())] if token else []
+    return {"type": "http", "method": "GET", "path": path, "headers": headers, "client": (client, 1234)}
+
+async def ok_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+async def call(middleware: AdmissionMiddleware, scope: dict) -> tuple[int, dict]:
+    messages = []
+    async def send(message):
+        messages.append(message)
+    await middleware(scope, None, send)
+    return messages[0]["status"], dict(messages[0]["headers"])
+
+def statuses(middleware: AdmissionMiddleware, scopes: list[dict]) -> list[int]:
+    async def run():
+        return [(await call(middleware, scope))[0] for scope in scopes]
+    return asyncio.run(run())
+
+def token(user_id: str) -> str:
+    return jwt.encode({"id": user_id, "exp": time.time() + 600}, settings.secret_key, settings.jwt_hashing_algorithm)
+
+def test_over_the_rate_gets_429_with_retry_after(clock):
+    middleware = AdmissionMiddleware(ok_app, route_classes(), TokenBucketStore(max_keys=10))
+    assert statuses(middleware, [http_scope("/recommendations/me")] * 2) == [200, 200]
+    status, headers = asyncio.run(call(middleware, http_scope("/recommendations/me")))
+    assert status == 429
+    assert headers[b"retry-after"] == b"1"
+    clock.now += 1
+    assert statuses(middleware, [http_scope("/recommendations/me")]) == [200]
+
+def test_other_routes_are_not_limited(clock):
+    middleware = AdmissionMiddleware(ok_app, route_classes(burst=1), TokenBucketStore(max_keys=10))
+    assert statuses(middleware, [http_scope("/books")] * 5) == [200] * 5
+
+def test_buckets_are_per_user_then_per_ip(clock):
+    middleware = AdmissionMiddleware(ok_app, route_classes(burst=1), TokenBucketStore(max_keys=10))
+    assert statuses(middleware, [
+        http_scope("/recommendations/me", token("u1")),
+        http_scope("/recommendations/me", token("u2")),
+        http_scope("/recommendations/me", token("u1"), client="10.0.0.2"),
+        http_scope("/recommendations/me", "not-a-token"),
+        http_scope("/recommendations/me"),
+        http_scope("/recommendations/me", client="10.0.0.2"),
+    ]) == [200, 200, 429, 200, 429, 200]
+
+def test_over_the_concurrency_cap_gets_503():
+    release = asyncio.Event()
+    async def slow_app(scope, receive, send):
+        await release.wait()
+        await ok_app(scope, receive, send)
+
+    classes = route_classes(burst=10, max_concurrency=1)
+    middleware = AdmissionMiddleware(slow_app, classes, TokenBucketStore(max_keys=10))
+    async def run():
+        first = asyncio.create_task(call(middleware, http_scope("/recommendations/me")))
+        await asyncio.sleep(0)
+        assert classes[0].in_flight == 1
+        rejected = await call(middleware, http_scope("/recommendations/me", client="10.0.0.2"))
+        release.set()
+        return (await first)[0], rejected
+    first, (status, headers) = asyncio.run(run())
+    assert (first, status) == (200, 503)
+    assert headers[b"retry-after"] == str(settings.load_shed_retry_after).encode()
+    assert classes[0].in_flight == 0
+
+def test_slot_is_released_when_the_app_fails():
+    async def failing_app(scope, receive, send):
+        raise RuntimeError("boom")
+    classes = route_classes(burst=10)
+    middleware = AdmissionMiddleware(failing_app, classes, TokenBucketStore(max_keys=10))
+    with pytest.raises(RuntimeError):
+        asyncio.run(call(middleware, http_scope("/recommendations/me")))
+    assert classes[0].in_flight == 0
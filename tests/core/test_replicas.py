@@ -0,0 +1,65 @@
+import asyncio
+import pytest
+from sqlalchemy import exc
+from app.core.config import settings
+from app.core.db import DBConnection, parse_hosts
+from app.core.metaclasses import SingletonMetaClass
+
+# Nothing listens on these ports, so connecting fails at once with "connection refused".
+REPLICAS = "127.0.0.1:1,127.0.0.1:2"
+
+@pytest.fixture
+def db(monkeypatch):
+    monkeypatch.setattr(settings, "db_replica_hosts", REPLICAS)
+    monkeypatch.setattr(settings, "db_replica_retry_interval", 30)
+    connection = object.__new__(DBConnection)
+    connection.__init__()
+    monkeypatch.setitem(SingletonMetaClass._instance, DBConnection, connection)
+    return connection
+
+def test_parse_hosts():
+    assert parse_hosts("a, b:6543,,c:1", 5432) == [("a", 5432), ("b", 6543), ("c", 1)]
+    assert parse_hosts(None, 5432) == []
+
+def test_round_robin(db):
+    router = db.get_replica_router()
+    engines = [router.pick("sync") for _ in range(4)]
+    assert [engine.url.port for engine in engines] == [1, 2, 1, 2]
+    assert engines[0] is engines[2]
+    assert router.pick("async") is not engines[0]
+
+def test_marked_down_replica_is_skipped_until_retry_interval(db, clock):
+    router = db.get_replica_router()
+    router.mark_down(0)
+    assert [router.pick("sync").url.port for _ in range(3)] == [2, 2, 2]
+    clock.now += 31
+    assert {router.pick("sync").url.port for _ in range(2)} == {1, 2}
+    assert router.stats()[0]["failures"] == 1
+
+def test_every_replica_down_falls_back_to_primary(db, clock):
+    router = db.get_replica_router()
+    router.mark_down(0)
+    router.mark_down(1)
+    assert router.pick("sync") is None
+    assert db.get_replica_engine() is db.get_engine()
+    assert db.get_replica_async_engine() is db.get_async_engine()
+    assert [replica["healthy"] for replica in router.stats()] == [False, False]
+
+def test_failed_connection_marks_the_replica_down(db):
+    router = db.get_replica_router()
+    engine = router.pick("sync")
+    with pytest.raises(exc.OperationalError):
+        engine.connect()
+    assert router.failures == [1, 0]
+    assert router.pick("sync").url.port == 2
+
+def test_async_session_retries_then_uses_the_primary(db):
+    async def connect():
+        session = await db.connect_replica_async_session()
+        bind = session.bind
+        await session.close()
+        return bind
+    assert asyncio.run(connect()) is db.get_async_engine()
+    router = db.get_replica_router()
+    assert router.failures == [1, 1]
+    assert router.pick("async") is None
@@ -0,0 +1,96 @@
+import asyncio
+import gzip
+import json
+from datetime import datetime, timezone
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.dependencies import get_current_user
+from app.modules.exports import routes as export_routes
+from app.modules.exports import services as export_services
+from app.modules.users.schemas import UserData
+
+CREATED = datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+RATINGS = [("u1", "b1", 4.0, CREATED, None), ("u2", "b1", 2.5, CREATED, CREATED)]
+
+class FakeResult:
+    def __init__(self, rows, chunk_size):
+        self.rows = rows
+        self.chunk_size = chunk_size
+
+    async def partitions(self):
+        for start in range(0, len(self.rows), self.chunk_size):
+            yield self.rows[start:start + self.chunk_size]
+
+class FakeSession:
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def stream(self, sql):
+        self.statements.append(sql)
+        return FakeResult(self.rows, sql.get_execution_options()["yield_per"])
+
+@pytest.fixture
+def session(monkeypatch):
+    session = FakeSession(RATINGS)
+    class DB:
+        async def connect_replica_async_session(self):
+            return session
+    monkeypatch.setattr(export_services, "DBConnection", DB)
+    return session
+
+def export(*args, **kwargs) -> list[bytes]:
+    async def collect():
+        return [chunk async for chunk in export_services.export_table(*args, **kwargs)]
+    return asyncio.run(collect())
+
+def test_ndjson_export(session):
+    chunks = export("ratings", "ndjson", chunk_size=1)
+    assert len(chunks) == 2
+    assert [json.loads(line) for line in b"".join(chunks).splitlines()] == [
+        {"user_id": "u1", "book_id": "b1", "score": 4.0, "created_at": CREATED.isoformat(), "updated_at": None},
+        {"user_id": "u2", "book_id": "b1", "score": 2.5, "created_at": CREATED.isoformat(), "updated_at": CREATED.isoformat()},
+    ]
+    assert "deleted_at IS NULL" in str(session.statements[0])
+
+def test_csv_export_starts_with_a_header(session):
+    assert b"".join(export("ratings", "csv")).decode().splitlines() == [
+        "user_id,book_id,score,created_at,updated_at",
+        f"u1,b1,4.0,{CREATED.isoformat()},",
+        f"u2,b1,2.5,{CREATED.isoformat()},{CREATED.isoformat()}",
+    ]
+
+def test_gzip_export_decompresses_to_the_plain_one(session):
+    assert gzip.decompress(b"".join(export("ratings", "csv", compress=True, chunk_size=1))) == b"".join(export("ratings", "csv"))
+
+def test_empty_table(session):
+    session.rows = []
+    assert export("ratings", "ndjson") == []
+    assert export("ratings", "csv") == [b"user_id,book_id,score,created_at,updated_at\n"]
+
+def test_export_filename():
+    assert export_services.export_filename("books", "csv", False) == "books.csv"
+    assert export_services.export_filename("ratings", "ndjson", True) == "ratings.ndjson.gz"
+
+def client(is_superuser: bool) -> TestClient:
+    app = FastAPI()
+    app.include_router(export_routes.router)
+    app.dependency_overrides[get_current_user] = lambda: UserData(id="u1", email="a@example.com", password="x", is_superuser=is_superuser)
+    return TestClient(app)
+
+def test_route_is_restricted_to_superusers(session):
+    assert client(is_superuser=False).get("/exports/ratings").status_code == 403
+
+def test_route_streams_an_attachment(session):
+    response = client(is_superuser=True).get("/exports/ratings", params={"format": "csv", "gzip": True})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/gzip"
+    assert response.headers["content-disposition"] == 'attachment; filename="ratings.csv.gz"'
+    assert gzip.decompress(response.content).startswith(b"user_id,book_id")
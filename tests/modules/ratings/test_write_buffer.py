@@ -0,0 +1,73 @@
+import asyncio
+import pytest
+from app.modules.ratings import repository as rating_repo
+from app.modules.ratings import services as rating_services
+from app.modules.ratings.schemas import RatingBatch
+from app.modules.ratings.services import RatingWriteBuffer
+
+class FakeSession:
+    def __init__(self, fail_on_batch: int = None):
+        self.batches = []
+        self.commits = self.rollbacks = 0
+        self.fail_on_batch = fail_on_batch
+
+    async def upsert(self, session, rows):
+        if len(self.batches) == self.fail_on_batch:
+            raise RuntimeError("connection lost")
+        self.batches.append(rows)
+        return len(rows)
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        self.rollbacks += 1
+
+def flush(buffer: RatingWriteBuffer, session: FakeSession, monkeypatch) -> tuple[int, int]:
+    monkeypatch.setattr(rating_repo, "ratings_upsert", session.upsert)
+    return asyncio.run(buffer.flush(session))
+
+def test_flush_batches_in_key_order_and_commits_once(monkeypatch):
+    buffer = RatingWriteBuffer(batch_size=2)
+    for user_id, book_id in [("u2", "b1"), ("u1", "b2"), ("u1", "b1"), ("u3", "b9"), ("u2", "b0")]:
+        buffer.add(user_id, book_id, 3.0)
+    session = FakeSession()
+
+    assert flush(buffer, session, monkeypatch) == (5, 3)
+    assert [len(batch) for batch in session.batches] == [2, 2, 1]
+    keys = [(row["user_id"], row["book_id"]) for batch in session.batches for row in batch]
+    assert keys == sorted(keys)
+    assert (session.commits, session.rollbacks) == (1, 0)
+    assert len(buffer) == 0
+
+def test_last_score_wins(monkeypatch):
+    buffer = RatingWriteBuffer()
+    buffer.add("u1", "b1", 2.0)
+    buffer.add("u1", "b1", 7.5)
+    session = FakeSession()
+    assert flush(buffer, session, monkeypatch) == (1, 1)
+    assert session.batches == [[{"user_id": "u1", "book_id": "b1", "score": 7.5}]]
+
+def test_failed_batch_rolls_back_and_keeps_rows(monkeypatch):
+    buffer = RatingWriteBuffer(batch_size=1)
+    buffer.add("u1", "b1", 1.0)
+    buffer.add("u1", "b2", 1.0)
+    session = FakeSession(fail_on_batch=1)
+    with pytest.raises(RuntimeError):
+        flush(buffer, session, monkeypatch)
+    assert (session.commits, session.rollbacks) == (0, 1)
+    assert len(buffer) == 2
+
+def test_batch_size_stays_under_parameter_limit():
+    assert RatingWriteBuffer(batch_size=50_000).batch_size == rating_repo.MAX_UPSERT_ROWS
+    assert rating_repo.MAX_UPSERT_ROWS * 3 <= 32767
+
+def test_rate_books_invalidates_raters(monkeypatch):
+    invalidated = []
+    monkeypatch.setattr(rating_services.rec_services, "invalidate_recommendations", invalidated.extend)
+    session = FakeSession()
+    monkeypatch.setattr(rating_repo, "ratings_upsert", session.upsert)
+    batch = RatingBatch(ratings=[("u1", "b1", 4), ("u2", "b1", 5), ("u1", "b1", 6)])
+    result = asyncio.run(rating_services.rate_books(session, batch))
+    assert (result.received, result.written, result.batches) == (3, 2, 1)
+    assert sorted(invalidated) == ["u1", "u2"]
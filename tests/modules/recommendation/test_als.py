@@ -0,0 +1,80 @@
+import numpy as np
+from scipy import sparse
+from app.modules.recommendation.als import ALSModel, ALSTrainer, solve_rows
+
+def low_rank_ratings(seed: int, n_users: int = 20, n_items: int = 15, rank: int = 3) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return (rng.random((n_users, rank)) @ rng.random((rank, n_items)) * 2).astype(np.float32)
+
+def initial_model(ratings: np.ndarray, factors: int) -> ALSModel:
+    user_ids = np.array([f"u{i:03d}" for i in range(ratings.shape[0])])
+    item_ids = np.array([f"b{i:03d}" for i in range(ratings.shape[1])])
+    return ALSModel.initial(user_ids, item_ids, sparse.csr_matrix(ratings), factors=factors, seed=0, params={"factors": factors})
+
+def test_explicit_als_fits_low_rank_matrix():
+    ratings = low_rank_ratings(seed=1)
+    model = initial_model(ratings, factors=3)
+    initial_rmse = model.training_rmse()
+    model = ALSTrainer(regularization=0.001, workers=1).train(model, epochs=30)
+    assert model.training_rmse() < 0.05 < initial_rmse
+    assert model.metadata["epoch"] == 30
+    np.testing.assert_allclose(model.user_factors @ model.item_factors.T, ratings, atol=0.15)
+
+def test_training_rmse_is_computed_over_rated_entries_only():
+    ratings = np.array([[2, 0], [0, 4]], dtype=np.float32)
+    model = initial_model(ratings, factors=1)
+    model.user_factors = np.array([[1.0], [2.0]], dtype=np.float32)
+    model.item_factors = np.array([[1.0], [1.0]], dtype=np.float32)
+    # Errors on the rated entries are 1 and 2.
+    assert model.training_rmse(chunk_size=1) == np.float32(np.sqrt(2.5))
+
+def test_recommend_leaves_out_rated_items():
+    ratings = low_rank_ratings(seed=2)
+    ratings[np.random.default_rng(2).random(ratings.shape) > 0.5] = 0
+    model = ALSTrainer(regularization=0.1, workers=1, block_size=4).train(initial_model(ratings, factors=2), epochs=5)
+    for row, user_id in enumerate(model.user_ids):
+        result = model.recommend(user_id, k=3)
+        seen = set(model.item_ids[ratings[row] > 0])
+        assert len(result) == min(3, ratings.shape[1] - len(seen))
+        assert not seen & {item for item, _ in result}
+        scores = [score for _, score in result]
+        assert scores == sorted(scores, reverse=True)
+    assert model.recommend("missing") == []
+
+def sparse_ratings(seed: int, n_users: int = 30, n_items: int = 12) -> np.ndarray:
+    ratings = low_rank_ratings(seed, n_users, n_items)
+    ratings[np.random.default_rng(seed).random(ratings.shape) > 0.4] = 0
+    return ratings
+
+def test_process_pool_gives_the_same_factors_as_one_worker():
+    ratings = sparse_ratings(seed=3)
+    for implicit in (False, True):
+        inline = ALSTrainer(regularization=0.1, implicit=implicit, alpha=5, workers=1, block_size=7).train(initial_model(ratings, factors=3), epochs=3)
+        pooled = ALSTrainer(regularization=0.1, implicit=implicit, alpha=5, workers=2, block_size=7).train(initial_model(ratings, factors=3), epochs=3)
+        np.testing.assert_allclose(pooled.user_factors, inline.user_factors, rtol=1e-4, atol=1e-6)
+        np.testing.assert_allclose(pooled.item_factors, inline.item_factors, rtol=1e-4, atol=1e-6)
+
+def test_implicit_solve_matches_dense_normal_equations():
+    ratings = sparse_ratings(seed=4)
+    fixed = np.random.default_rng(4).standard_normal((ratings.shape[1], 3)).astype(np.float32)
+    alpha, regularization = 5.0, 0.1
+    solved = solve_rows(sparse.csr_matrix(ratings), fixed, regularization, implicit=True, alpha=alpha, gram=fixed.T.astype(np.float64) @ fixed)
+    for row, scores in enumerate(ratings):
+        # Every item is a weak negative with confidence 1; rated ones are positives with 1 + alpha * score.
+        confidence = 1 + alpha * scores
+        preference = (scores > 0).astype(np.float64)
+        lhs = fixed.T @ (confidence[:, None] * fixed) + regularization * np.eye(3)
+        expected = np.linalg.solve(lhs, fixed.T @ (confidence * preference))
+        np.testing.assert_allclose(solved[row], expected, rtol=1e-3, atol=1e-4)
+
+def test_implicit_als_recommends_within_the_users_group():
+    # Two groups of users, each interacting with its own half of the catalog, one item held out per user.
+    ratings = np.zeros((20, 12), dtype=np.float32)
+    ratings[:10, :6] = ratings[10:, 6:] = 1
+    held_out = [(user, user % 6 + (6 if user >= 10 else 0)) for user in range(20)]
+    for user, item in held_out:
+        ratings[user, item] = 0
+    model = ALSTrainer(regularization=0.1, implicit=True, alpha=10, workers=1).train(initial_model(ratings, factors=2), epochs=10)
+    assert "training_rmse" not in model.metadata
+    for user, item in held_out:
+        assert [item_id for item_id, _ in model.recommend(model.user_ids[user], k=1)] == [model.item_ids[item]]
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+from scipy import sparse
+from app.modules.recommendation import artifacts
+from app.modules.recommendation.engine import ItemItemModel
+from app.modules.recommendation.exceptions import ModelNotAvailableException
+
+def small_model() -> ItemItemModel:
+    ratings = np.array([[5, 3, 0, 1], [4, 0, 0, 1], [1, 1, 0, 5], [0, 1, 5, 4]], dtype=np.float32)
+    return ItemItemModel.fit(np.array(["u1", "u2", "u3", "u4"]), np.array(["b1", "b2", "b3", "b4"]), sparse.csr_matrix(ratings), top_k=2)
+
+def test_save_and_load_round_trip(tmp_path):
+    model = small_model()
+    version = artifacts.save_model(model, tmp_path, version="v1", metadata={"ratings": 12})
+    loaded = artifacts.load_model(tmp_path)
+
+    assert artifacts.current_version(tmp_path) == "v1" == version
+    assert isinstance(loaded, ItemItemModel)
+    assert (loaded.version, loaded.metadata, loaded.params) == ("v1", {"ratings": 12}, model.params)
+    assert isinstance(loaded.user_ids, np.memmap)
+    np.testing.assert_array_equal(loaded.similarity.toarray(), model.similarity.toarray())
+    for user_id in model.user_ids:
+        assert loaded.recommend(user_id, k=3) == model.recommend(user_id, k=3)
+
+def test_load_without_mmap(tmp_path):
+    artifacts.save_model(small_model(), tmp_path, version="v1")
+    loaded = artifacts.load_model(tmp_path, mmap=False)
+    assert not isinstance(loaded.user_ids, np.memmap)
+
+def test_unpublished_version_does_not_move_current(tmp_path):
+    artifacts.save_model(small_model(), tmp_path, version="v1")
+    artifacts.save_model(small_model(), tmp_path, version="v2", publish=False)
+    assert artifacts.current_version(tmp_path) == "v1"
+    assert artifacts.load_model(tmp_path).version == "v1"
+    assert artifacts.load_model(tmp_path, version="v2").version == "v2"
+
+    artifacts.publish_version(tmp_path, "v2")
+    assert artifacts.load_model(tmp_path).version == "v2"
+    assert not list(tmp_path.glob(".*"))
+
+def test_missing_models_are_reported(tmp_path):
+    with pytest.raises(ModelNotAvailableException):
+        artifacts.load_model(tmp_path)
+    artifacts.save_model(small_model(), tmp_path, version="v1")
+    with pytest.raises(ModelNotAvailableException):
+        artifacts.load_model(tmp_path, version="v9")
+
+def test_unsupported_format_version(tmp_path):
+    artifacts.save_model(small_model(), tmp_path, version="v1")
+    manifest = tmp_path / "v1" / artifacts.MANIFEST_FILE
+    manifest.write_text(manifest.read_text().replace('"format_version": 1', '"format_version": 99'))
+    with pytest.raises(ModelNotAvailableException):
+        artifacts.load_model(tmp_path)
+
+def test_prune_keeps_newest_and_published(tmp_path):
+    for version in ("v1", "v2", "v3", "v4"):
+        artifacts.save_model(small_model(), tmp_path, version=version, publish=version == "v1")
+    artifacts.prune_versions(tmp_path, keep=2)
+    assert sorted(path.name for path in tmp_path.iterdir() if path.is_dir()) == ["v1", "v3", "v4"]
+    assert artifacts.load_model(tmp_path).version == "v1"
@@ -0,0 +1,88 @@
+import numpy as np
+from app.modules.recommendation import content
+from app.modules.recommendation import repository as rec_repo
+from app.modules.recommendation.content import ContentModel
+
+TOPICS = {
+    "space": "rocket orbit planet astronaut galaxy star launch moon",
+    "cooking": "recipe kitchen flour oven bake sauce garlic butter",
+    "sailing": "boat sail wind harbour ocean captain crew anchor",
+}
+
+def catalog(per_topic: int = 20, seed: int = 0) -> list[tuple[str, str]]:
+    rng = np.random.default_rng(seed)
+    books = []
+    for topic, words in TOPICS.items():
+        words = words.split()
+        for i in range(per_topic):
+            books.append((f"{topic}-{i:03d}", " ".join(rng.choice(words, size=6))))
+    return sorted(books)
+
+def test_hashed_term_counts():
+    counts = content.hashed_term_counts(["a b a", "", "B c"], n_features=1024, chunk_size=2)
+    assert counts.shape == (3, 1024)
+    assert counts.sum(axis=1).ravel().tolist() == [[3, 0, 2]]
+    assert sorted(counts[0].data.tolist()) == [1, 2]
+    assert counts[0, content.zlib.crc32(b"b") % 1024] == counts[2, content.zlib.crc32(b"b") % 1024] == 1
+
+def test_tfidf_rows_are_unit_norm():
+    matrix = content.tfidf(content.hashed_term_counts(["x y z", "x x", ""], n_features=64))
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    np.testing.assert_allclose(norms, [1, 1, 0], atol=1e-6)
+
+def test_similar_books_share_a_topic():
+    books = catalog()
+    model = content.build_content_model(books, dim=8, n_features=2 ** 12)
+    assert model.item_ids.tolist() == [book_id for book_id, _ in books]
+    for book_id, _ in books[::7]:
+        result = model.similar(book_id, k=5, nprobe=len(model.centroids))
+        assert len(result) == 5
+        assert book_id not in {similar_id for similar_id, _ in result}
+        assert {similar_id.split("-")[0] for similar_id, _ in result} == {book_id.split("-")[0]}
+        scores = [score for _, score in result]
+        assert scores == sorted(scores, reverse=True)
+
+def test_probing_every_list_matches_brute_force():
+    books = catalog(per_topic=30, seed=1)
+    model = content.build_content_model(books, dim=6, n_features=2 ** 12, n_lists=4)
+    vectors = np.empty_like(model.vectors)
+    vectors[model.row_items] = model.vectors
+    for item in range(0, len(books), 11):
+        scores = vectors @ vectors[item]
+        scores[item] = -np.inf
+        expected = np.sort(scores)[::-1][:5]
+        items, found = model.search(vectors[item], k=5, nprobe=4, exclude=item)
+        np.testing.assert_allclose(found, expected, rtol=1e-5)
+        assert item not in items
+
+def test_one_book_catalog():
+    model = content.build_content_model([("b1", "a lonely book")], dim=8, n_features=64)
+    assert model.similar("b1") == []
+    assert model.similar("missing") == []
+
+def test_empty_catalog():
+    model = content.build_content_model([], dim=8, n_features=64)
+    assert isinstance(model, ContentModel)
+    assert len(model.item_ids) == 0
+    assert model.params["n_lists"] == 0
+    assert model.similar("b1") == []
+
+class Row:
+    def __init__(self, id, title, author, description):
+        self.id, self.title, self.author, self.description = id, title, author, description
+
+class FakeSession:
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = []
+
+    def execute(self, sql):
+        self.statements.append(sql)
+        return iter(self.rows)
+
+def test_documents_come_with_their_ids_from_one_query():
+    session = FakeSession([Row("b1", "Dune", "Herbert", None), Row("b2", "Emma", None, "A novel")])
+    assert list(rec_repo.fetch_book_documents(session)) == [("b1", "Dune Herbert"), ("b2", "Emma A novel")]
+    assert len(session.statements) == 1
+    compiled = str(session.statements[0])
+    assert "book.id" in compiled and "book.description" in compiled and 'COLLATE "C"' in compiled
@@ -0,0 +1,156 @@
+import numpy as np
+from scipy import sparse
+from app.modules.recommendation.engine import ItemItemModel, build_interaction_matrix, build_neighbours
+
+def random_ratings(seed: int, n_users: int = 12, n_items: int = 9, density: float = 0.4) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    ratings = rng.integers(1, 6, size=(n_users, n_items)).astype(np.float32)
+    ratings[rng.random((n_users, n_items)) > density] = 0
+    return ratings
+
+def brute_force_similarity(ratings: np.ndarray, top_k: int) -> np.ndarray:
+    norms = np.linalg.norm(ratings, axis=0)
+    norms[norms == 0] = 1
+    normalized = ratings / norms
+    similarity = normalized.T @ normalized
+    np.fill_diagonal(similarity, 0)
+    similarity[similarity < 0] = 0
+    for row in similarity:
+        row[np.argsort(-row, kind="stable")[top_k:]] = 0
+    return similarity
+
+def brute_force_recommend(ratings: np.ndarray, similarity: np.ndarray, user: int, k: int) -> list[tuple[int, float]]:
+    scores = ratings[user] @ similarity
+    scores[ratings[user] > 0] = 0
+    ranked = [item for item in np.argsort(-scores, kind="stable") if scores[item] > 0]
+    return [(item, float(scores[item])) for item in ranked[:k]]
+
+def ids(prefix: str, n: int) -> np.ndarray:
+    return np.array([f"{prefix}{i:03d}" for i in range(n)])
+
+def fit(ratings: np.ndarray, top_k: int, block_size: int = 4) -> ItemItemModel:
+    return ItemItemModel.fit(ids("u", ratings.shape[0]), ids("b", ratings.shape[1]), sparse.csr_matrix(ratings), top_k=top_k, block_size=block_size)
+
+def test_build_interaction_matrix_sums_duplicates():
+    matrix = build_interaction_matrix(np.array([0, 0, 1]), np.array([1, 1, 0]), np.array([2.0, 3.0, 4.0]), shape=(2, 2))
+    assert matrix.toarray().tolist() == [[0, 5], [4, 0]]
+
+def test_neighbours_match_brute_force_cosine():
+    ratings = random_ratings(seed=1)
+    for top_k in (3, ratings.shape[1]):
+        for block_size in (1, 4, 100):
+            similarity = build_neighbours(sparse.csr_matrix(ratings), top_k=top_k, block_size=block_size)
+            np.testing.assert_allclose(similarity.toarray(), brute_force_similarity(ratings, top_k), rtol=1e-5, atol=1e-6)
+            assert np.all(np.diff(similarity.indptr) <= top_k)
+
+def test_neighbour_rows_are_sorted_best_first():
+    similarity = build_neighbours(sparse.csr_matrix(random_ratings(seed=2)), top_k=4)
+    for row in range(similarity.shape[0]):
+        data = similarity.data[similarity.indptr[row]:similarity.indptr[row + 1]]
+        assert np.all(np.diff(data) <= 0)
+
+def test_recommend_matches_brute_force():
+    ratings = random_ratings(seed=3)
+    model = fit(ratings, top_k=ratings.shape[1])
+    similarity = brute_force_similarity(ratings, ratings.shape[1])
+    for user in range(ratings.shape[0]):
+        expected = brute_force_recommend(ratings, similarity, user, k=4)
+        result = model.recommend(model.user_ids[user], k=4)
+        assert [item for item, _ in result] == [model.item_ids[item] for item, _ in expected]
+        np.testing.assert_allclose([score for _, score in result], [score for _, score in expected], rtol=1e-5)
+
+def test_recommend_excludes_seen_items_and_unknown_users():
+    ratings = random_ratings(seed=4)
+    model = fit(ratings, top_k=5)
+    for user in range(ratings.shape[0]):
+        seen = set(model.item_ids[ratings[user] > 0])
+        assert not seen & {item for item, _ in model.recommend(model.user_ids[user], k=10)}
+    assert model.recommend("missing") == []
+
+def test_recommend_batch_matches_recommend():
+    model = fit(random_ratings(seed=5), top_k=5)
+    users = [model.user_ids[0], "missing", model.user_ids[3], model.user_ids[0]]
+    assert model.recommend_batch(users, k=3) == [model.recommend(user, k=3) for user in users]
+
+def updated_ratings(ratings: np.ndarray, changes: list[tuple[int, int, float]]) -> np.ndarray:
+    ratings = np.pad(ratings, ((0, 2), (0, 2)))
+    for user, item, score in changes:
+        ratings[user, item] = score
+    return ratings
+
+def test_apply_updates_matches_full_rebuild():
+    ratings = random_ratings(seed=6)
+    n_users, n_items = ratings.shape
+    top_k = n_items + 2
+    model = fit(ratings, top_k=top_k)
+    rated = np.argwhere(ratings > 0)
+    changes = [
+        (int(rated[0][0]), int(rated[0][1]), 0.0),
+        (int(rated[5][0]), int(rated[5][1]), 1.0),
+        (0, int(np.flatnonzero(ratings[0] == 0)[0]), 5.0),
+        (n_users, 2, 4.0),
+        (1, n_items, 3.0),
+        (n_users + 1, n_items + 1, 2.0),
+        (n_users + 1, n_items + 1, 5.0),
+    ]
+    user_ids, item_ids = ids("u", n_users + 2), ids("b", n_items + 2)
+    updated = model.apply_updates(
+        [user_ids[user] for user, _, _ in changes],
+        [item_ids[item] for _, item, _ in changes],
+        [score for _, _, score in changes],
+        deleted=[score == 0 for _, _, score in changes],
+    )
+    rebuilt = fit(updated_ratings(ratings, changes), top_k=top_k)
+
+    assert updated.user_ids.tolist() == rebuilt.user_ids.tolist()
+    assert updated.item_ids.tolist() == rebuilt.item_ids.tolist()
+    np.testing.assert_array_equal(updated.user_items.toarray(), rebuilt.user_items.toarray())
+    np.testing.assert_allclose(updated.similarity.toarray(), rebuilt.similarity.toarray(), rtol=1e-5, atol=1e-6)
+    for user in updated.user_ids:
+        assert [item for item, _ in updated.recommend(user, k=5)] == [item for item, _ in rebuilt.recommend(user, k=5)]
+
+def test_apply_updates_leaves_original_model_unchanged():
+    ratings = random_ratings(seed=7)
+    model = fit(ratings, top_k=4)
+    before = model.similarity.toarray().copy()
+    model.apply_updates([model.user_ids[0]], [model.item_ids[0]], [5.0])
+    np.testing.assert_array_equal(model.user_items.toarray(), ratings)
+    np.testing.assert_array_equal(model.similarity.toarray(), before)
+
+def test_apply_updates_with_small_top_k_stays_close_to_full_rebuild():
+    ratings = random_ratings(seed=8, n_users=60, n_items=60, density=0.2)
+    top_k = 5
+    model = fit(ratings, top_k=top_k, block_size=8)
+    rng = np.random.default_rng(8)
+    changes = [(int(user), int(item), float(rng.integers(1, 6))) for user, item in zip(rng.integers(0, 60, 4), rng.integers(0, 60, 4))]
+    rated = np.argwhere(ratings > 0)
+    changes += [(int(user), int(item), 0.0) for user, item in rated[rng.choice(len(rated), 2, replace=False)]]
+    user_ids, item_ids = model.user_ids, model.item_ids
+    updated = model.apply_updates(
+        [user_ids[user] for user, _, _ in changes],
+        [item_ids[item] for _, item, _ in changes],
+        [score for _, _, score in changes],
+        deleted=[score == 0 for _, _, score in changes],
+    )
+    new_ratings = ratings.copy()
+    for user, item, score in changes:
+        new_ratings[user, item] = score
+    rebuilt = fit(new_ratings, top_k=top_k).similarity.toarray()
+    result = updated.similarity.toarray()
+    exact = brute_force_similarity(new_ratings, new_ratings.shape[1])
+
+    changed_items = sorted({item for _, item, _ in changes})
+    old = model.similarity.toarray()
+    untouched = [row for row in range(60) if row not in changed_items and not old[row, changed_items].any()]
+    assert np.all(np.diff(updated.similarity.indptr) <= top_k)
+    # Every stored similarity is current, whichever path produced it.
+    np.testing.assert_allclose(result[result > 0], exact[result > 0], rtol=1e-5)
+    # Rows of changed items are recomputed exactly, and so are rows that held none of them.
+    np.testing.assert_allclose(result[changed_items], rebuilt[changed_items], rtol=1e-5, atol=1e-6)
+    np.testing.assert_allclose(result[untouched], rebuilt[untouched], rtol=1e-5, atol=1e-6)
+    # The rest only drift when a changed item drops out of a full list.
+    overlap = [
+        len(set(np.flatnonzero(result[row])) & set(np.flatnonzero(rebuilt[row]))) / max(np.count_nonzero(rebuilt[row]), 1)
+        for row in range(60)
+    ]
+    assert np.mean(overlap) >= 0.9
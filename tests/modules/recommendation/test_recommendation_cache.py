@@ -0,0 +1,60 @@
+from app.core.cache import LocalStore
+from app.modules.recommendation.cache import KEY_PREFIX, RecommendationCache
+
+ITEMS = [("b1", 0.9), ("b2", 0.5)]
+
+def two_workers():
+    shared = LocalStore()
+    return RecommendationCache(10, ttl=60, local_ttl=5, shared=shared), RecommendationCache(10, ttl=60, local_ttl=5, shared=shared), shared
+
+def test_local_then_shared_then_miss(clock):
+    first, second, _ = two_workers()
+    first.set("u1", "v1", ITEMS)
+    assert first.get("u1", "v1") == ITEMS
+    assert second.get("u1", "v1") == ITEMS
+    assert second.get("u2", "v1") is None
+    assert (first.local_hits, second.shared_hits, second.misses) == (1, 1, 1)
+    assert second.stats()["hit_ratio"] == 0.5
+
+def test_entries_of_another_model_version_miss(clock):
+    first, second, _ = two_workers()
+    first.set("u1", "v1", ITEMS)
+    assert first.get("u1", "v2") is None
+    assert second.get("u1", "v2") is None
+
+def test_invalidation_reaches_other_workers_after_local_ttl(clock):
+    first, second, _ = two_workers()
+    first.set("u1", "v1", ITEMS)
+    assert second.get("u1", "v1") == ITEMS
+    first.invalidate(["u1"])
+    assert first.get("u1", "v1") is None
+    # The other worker keeps its local copy until the local TTL runs out.
+    assert second.get("u1", "v1") == ITEMS
+    clock.now += 6
+    assert second.get("u1", "v1") is None
+
+def test_shared_entries_expire(clock):
+    first, second, shared = two_workers()
+    first.set("u1", "v1", ITEMS)
+    clock.now += 61
+    assert shared.get(KEY_PREFIX + "u1") is None
+    assert second.get("u1", "v1") is None
+
+def test_shared_failures_fall_back_to_misses(clock):
+    class BrokenStore:
+        def get(self, name):
+            raise ConnectionError("down")
+        set = delete = get
+    cache = RecommendationCache(10, ttl=60, local_ttl=5, shared=BrokenStore())
+    cache.set("u1", "v1", ITEMS)
+    assert cache.get("u1", "v1") == ITEMS
+    cache.invalidate(["u1"])
+    assert cache.get("u1", "v1") is None
+
+def test_clear_resets_counters(clock):
+    cache = RecommendationCache(10, ttl=60, local_ttl=5)
+    cache.set("u1", "v1", ITEMS)
+    cache.get("u1", "v1")
+    cache.clear()
+    assert cache.stats()["lookups"] == 0
+    assert cache.get("u1", "v1") is None
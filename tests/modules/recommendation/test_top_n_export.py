@@ -0,0 +1,124 @@
+from concurrent.futures import Future
+import numpy as np
+import pytest
+from scipy import sparse
+from app.modules.recommendation import artifacts, export
+from app.modules.recommendation.engine import ItemItemModel
+
+def publish_model(root) -> ItemItemModel:
+    rng = np.random.default_rng(0)
+    ratings = rng.integers(1, 6, size=(23, 10)).astype(np.float32)
+    ratings[rng.random(ratings.shape) > 0.4] = 0
+    user_ids = np.array([f"u{i:03d}" for i in range(23)])
+    item_ids = np.array([f"b{i:03d}" for i in range(10)])
+    model = ItemItemModel.fit(user_ids, item_ids, sparse.csr_matrix(ratings), top_k=4)
+    model.version = artifacts.save_model(model, root, version="v1")
+    return model
+
+def concatenate(chunks) -> list[np.ndarray]:
+    return [np.concatenate(arrays) for arrays in zip(*chunks)]
+
+def test_score_all_users_matches_scoring_in_process(tmp_path):
+    model = publish_model(tmp_path)
+    users, ranks, items, scores = concatenate(export.score_all_users(str(tmp_path), "v1", k=3, chunk_size=4, workers=2))
+    positions, expected_items, expected_scores = model.score_users(np.arange(23), k=3)
+    np.testing.assert_array_equal(users, positions)
+    np.testing.assert_array_equal(items, expected_items)
+    np.testing.assert_allclose(scores, expected_scores)
+    assert np.all(ranks == np.arange(len(users)) - np.searchsorted(users, users))
+
+class InlinePool:
+    """
+    Runs submissions inline and records how far submission runs ahead of consumption.
+    """
+    def __init__(self, max_workers, initializer, initargs):
+        initializer(*initargs)
+        self.submitted = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def submit(self, fn, *args):
+        self.submitted += 1
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+def test_score_all_users_keeps_a_bounded_window(tmp_path, monkeypatch):
+    publish_model(tmp_path)
+    pools = []
+    def create_pool(**kwargs):
+        pools.append(InlinePool(**kwargs))
+        return pools[-1]
+    monkeypatch.setattr(export, "ProcessPoolExecutor", create_pool)
+    consumed = 0
+    for _ in export.score_all_users(str(tmp_path), "v1", k=3, chunk_size=1, workers=2):
+        consumed += 1
+        assert pools[0].submitted - consumed < 2 * 2
+    assert consumed == pools[0].submitted == 23
+
+class FakeCursor:
+    def __init__(self, log):
+        self.log = log
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params):
+        self.log.append((sql, params))
+
+    def copy_expert(self, sql, buffer):
+        self.log.append((sql, buffer.read()))
+
+class FakeConnection:
+    def __init__(self):
+        self.log = []
+
+    def cursor(self):
+        return FakeCursor(self.log)
+
+    def commit(self):
+        self.log.append("commit")
+
+    def rollback(self):
+        self.log.append("rollback")
+
+    def close(self):
+        self.log.append("close")
+
+@pytest.fixture
+def connection(monkeypatch):
+    connection = FakeConnection()
+    class Engine:
+        def raw_connection(self):
+            return connection
+    class DB:
+        def get_engine(self):
+            return Engine()
+    monkeypatch.setattr(export, "DBConnection", DB)
+    return connection
+
+def test_write_table_replaces_the_version_in_one_transaction(tmp_path, connection):
+    model = publish_model(tmp_path)
+    chunk = (np.array([0, 0, 1]), np.array([0, 1, 0], dtype=np.int32), np.array([3, 5, 2]), np.array([0.5, 0.25, 1.0]))
+    assert export.write_table(model, "v1", [chunk, chunk]) == 6
+    assert connection.log[0] == (export.DELETE_VERSION_SQL, ("v1",))
+    assert [entry[0] for entry in connection.log[1:3]] == [export.COPY_SQL] * 2
+    assert connection.log[1][1].splitlines() == ["u000,v1,0,b003,0.5", "u000,v1,1,b005,0.25", "u001,v1,0,b002,1.0"]
+    assert connection.log[3:] == [(export.DELETE_OLD_SQL, ("v1",)), "commit", "close"]
+
+def test_write_table_rolls_back_on_failure(tmp_path, connection):
+    model = publish_model(tmp_path)
+    def chunks():
+        yield (np.array([0]), np.array([0], dtype=np.int32), np.array([1]), np.array([0.5]))
+        raise RuntimeError("scoring failed")
+    with pytest.raises(RuntimeError):
+        export.write_table(model, "v1", chunks())
+    assert connection.log[-2:] == ["rollback", "close"]
+    assert "commit" not in connection.log
@@ -0,0 +1,75 @@
+import asyncio
+import pytest
+from app.core.cache import LocalStore
+from app.core.config import settings
+from app.modules.users import services as user_services
+from app.modules.users.schemas import UserData
+
+class FakeUserRepository:
+    def __init__(self):
+        self.reads = 0
+        self.first_name = "Ada"
+
+    async def get_user(self, session, email=None, id=None):
+        self.reads += 1
+        return UserData(id=id, email="ada@example.com", password="hash", first_name=self.first_name)
+
+@pytest.fixture
+def repository(monkeypatch):
+    repository = FakeUserRepository()
+    monkeypatch.setattr(user_services.user_repo, "get_user", repository.get_user)
+    monkeypatch.setattr(user_services, "shared_user_store", None)
+    user_services.user_cache.clear()
+    yield repository
+    user_services.user_cache.clear()
+
+def get(id="u1") -> UserData:
+    return asyncio.run(user_services.get_user_cached(None, id))
+
+def test_local_hits_skip_the_database(clock, repository):
+    assert get().first_name == "Ada"
+    assert get().first_name == "Ada"
+    assert repository.reads == 1
+
+def test_local_entry_expires(clock, repository):
+    get()
+    clock.now += settings.identity_cache_local_ttl + 0.1
+    get()
+    assert repository.reads == 2
+
+def test_repeated_reads_do_not_extend_expiry(clock, repository):
+    step = settings.identity_cache_local_ttl / 4
+    for _ in range(20):
+        get()
+        clock.now += step
+    # 20 reads over 5 local TTLs go to the database at least once per TTL.
+    assert repository.reads >= 4
+
+def test_invalidation_drops_both_tiers(clock, repository, monkeypatch):
+    monkeypatch.setattr(user_services, "shared_user_store", LocalStore())
+    get()
+    repository.first_name = "Grace"
+    user_services.invalidate_user("u1")
+    assert get().first_name == "Grace"
+    assert repository.reads == 2
+
+def test_other_workers_see_invalidation_within_local_ttl(clock, repository, monkeypatch):
+    shared = LocalStore()
+    monkeypatch.setattr(user_services, "shared_user_store", shared)
+    get()
+    # Another worker updates the user: it only reaches this worker through the shared tier.
+    repository.first_name = "Grace"
+    shared.delete(user_services.USER_KEY_PREFIX + "u1")
+    assert get().first_name == "Ada"
+    clock.now += settings.identity_cache_local_ttl + 0.1
+    assert get().first_name == "Grace"
+
+def test_shared_tier_serves_other_workers(clock, repository, monkeypatch):
+    monkeypatch.setattr(user_services, "shared_user_store", LocalStore())
+    get()
+    user_services.user_cache.clear()
+    user = get()
+    assert repository.reads == 1
+    assert user.first_name == "Ada"
+    # The password hash is masked before it is written to the shared tier.
+    assert user.password.get_secret_value() != "hash"
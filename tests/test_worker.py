@@ -0,0 +1,63 @@
+from datetime import datetime
+import pytest
+from app.worker import CronSchedule
+
+def test_wildcards_cover_every_value():
+    schedule = CronSchedule("* * * * *")
+    assert schedule.minutes == frozenset(range(60))
+    assert schedule.hours == frozenset(range(24))
+    assert schedule.days == frozenset(range(1, 32))
+    assert schedule.months == frozenset(range(1, 13))
+    assert schedule.weekdays == frozenset(range(7))
+
+@pytest.mark.parametrize("field, expected", [
+    ("7", {7}),
+    ("1-4", {1, 2, 3, 4}),
+    ("*/15", {0, 15, 30, 45}),
+    ("10-30/10", {10, 20, 30}),
+    ("5/10", {5, 15, 25, 35, 45, 55}),
+    ("0,30,45-47", {0, 30, 45, 46, 47}),
+])
+def test_minute_field(field, expected):
+    assert CronSchedule(f"{field} * * * *").minutes == frozenset(expected)
+
+def test_sunday_is_zero_or_seven():
+    assert CronSchedule("0 0 * * 7").weekdays == frozenset({0})
+    assert CronSchedule("0 0 * * 5-7").weekdays == frozenset({0, 5, 6})
+
+@pytest.mark.parametrize("expression", [
+    "* * * *",
+    "60 * * * *",
+    "* 24 * * *",
+    "* * 0 * *",
+    "* * * 13 *",
+    "5-1 * * * *",
+    "a * * * *",
+])
+def test_invalid_expression(expression):
+    with pytest.raises(ValueError):
+        CronSchedule(expression)
+
+def test_next_after_is_strictly_later():
+    schedule = CronSchedule("30 2 * * *")
+    assert schedule.next_after(datetime(2024, 1, 1, 2, 30)) == datetime(2024, 1, 2, 2, 30)
+    assert schedule.next_after(datetime(2024, 1, 1, 2, 29, 59)) == datetime(2024, 1, 1, 2, 30)
+
+def test_next_after_with_step():
+    schedule = CronSchedule("5/10 * * * *")
+    assert schedule.next_after(datetime(2024, 1, 1, 0, 5)) == datetime(2024, 1, 1, 0, 15)
+    assert schedule.next_after(datetime(2024, 1, 1, 0, 55)) == datetime(2024, 1, 1, 1, 5)
+
+def test_restricted_day_fields_match_either():
+    # 2024-01-01 is a Monday; the 13th is a Saturday and the first Friday is the 5th.
+    schedule = CronSchedule("0 0 13 * 5")
+    assert schedule.next_after(datetime(2024, 1, 1)) == datetime(2024, 1, 5)
+    assert schedule.next_after(datetime(2024, 1, 12)) == datetime(2024, 1, 13)
+
+def test_one_restricted_day_field():
+    schedule = CronSchedule("0 0 * * 1")
+    assert schedule.next_after(datetime(2024, 1, 1)) == datetime(2024, 1, 8)
+
+def test_never_firing_expression():
+    with pytest.raises(ValueError):
+        CronSchedule("0 0 31 2 *").next_after(datetime(2024, 1, 1))